@@ -0,0 +1,178 @@
+# Быстрый импорт больших файлов через LOAD DATA LOCAL INFILE.
+# Проверенные строки листа (те же проверки, что в ExcelImporter) записываются во временный TSV-файл,
+# который одной командой загружается в промежуточную временную таблицу, а затем переносится
+# в таблицу БД одним INSERT ... SELECT. Строки с уже существующим email клиента или именем
+# сотрудника (UNIQUE-колонки) отбрасываются и попадают в лог как ошибки.
+# На сервере должна быть включена загрузка локальных файлов: SET GLOBAL local_infile = 1.
+# Проверка на локальном сервере: python bulk_import.py <файл.xlsx | файл.csv> [--insert]
+
+import logging
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date
+
+import mysql.connector
+
+from excel_import import ExcelImporter, ImportCancelled, SheetResult, prepare_rows
+from validation import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Таблицы импорта: (таблица БД, колонки вставки в порядке prepare_rows с типами для промежуточной таблицы)
+BULK_TABLES = {
+    "clients": ("clients", (("client_name", "VARCHAR(90)"), ("client_contact", "VARCHAR(90)"))),
+    "employees": ("employee", (("employee_name", "VARCHAR(90)"), ("employee_position", "VARCHAR(90)"))),
+    "projects": ("project", (("project_name", "VARCHAR(90)"), ("project_client", "INT"),
+                             ("project_start_date", "DATE"), ("project_end_date", "DATE"))),
+    "tasks": ("task", (("task_description", "VARCHAR(150)"), ("task_project", "INT"), ("task_due_date", "DATE"),
+                       ("task_status", "VARCHAR(50)"), ("task_assigned_employee", "INT"))),
+}
+
+# UNIQUE-колонки: (колонка, колонки существующей записи для сообщения, текст ошибки, поле).
+# Тексты - как у Validator.check_email_uniqueness и check_employee_name_uniqueness
+UNIQUE_COLUMNS = {
+    "clients": ("client_contact", "client_name, client_id",
+                "Email '{}' уже используется клиентом '{}' (ID: {})", "Контакт"),
+    "employees": ("employee_name", "employee_position, employee_id",
+                  "Сотрудник с именем '{}' уже существует (Должность: {}, ID: {})", "Имя сотрудника"),
+}
+
+# Коды ошибок "загрузка локальных файлов запрещена" на сервере и в драйвере
+LOCAL_INFILE_DISABLED = (1148, 2068, 3948)
+
+
+def tsv_value(value):
+    # Значение в формате LOAD DATA по умолчанию: NULL - \N, спецсимволы экранируются обратной косой чертой
+    if value is None:
+        return "\\N"
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class BulkImporter(ExcelImporter):
+    # Импорт на отдельном соединении с allow_local_infile (соединения пула его не разрешают).
+    # Отмена проверяется между частями листа; уже запущенная загрузка файла на сервер не прерывается
+    @contextmanager
+    def connect(self):
+        conn = mysql.connector.connect(**self.db.config, allow_local_infile=True)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def import_sheet(self, conn, chunks, total, sheet_name, key, sql, label, progress=None, refs=None):
+        if self.upsert:
+            # Повторная синхронизация отправляет только измененные строки, промежуточная таблица ей не нужна
+            return super().import_sheet(conn, chunks, total, sheet_name, key, sql, label, progress, refs)
+        table, columns = BULK_TABLES[key]
+        staging = f"import_{table}"
+        names = ", ".join(name for name, _ in columns)
+        result = SheetResult(sheet_name, key)
+        fd, tsv_path = tempfile.mkstemp(prefix=f"{staging}_", suffix=".tsv")
+        cur = conn.cursor()
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                row_numbers = self._write_tsv(f, chunks, total, sheet_name, key, label, result, progress, refs)
+            if self.cancelled:
+                raise ImportCancelled()
+
+            # Временная таблица видна только этому соединению и не фиксирует транзакцию
+            unique = UNIQUE_COLUMNS.get(key)
+            definitions = [f"{name} {kind}" for name, kind in columns]
+            if unique:
+                definitions.append(f"UNIQUE KEY ({unique[0]})")
+            collation = self.db.config.get("collation", "utf8mb4_unicode_ci")
+            cur.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging}")
+            cur.execute(f"CREATE TEMPORARY TABLE {staging} (import_row INT NOT NULL PRIMARY KEY, "
+                        f"{', '.join(definitions)}) DEFAULT CHARSET = utf8mb4 COLLATE = {collation}")
+            started = time.perf_counter()
+            try:
+                cur.execute(f"LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE {staging} CHARACTER SET utf8mb4 "
+                            f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                            f"(import_row, {names})", (tsv_path,))
+            except mysql.connector.Error as err:
+                if err.errno in LOCAL_INFILE_DISABLED:
+                    raise RuntimeError("Сервер не разрешает LOAD DATA LOCAL INFILE. "
+                                       "Включите его командой SET GLOBAL local_infile = 1") from err
+                raise
+            loaded = cur.rowcount
+            logger.debug(f"Лист '{sheet_name}': {loaded} строк загружено в {staging} "
+                         f"за {time.perf_counter() - started:.2f} с")
+
+            errors = []
+            if loaded < len(row_numbers):
+                # Повтор UNIQUE-значения внутри файла: IGNORE оставляет первую строку
+                cur.execute(f"SELECT import_row FROM {staging}")
+                staged = {row[0] for row in cur.fetchall()}
+                message = str(ValidationError("Значение уже встречается выше в файле",
+                                              unique[3] if unique else None))
+                errors += [(row_number, message) for row_number in row_numbers if row_number not in staged]
+            if unique:
+                column, existing_columns, template, field_name = unique
+                join = f"JOIN {table} c ON c.{column} = s.{column}"
+                existing = ", ".join(f"c.{name.strip()}" for name in existing_columns.split(","))
+                cur.execute(f"SELECT s.import_row, s.{column}, {existing} FROM {staging} s {join}")
+                errors += [(row[0], str(ValidationError(template.format(*row[1:]), field_name)))
+                           for row in cur.fetchall()]
+                cur.execute(f"DELETE s FROM {staging} s {join}")
+
+            cur.execute(f"INSERT INTO {table} ({names}) SELECT {names} FROM {staging} ORDER BY import_row")
+            if cur.rowcount > 0:
+                result.add_inserted(cur.lastrowid, cur.rowcount)
+            self.log_errors(result, label, errors)
+            cur.execute(f"DROP TEMPORARY TABLE {staging}")
+            conn.commit()
+            if refs is not None:
+                refs.add_inserted(conn, key, result.first_id)
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            os.remove(tsv_path)
+
+        logger.info(f"Лист '{sheet_name}': импортировано {result.imported}, ошибок: {result.error_count}")
+        return result
+
+    def _write_tsv(self, f, chunks, total, sheet_name, key, label, result, progress, refs):
+        # Проверенные строки в TSV: первая колонка - номер строки на листе; возвращает номера записанных строк
+        row_numbers = []
+        processed = 0
+        for df in chunks:
+            if self.cancelled:
+                raise ImportCancelled()
+            rows, numbers, errors = prepare_rows(key, df, refs)
+            f.writelines("\t".join([str(number)] + [tsv_value(value) for value in row]) + "\n"
+                         for number, row in zip(numbers, rows))
+            row_numbers += numbers
+            self.log_errors(result, label, errors)
+            processed += len(df)
+            if progress is not None:
+                progress(sheet_name, processed, max(total, processed))
+        return row_numbers
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    from database import db
+
+    if len(sys.argv) < 2:
+        print("Использование: python bulk_import.py <файл.xlsx | файл.csv> [--insert]")
+        sys.exit(1)
+    file_path = sys.argv[1]
+    # --insert: для сравнения тот же импорт через пакетные INSERT
+    importer = ExcelImporter(db) if "--insert" in sys.argv else BulkImporter(db)
+    started = time.perf_counter()
+    if file_path.lower().endswith(".csv"):
+        results = importer.import_csv(file_path)
+    else:
+        results = importer.import_file(file_path)
+    for result in results.values():
+        print(f"{result.sheet_name}: импортировано {result.imported}, ошибок {result.error_count}")
+    print(f"Время импорта: {time.perf_counter() - started:.2f} с")
+    db.close()
@@ -3,15 +3,32 @@ import os
 import logging
 import platform
 import subprocess
+import time
 import mysql.connector
-from PySide6.QtWidgets import QApplication, QMainWindow, QMessageBox, QTableWidgetItem, QFileDialog, QDialog, \
-    QVBoxLayout, QLabel, QLineEdit, QPushButton, QHBoxLayout, QDateEdit
+from PySide6.QtWidgets import QApplication, QMainWindow, QMessageBox, QFileDialog, QDialog, \
+    QVBoxLayout, QLabel, QLineEdit, QPushButton, QHBoxLayout, QDateEdit, QProgressBar, QHeaderView, QProgressDialog
 from ui_coursemanager import Ui_MainWindow
 from validation import Validator, ValidationError, InvalidEmailError, DatabaseError
 from PySide6.QtWidgets import QFileDialog
-import pandas as pd
-from report_generator import ReportGenerator
+from PySide6.QtCore import QThreadPool, Qt
+from report_jobs import ReportJob, CACHED_REPORT_NOTE
+from workload_report import WORKLOAD_FORMATS, workload_file_path
+from report_cache import ReportCache
 from report_dialog import ReportDialog
+from report_queries import (ProjectStaff, project_staff, format_project_staff, client_dependents,
+                            client_dependent_ids, project_details, EmployeeWorkload, employee_workloads,
+                            format_employee_workload, overdue_projects, employee_open_tasks,
+                            format_employee_open_tasks)
+from summary_tables import SummaryTables
+from database import db
+from workers import BackgroundLoader, FileJobWorker
+from search import SearchController
+from search_backends import SearchBackend, BACKEND_FULLTEXT
+from search_index import TrigramIndex
+from excel_import import ExcelImporter, SHEETS as IMPORT_SHEETS
+from bulk_import import BulkImporter
+from exporter import EXPORTERS, EXPORT_FORMATS, exporter_for
+from table_models import ColumnTableModel, CLIENT_COLUMNS, EMPLOYEE_COLUMNS, PROJECT_COLUMNS, TASK_COLUMNS
 
 # Настройка логгирования
 logging.basicConfig(
@@ -23,21 +40,70 @@ logging.basicConfig(
     ]
 )
 logger = logging.getLogger(__name__)
-try:
-    conn = mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="12345678",
-        database="course_db",
-        charset="utf8mb4",
-        collation="utf8mb4_unicode_ci"
-    )
-    cursor = conn.cursor()
-    conn.commit()
-    logger.info("Успешное подключение к базе данных")
-except mysql.connector.Error as err:
-    logger.critical(f"Ошибка подключения к базе данных: {err}")
-    raise
+
+# Сколько строк просматривать при подборе ширины колонок
+RESIZE_PRECISION = 200
+
+# Постраничная загрузка таблиц (keyset-пагинация по первичному ключу)
+PAGING_ENABLED = True
+PAGE_SIZE = 500
+
+# Запросы загрузки таблиц: (SELECT без условий, первичный ключ для пагинации)
+TABLE_QUERIES = {
+    "clients": ("SELECT * FROM clients", "client_id"),
+    "employees": ("SELECT * FROM employee", "employee_id"),
+    "projects": ("SELECT * FROM project", "project_id"),
+    "tasks": ("""
+               SELECT t.task_id,
+                      t.task_description,
+                      t.task_project,
+                      t.task_due_date,
+                      t.task_status,
+                      COALESCE(e.employee_name, 'Не назначен') as employee
+               FROM task t
+                        LEFT JOIN employee e ON t.task_assigned_employee = e.employee_id
+               """, "t.task_id"),
+}
+
+# Локальный поиск: таблицы целиком загружаются в индекс триграмм в памяти, и поиск
+# выполняется без запросов к серверу (для медленного соединения с БД)
+LOCAL_SEARCH_ENABLED = False
+
+# Согласованный экспорт: все таблицы читаются по очереди в одном снимке данных на одном соединении
+PARALLEL_EXPORT = True
+
+# CSV, Parquet и Arrow: читать четыре таблицы одновременно на отдельных соединениях (вне пула).
+# Снимки соединений открываются под FLUSH TABLES WITH READ LOCK, чтобы они соответствовали одному
+# моменту; это блокирует запись на всем сервере, нужна привилегия RELOAD. Если блокировка не удалась,
+# экспорт выполняется в одном снимке
+EXPORT_READ_LOCK = False
+
+# Импорт через LOAD DATA LOCAL INFILE (bulk_import.py): быстрее для сотен тысяч строк,
+# но требует local_infile = 1 на сервере
+BULK_IMPORT_ENABLED = False
+
+# Повторный импорт без дубликатов: существующие клиенты и сотрудники обновляются,
+# уже имеющиеся проекты и задачи пропускаются
+UPSERT_IMPORT = False
+
+# Сколько строк обновлять одним запросом при точечном обновлении таблицы
+REFRESH_BATCH_SIZE = 1000
+
+# Таблицы БД, соответствующие вкладкам (для оценки числа строк)
+TABLE_NAMES = {
+    "clients": "clients",
+    "employees": "employee",
+    "projects": "project",
+    "tasks": "task",
+}
+
+# Названия таблиц для сообщений о загрузке
+TABLE_LABELS = {
+    "clients": "клиентов",
+    "employees": "сотрудников",
+    "projects": "проектов",
+    "tasks": "задач",
+}
 
 
 class People:
@@ -99,9 +165,7 @@ class Client(People):
         try:
             sql = "INSERT INTO clients (client_name, client_contact) VALUES (%s, %s)"
             values = (self.name, self.contact)
-            cursor.execute(sql, values)
-            conn.commit()
-            self.id = cursor.lastrowid
+            self.id, _ = db.execute(sql, values)
             logger.info(f"Клиент успешно добавлен в БД: ID={self.id}, Имя={self.name}")
             return True
         except mysql.connector.Error as err:
@@ -149,9 +213,7 @@ class Employee(People):
         try:
             sql = "INSERT INTO employee (employee_name, employee_position) VALUES (%s, %s)"
             values = (self.name, self.position)
-            cursor.execute(sql, values)
-            conn.commit()
-            self.id = cursor.lastrowid
+            self.id, _ = db.execute(sql, values)
             logger.info(f"Сотрудник успешно добавлен в БД: ID={self.id}, Имя={self.name}, Должность={self.position}")
             return True
         except mysql.connector.Error as err:
@@ -216,9 +278,7 @@ class Project:
             sql = """INSERT INTO project (project_name, project_client, project_start_date, project_end_date)
                      VALUES (%s, %s, %s, %s)"""
             values = (self.name, self.client_id, self.start_date, self.end_date)
-            cursor.execute(sql, values)
-            conn.commit()
-            self.id = cursor.lastrowid
+            self.id, _ = db.execute(sql, values)
             logger.info(
                 f"Проект успешно добавлен в БД: ID={self.id}, Название={self.name}, Период={self.start_date} - {self.end_date}")
             return True
@@ -299,9 +359,7 @@ class Task:
                                        task_assigned_employee)
                      VALUES (%s, %s, %s, %s, %s)"""
             values = (self.description, self.project_id, self.due_date, self.status, self.employee_id)
-            cursor.execute(sql, values)
-            conn.commit()
-            self.id = cursor.lastrowid
+            self.id, _ = db.execute(sql, values)
             logger.info(
                 f"Задача успешно добавлена в БД: ID={self.id}, Описание={self.description}, Срок={self.due_date}")
             return True
@@ -321,7 +379,9 @@ class ProjectManagerApp(QMainWindow):
         logger.debug("UI успешно загружен")
 
         # Подключаем сигналы к слотам
+        self.setup_models()
         self.setup_connections()
+        self.setup_loader()
         logger.debug("Сигналы подключены к слотам")
 
         # Устанавливаем минимальную дату для виджета задач (текущая дата)
@@ -337,23 +397,21 @@ class ProjectManagerApp(QMainWindow):
         # Обработка клика на ячейку клиента - показ информации при клике на ID
         if column == 0:  # Колонка ID
             try:
-                client_id = self.ui.table_clients.item(row, 0).text()
-                client_name = self.ui.table_clients.item(row, 1).text()
-                client_contact = self.ui.table_clients.item(row, 2).text()
+                client_id = self.models["clients"].text(row, 0)
+                client_name = self.models["clients"].text(row, 1)
+                client_contact = self.models["clients"].text(row, 2)
 
                 # Подсчитываем количество проектов клиента
-                cursor.execute(
+                project_count = db.fetch_value(
                     "SELECT COUNT(*) FROM project WHERE project_client = %s",
                     (client_id,)
                 )
-                project_count = cursor.fetchone()[0]
 
                 # Получаем список проектов
-                cursor.execute(
+                projects = db.fetch_all(
                     "SELECT project_name FROM project WHERE project_client = %s",
                     (client_id,)
                 )
-                projects = cursor.fetchall()
                 project_list = "\n  • " + "\n  • ".join([p[0] for p in projects]) if projects else "  Нет проектов"
 
                 logger.info(
@@ -384,9 +442,9 @@ ID: {client_id}
         logger.debug(f"Двойной клик по клиенту: строка={row}, колонка={column}")
         try:
             # Получаем данные из выбранной строки
-            client_id = self.ui.table_clients.item(row, 0).text()
-            client_name = self.ui.table_clients.item(row, 1).text()
-            client_contact = self.ui.table_clients.item(row, 2).text()
+            client_id = self.models["clients"].text(row, 0)
+            client_name = self.models["clients"].text(row, 1)
+            client_contact = self.models["clients"].text(row, 2)
 
             # Создаем диалог для редактирования
             dialog = QDialog(self)
@@ -424,19 +482,19 @@ ID: {client_id}
                     new_name, new_contact = Validator.validate_client_data(new_name, new_contact)
 
                     # Проверка уникальности email (исключая текущего клиента)
-                    Validator.check_email_uniqueness(new_contact, cursor, exclude_id=client_id)
+                    with db.cursor() as cur:
+                        Validator.check_email_uniqueness(new_contact, cur, exclude_id=client_id)
 
                     # Обновление в БД
-                    cursor.execute(
+                    db.execute(
                         "UPDATE clients SET client_name = %s, client_contact = %s WHERE client_id = %s",
                         (new_name, new_contact, client_id)
                     )
-                    conn.commit()
                     logger.info(f"Клиент ID={client_id} успешно обновлен")
 
                     QMessageBox.information(dialog, "Успех", "Данные клиента обновлены!")
                     dialog.accept()
-                    self.load_clients()
+                    self.refresh_rows("clients", [client_id])
 
                 except ValidationError as e:
                     QMessageBox.warning(dialog, "Ошибка валидации", str(e))
@@ -493,10 +551,16 @@ ID: {client_id}
 
         if reply == QMessageBox.Yes:
             logger.info("Пользователь подтвердил выход из приложения")
-            # Закрываем соединение с БД перед выходом
+            # Останавливаем фоновые загрузки и закрываем соединения с БД перед выходом
             try:
-                cursor.close()
-                conn.close()
+                self.loader.cancel_all()
+                self.stats_loader.cancel_all()
+                self.index_loader.cancel_all()
+                if self.file_job is not None:
+                    self.file_job.cancel()
+                ReportJob.shutdown()
+                QThreadPool.globalInstance().waitForDone(3000)
+                db.close()
                 logger.info("Соединение с БД закрыто успешно")
             except Exception as e:
                 logger.error(f"Ошибка при закрытии соединения с БД: {e}")
@@ -511,14 +575,22 @@ ID: {client_id}
     def setup_connections(self):
         logger.debug("Настройка подключений сигналов и слотов")
         # Специальные обработчики
-        self.ui.table_clients.cellDoubleClicked.connect(self.on_client_double_click)
-        self.ui.table_clients.cellClicked.connect(self.on_client_cell_click)
-        self.ui.table_employees.cellDoubleClicked.connect(self.on_employee_double_click)
-        self.ui.table_employees.cellClicked.connect(self.on_employee_cell_click)
-        self.ui.table_projects.cellDoubleClicked.connect(self.on_project_double_click)
-        self.ui.table_projects.cellClicked.connect(self.on_project_cell_click)
-        self.ui.table_tasks.cellDoubleClicked.connect(self.on_task_double_click)
-        self.ui.table_tasks.cellClicked.connect(self.on_task_cell_click)
+        self.ui.table_clients.doubleClicked.connect(
+            lambda index: self.on_client_double_click(index.row(), index.column()))
+        self.ui.table_clients.clicked.connect(
+            lambda index: self.on_client_cell_click(index.row(), index.column()))
+        self.ui.table_employees.doubleClicked.connect(
+            lambda index: self.on_employee_double_click(index.row(), index.column()))
+        self.ui.table_employees.clicked.connect(
+            lambda index: self.on_employee_cell_click(index.row(), index.column()))
+        self.ui.table_projects.doubleClicked.connect(
+            lambda index: self.on_project_double_click(index.row(), index.column()))
+        self.ui.table_projects.clicked.connect(
+            lambda index: self.on_project_cell_click(index.row(), index.column()))
+        self.ui.table_tasks.doubleClicked.connect(
+            lambda index: self.on_task_double_click(index.row(), index.column()))
+        self.ui.table_tasks.clicked.connect(
+            lambda index: self.on_task_cell_click(index.row(), index.column()))
         self.ui.date_project_start.dateChanged.connect(self.on_project_date_changed)
         self.ui.date_project_end.dateChanged.connect(self.on_project_date_changed)
 
@@ -563,10 +635,22 @@ ID: {client_id}
         action_employees_on_project = reports_menu.addAction("Сотрудники, занятые на проекте")
         action_employees_on_project.triggered.connect(self.report_employees_on_project)
 
+        # Отчет: Сотрудники на всех проектах (один запрос на все проекты)
+        action_employees_all_projects = reports_menu.addAction("Сотрудники на всех проектах")
+        action_employees_all_projects.triggered.connect(self.report_employees_all_projects)
+
         # Отчет: Загрузка сотрудника
         action_employee_workload = reports_menu.addAction("Загрузка сотрудника")
         action_employee_workload.triggered.connect(self.report_employee_workload)
 
+        # Отчет: Загрузка всех сотрудников (в файл: текст, PDF или Excel)
+        action_all_employees_workload = reports_menu.addAction("Загрузка всех сотрудников")
+        action_all_employees_workload.triggered.connect(self.report_all_employees_workload)
+
+        # Отчет: Открытые задачи сотрудников (по сводным таблицам, если они установлены)
+        action_employee_open_tasks = reports_menu.addAction("Открытые задачи сотрудников")
+        action_employee_open_tasks.triggered.connect(self.report_employee_open_tasks)
+
         logger.debug("Все подключения настроены")
 
     def load_all_data(self):
@@ -581,9 +665,9 @@ ID: {client_id}
         # Обработка клика на ячейку сотрудника - показ информации при клике на ID
         if column == 0:  # Колонка ID
             try:
-                employee_id = self.ui.table_employees.item(row, 0).text()
-                employee_name = self.ui.table_employees.item(row, 1).text()
-                employee_position = self.ui.table_employees.item(row, 2).text()
+                employee_id = self.models["employees"].text(row, 0)
+                employee_name = self.models["employees"].text(row, 1)
+                employee_position = self.models["employees"].text(row, 2)
 
                 logger.info(f"Просмотр информации о сотруднике: ID={employee_id}, Имя={employee_name}")
 
@@ -607,9 +691,9 @@ ID: {employee_id}
     def on_employee_double_click(self, row, column):
         logger.debug(f"Двойной клик по сотруднику: строка={row}, колонка={column}")
         try:
-            employee_id = self.ui.table_employees.item(row, 0).text()
-            employee_name = self.ui.table_employees.item(row, 1).text()
-            employee_position = self.ui.table_employees.item(row, 2).text()
+            employee_id = self.models["employees"].text(row, 0)
+            employee_name = self.models["employees"].text(row, 1)
+            employee_position = self.models["employees"].text(row, 2)
 
             dialog = QDialog(self)
             dialog.setWindowTitle(f"Редактировать сотрудника #{employee_id}")
@@ -642,18 +726,20 @@ ID: {employee_id}
                     new_name, new_position = Validator.validate_employee_data(new_name, new_position)
 
                     # Проверка уникальности имени (исключая текущего сотрудника)
-                    Validator.check_employee_name_uniqueness(new_name, cursor, exclude_id=employee_id)
+                    with db.cursor() as cur:
+                        Validator.check_employee_name_uniqueness(new_name, cur, exclude_id=employee_id)
 
-                    cursor.execute(
+                    db.execute(
                         "UPDATE employee SET employee_name = %s, employee_position = %s WHERE employee_id = %s",
                         (new_name, new_position, employee_id)
                     )
-                    conn.commit()
                     logger.info(f"Сотрудник ID={employee_id} успешно обновлен")
 
                     QMessageBox.information(dialog, "Успех", "Данные сотрудника обновлены!")
                     dialog.accept()
-                    self.load_employees()
+                    self.refresh_rows("employees", [employee_id])
+                    # В таблице задач отображается имя исполнителя
+                    self.refresh_rows_where("tasks", "t.task_assigned_employee = %s", (employee_id,))
 
                 except ValidationError as e:
                     QMessageBox.warning(dialog, "Ошибка валидации", str(e))
@@ -674,33 +760,16 @@ ID: {employee_id}
         # Обработка клика на ячейку проекта - показ информации при клике на ID проекта или клиента
         try:
             if column == 0:  # Колонка ID проекта
-                project_id = self.ui.table_projects.item(row, 0).text()
-                project_name = self.ui.table_projects.item(row, 1).text()
-                client_id = self.ui.table_projects.item(row, 2).text()
-                project_start = self.ui.table_projects.item(row, 3).text()
-                project_end = self.ui.table_projects.item(row, 4).text()
-
-                # Получаем имя клиента
-                cursor.execute(
-                    "SELECT client_name FROM clients WHERE client_id = %s",
-                    (client_id,)
-                )
-                result = cursor.fetchone()
-                client_name = result[0] if result else "Не найден"
-
-                # Подсчитываем задачи проекта
-                cursor.execute(
-                    "SELECT COUNT(*) FROM task WHERE task_project = %s",
-                    (project_id,)
-                )
-                task_count = cursor.fetchone()[0]
-
-                # Получаем задачи
-                cursor.execute(
-                    "SELECT task_description, task_status FROM task WHERE task_project = %s",
-                    (project_id,)
-                )
-                tasks = cursor.fetchall()
+                project_id = self.models["projects"].text(row, 0)
+                project_name = self.models["projects"].text(row, 1)
+                client_id = self.models["projects"].text(row, 2)
+                project_start = self.models["projects"].text(row, 3)
+                project_end = self.models["projects"].text(row, 4)
+
+                # Имя клиента и задачи проекта - одним запросом
+                client_name, tasks = project_details(db, project_id)
+                client_name = client_name or "Не найден"
+                task_count = len(tasks)
                 task_list = "\n  • " + "\n  • ".join([f"{t[0]} [{t[1]}]" for t in tasks]) if tasks else "  Нет задач"
 
                 logger.info(f"Просмотр информации о проекте: ID={project_id}, Название={project_name}")
@@ -725,12 +794,11 @@ ID проекта: {project_id}
                 )
 
             elif column == 2:  # Колонка ID клиента - смена клиента проекта
-                project_id = self.ui.table_projects.item(row, 0).text()
-                current_client_id = self.ui.table_projects.item(row, 2).text()
+                project_id = self.models["projects"].text(row, 0)
+                current_client_id = self.models["projects"].text(row, 2)
 
                 # Получаем всех клиентов
-                cursor.execute("SELECT client_id, client_name, client_contact FROM clients")
-                clients = cursor.fetchall()
+                clients = db.fetch_all("SELECT client_id, client_name, client_contact FROM clients")
 
                 if not clients:
                     QMessageBox.warning(self, "Ошибка", "Нет доступных клиентов")
@@ -757,14 +825,13 @@ ID проекта: {project_id}
 
                 # Обновляем клиента проекта
                 try:
-                    cursor.execute(
+                    db.execute(
                         "UPDATE project SET project_client = %s WHERE project_id = %s",
                         (new_client_id, project_id)
                     )
-                    conn.commit()
                     logger.info(f"Клиент проекта ID={project_id} изменен на {new_client_id}")
                     QMessageBox.information(self, "Успех", "Клиент проекта изменен!")
-                    self.load_projects()
+                    self.refresh_rows("projects", [project_id])
                 except Exception as e:
                     logger.error(f"Ошибка смены клиента: {e}")
                     QMessageBox.critical(self, "Ошибка", str(e))
@@ -777,11 +844,11 @@ ID проекта: {project_id}
         logger.debug(f"Двойной клик по проекту: строка={row}, колонка={column}")
         try:
             from PySide6.QtCore import QDate
-            project_id = self.ui.table_projects.item(row, 0).text()
-            project_name = self.ui.table_projects.item(row, 1).text()
-            project_client = self.ui.table_projects.item(row, 2).text()
-            project_start = self.ui.table_projects.item(row, 3).text()
-            project_end = self.ui.table_projects.item(row, 4).text()
+            project_id = self.models["projects"].text(row, 0)
+            project_name = self.models["projects"].text(row, 1)
+            project_client = self.models["projects"].text(row, 2)
+            project_start = self.models["projects"].text(row, 3)
+            project_end = self.models["projects"].text(row, 4)
 
             dialog = QDialog(self)
             dialog.setWindowTitle(f"Редактировать проект #{project_id}")
@@ -822,16 +889,15 @@ ID проекта: {project_id}
 
                     new_name, new_start, new_end = Validator.validate_project_data(new_name, new_start, new_end)
 
-                    cursor.execute(
+                    db.execute(
                         "UPDATE project SET project_name = %s, project_start_date = %s, project_end_date = %s WHERE project_id = %s",
                         (new_name, new_start.toString("yyyy-MM-dd"), new_end.toString("yyyy-MM-dd"), project_id)
                     )
-                    conn.commit()
                     logger.info(f"Проект ID={project_id} успешно обновлен")
 
                     QMessageBox.information(dialog, "Успех", "Данные проекта обновлены!")
                     dialog.accept()
-                    self.load_projects()
+                    self.refresh_rows("projects", [project_id])
 
                 except ValidationError as e:
                     QMessageBox.warning(dialog, "Ошибка валидации", str(e))
@@ -854,21 +920,20 @@ ID проекта: {project_id}
             from PySide6.QtCore import QDate
 
             if column == 0:  # Колонка ID задачи
-                task_id = self.ui.table_tasks.item(row, 0).text()
-                task_description = self.ui.table_tasks.item(row, 1).text()
-                project_id = self.ui.table_tasks.item(row, 2).text()
-                due_date_str = self.ui.table_tasks.item(row, 3).text()
-                task_status = self.ui.table_tasks.item(row, 4).text()
+                task_id = self.models["tasks"].text(row, 0)
+                task_description = self.models["tasks"].text(row, 1)
+                project_id = self.models["tasks"].text(row, 2)
+                due_date_str = self.models["tasks"].text(row, 3)
+                task_status = self.models["tasks"].text(row, 4)
 
                 # Получаем название проекта и назначенного сотрудника
-                cursor.execute("""
+                result = db.fetch_one("""
                                SELECT p.project_name, e.employee_name, e.employee_position
                                FROM task t
                                         LEFT JOIN project p ON t.task_project = p.project_id
                                         LEFT JOIN employee e ON t.task_assigned_employee = e.employee_id
                                WHERE t.task_id = %s
                                """, (task_id,))
-                result = cursor.fetchone()
 
                 if result:
                     project_name = result[0] if result[0] else "Не определен"
@@ -920,13 +985,12 @@ ID задачи: {task_id}
                 )
 
             elif column == 2:  # Колонка ID проекта - смена проекта задачи
-                task_id = self.ui.table_tasks.item(row, 0).text()
-                current_project_id = self.ui.table_tasks.item(row, 2).text()
-                task_due_date_str = self.ui.table_tasks.item(row, 3).text()
+                task_id = self.models["tasks"].text(row, 0)
+                current_project_id = self.models["tasks"].text(row, 2)
+                task_due_date_str = self.models["tasks"].text(row, 3)
 
                 # Получаем все проекты
-                cursor.execute("SELECT project_id, project_name, project_end_date FROM project")
-                projects = cursor.fetchall()
+                projects = db.fetch_all("SELECT project_id, project_name, project_end_date FROM project")
 
                 if not projects:
                     QMessageBox.warning(self, "Ошибка", "Нет доступных проектов")
@@ -969,14 +1033,13 @@ ID задачи: {task_id}
 
                 # Обновляем проект задачи
                 try:
-                    cursor.execute(
+                    db.execute(
                         "UPDATE task SET task_project = %s WHERE task_id = %s",
                         (new_project_id, task_id)
                     )
-                    conn.commit()
                     logger.info(f"Проект задачи ID={task_id} изменен на {new_project_id}")
                     QMessageBox.information(self, "Успех", "Проект задачи изменен!")
-                    self.load_tasks()
+                    self.refresh_rows("tasks", [task_id])
                 except Exception as e:
                     logger.error(f"Ошибка смены проекта: {e}")
                     QMessageBox.critical(self, "Ошибка", str(e))
@@ -991,11 +1054,11 @@ ID задачи: {task_id}
             from PySide6.QtCore import QDate
             from PySide6.QtWidgets import QComboBox
 
-            task_id = self.ui.table_tasks.item(row, 0).text()
-            task_description = self.ui.table_tasks.item(row, 1).text()
-            task_project = self.ui.table_tasks.item(row, 2).text()
-            task_due = self.ui.table_tasks.item(row, 3).text()
-            task_status = self.ui.table_tasks.item(row, 4).text()
+            task_id = self.models["tasks"].text(row, 0)
+            task_description = self.models["tasks"].text(row, 1)
+            task_project = self.models["tasks"].text(row, 2)
+            task_due = self.models["tasks"].text(row, 3)
+            task_status = self.models["tasks"].text(row, 4)
 
             # Быстрое редактирование описания (колонка 1)
             if column == 1:
@@ -1024,15 +1087,14 @@ ID задачи: {task_id}
                             QMessageBox.warning(dialog, "Ошибка", "Описание не может быть пустым")
                             return
 
-                        cursor.execute(
+                        db.execute(
                             "UPDATE task SET task_description = %s WHERE task_id = %s",
                             (new_desc, task_id)
                         )
-                        conn.commit()
                         logger.info(f"Описание задачи ID={task_id} обновлено")
                         QMessageBox.information(dialog, "Успех", "Описание обновлено!")
                         dialog.accept()
-                        self.load_tasks()
+                        self.refresh_rows("tasks", [task_id])
                     except Exception as e:
                         logger.error(f"Ошибка обновления описания: {e}")
                         QMessageBox.critical(dialog, "Ошибка", str(e))
@@ -1078,15 +1140,14 @@ ID задачи: {task_id}
                 def save_status():
                     try:
                         new_status = status_combo.currentData()
-                        cursor.execute(
+                        db.execute(
                             "UPDATE task SET task_status = %s WHERE task_id = %s",
                             (new_status, task_id)
                         )
-                        conn.commit()
                         logger.info(f"Статус задачи ID={task_id} изменен на {new_status}")
                         QMessageBox.information(dialog, "Успех", "Статус обновлен!")
                         dialog.accept()
-                        self.load_tasks()
+                        self.refresh_rows("tasks", [task_id])
                     except Exception as e:
                         logger.error(f"Ошибка обновления статуса: {e}")
                         QMessageBox.critical(dialog, "Ошибка", str(e))
@@ -1118,8 +1179,7 @@ ID задачи: {task_id}
                 layout.addWidget(QLabel("Проект:"))
                 project_combo = QComboBox()
 
-                cursor.execute("SELECT project_id, project_name FROM project")
-                projects = cursor.fetchall()
+                projects = db.fetch_all("SELECT project_id, project_name FROM project")
                 selected_project_index = 0
                 for idx, proj in enumerate(projects):
                     proj_id, proj_name = proj
@@ -1148,15 +1208,14 @@ ID задачи: {task_id}
                         # Валидация с новым проектом
                         new_desc, new_due = Validator.validate_task_data(new_desc, new_due, int(new_project))
 
-                        cursor.execute(
+                        db.execute(
                             "UPDATE task SET task_description = %s, task_due_date = %s, task_project = %s WHERE task_id = %s",
                             (new_desc, new_due.toString("yyyy-MM-dd"), new_project, task_id)
                         )
-                        conn.commit()
                         logger.info(f"Задача ID={task_id} обновлена (без изменения исполнителя)")
                         QMessageBox.information(dialog, "Успех", "Задача обновлена!")
                         dialog.accept()
-                        self.load_tasks()
+                        self.refresh_rows("tasks", [task_id])
                     except ValidationError as e:
                         QMessageBox.warning(dialog, "Ошибка валидации", str(e))
                     except Exception as e:
@@ -1171,8 +1230,7 @@ ID задачи: {task_id}
             # Быстрое переназначение исполнителя (колонка 5)
             elif column == 5:
                 # Получаем текущего исполнителя
-                cursor.execute("SELECT task_assigned_employee FROM task WHERE task_id = %s", (task_id,))
-                current_employee = cursor.fetchone()[0]
+                current_employee = db.fetch_value("SELECT task_assigned_employee FROM task WHERE task_id = %s", (task_id,))
 
                 dialog = QDialog(self)
                 dialog.setWindowTitle(f"Переназначить исполнителя задачи #{task_id}")
@@ -1184,8 +1242,7 @@ ID задачи: {task_id}
                 employee_combo = QComboBox()
                 employee_combo.addItem("-- Без назначения --", None)
 
-                cursor.execute("SELECT employee_id, employee_name, employee_position FROM employee")
-                employees = cursor.fetchall()
+                employees = db.fetch_all("SELECT employee_id, employee_name, employee_position FROM employee")
                 selected_index = 0
                 for idx, emp in enumerate(employees, 1):
                     emp_id, emp_name, emp_pos = emp
@@ -1208,15 +1265,14 @@ ID задачи: {task_id}
                 def save_employee():
                     try:
                         new_employee = employee_combo.currentData()
-                        cursor.execute(
+                        db.execute(
                             "UPDATE task SET task_assigned_employee = %s WHERE task_id = %s",
                             (new_employee, task_id)
                         )
-                        conn.commit()
                         logger.info(f"Исполнитель задачи ID={task_id} изменен")
                         QMessageBox.information(dialog, "Успех", "Исполнитель переназначен!")
                         dialog.accept()
-                        self.load_tasks()
+                        self.refresh_rows("tasks", [task_id])
                     except Exception as e:
                         logger.error(f"Ошибка переназначения исполнителя: {e}")
                         QMessageBox.critical(dialog, "Ошибка", str(e))
@@ -1228,8 +1284,7 @@ ID задачи: {task_id}
 
             # Полное редактирование (другие колонки) - описание, срок, исполнитель
             # Получаем текущего назначенного сотрудника
-            cursor.execute("SELECT task_assigned_employee FROM task WHERE task_id = %s", (task_id,))
-            current_employee = cursor.fetchone()[0]
+            current_employee = db.fetch_value("SELECT task_assigned_employee FROM task WHERE task_id = %s", (task_id,))
 
             dialog = QDialog(self)
             dialog.setWindowTitle(f"Редактировать задачу #{task_id}")
@@ -1252,8 +1307,7 @@ ID задачи: {task_id}
             employee_combo = QComboBox()
             employee_combo.addItem("-- Без назначения --", None)
 
-            cursor.execute("SELECT employee_id, employee_name, employee_position FROM employee")
-            employees = cursor.fetchall()
+            employees = db.fetch_all("SELECT employee_id, employee_name, employee_position FROM employee")
             selected_index = 0
             for idx, emp in enumerate(employees, 1):
                 emp_id, emp_name, emp_pos = emp
@@ -1281,15 +1335,14 @@ ID задачи: {task_id}
 
                     new_desc, new_due = Validator.validate_task_data(new_desc, new_due, int(task_project))
 
-                    cursor.execute(
+                    db.execute(
                         "UPDATE task SET task_description = %s, task_due_date = %s, task_assigned_employee = %s WHERE task_id = %s",
                         (new_desc, new_due.toString("yyyy-MM-dd"), new_employee, task_id)
                     )
-                    conn.commit()
                     logger.info(f"Задача ID={task_id} успешно обновлена")
 
                     dialog.accept()
-                    self.load_tasks()
+                    self.refresh_rows("tasks", [task_id])
 
                 except ValidationError as e:
                     QMessageBox.warning(dialog, "Ошибка валидации", str(e))
@@ -1306,80 +1359,300 @@ ID задачи: {task_id}
             logger.error(f"Не удалось открыть редактирование задачи: {e}")
             QMessageBox.warning(self, "Ошибка", f"Не удалось открыть редактирование: {e}")
 
+    def setup_models(self):
+        # Модели таблиц главного окна (данные хранятся по колонкам, ячейки форматируются по запросу)
+        self.models = {
+            "clients": ColumnTableModel(CLIENT_COLUMNS, self),
+            "employees": ColumnTableModel(EMPLOYEE_COLUMNS, self),
+            "projects": ColumnTableModel(PROJECT_COLUMNS, self),
+            "tasks": ColumnTableModel(TASK_COLUMNS, self),
+        }
+        for key, model in self.models.items():
+            view = self.table_widget(key)
+            view.setModel(model)
+            view.setWordWrap(False)
+            # Одинаковая высота строк: представлению не нужно измерять каждую строку
+            view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+            view.horizontalHeader().setResizeContentsPrecision(RESIZE_PRECISION)
+            # Прокрутка до конца подгружает следующую страницу
+            model.fetch_more_requested.connect(lambda last_key, key=key: self.load_page(key, last_key))
+
+    def setup_loader(self):
+        # Фоновая загрузка таблиц: запросы выполняются в пуле потоков на своих соединениях
+        self.loader = BackgroundLoader(db, self)
+        self.loader.loaded.connect(self.on_table_loaded)
+        self.loader.progress.connect(self.on_load_progress)
+        self.loader.failed.connect(self.on_load_failed)
+        self.loader.busy_changed.connect(self.on_loader_busy_changed)
+
+        # Индикатор загрузки в строке состояния
+        self.load_status_label = QLabel()
+        self.load_progress = QProgressBar()
+        self.load_progress.setRange(0, 0)
+        self.load_progress.setMaximumWidth(150)
+        self.load_progress.setVisible(False)
+        self.statusBar().addPermanentWidget(self.load_status_label)
+        self.statusBar().addPermanentWidget(self.load_progress)
+
+        # Отдельный загрузчик для оценки числа строк в заголовках вкладок
+        self.stats_loader = BackgroundLoader(db, self)
+        self.stats_loader.loaded.connect(self.on_row_estimates_loaded)
+        self.row_estimates = {}
+        self.tab_titles = {}
+        # Режим текущей загрузки таблицы: "full", "page", "append" или "search"
+        self._load_modes = {}
+
+        # Отложенный поиск: запрос уходит в БД после паузы во вводе
+        self.search_controller = SearchController(self)
+        self.search_controller.triggered.connect(self.on_search_triggered)
+        self.search_backend = SearchBackend(db)
+        self._search_backends_used = {}
+
+        # Кэш отчетов: повторный отчет по неизменившимся данным не строится заново
+        self.report_cache = ReportCache(db)
+
+        # Сводные таблицы задач (summary_tables.py): если установлены, отчеты читают их вместо task
+        self.summary_tables = SummaryTables(db)
+
+        # Локальные индексы поиска (LOCAL_SEARCH_ENABLED), строятся отдельным загрузчиком
+        self.index_loader = BackgroundLoader(db, self)
+        self.index_loader.loaded.connect(self.on_search_index_loaded)
+        self.index_loader.failed.connect(self.on_search_index_failed)
+        self.search_indexes = {}
+
+        # Текущий импорт или экспорт файла (выполняется в рабочем потоке)
+        self.file_job = None
+
     def load_clients(self):
         logger.debug("Загрузка клиентов из БД")
-        try:
-            cursor.execute("SELECT * FROM clients")
-            clients = cursor.fetchall()
-            self.ui.table_clients.setRowCount(len(clients))
-            for row_idx, client in enumerate(clients):
-                for col_idx, value in enumerate(client):
-                    self.ui.table_clients.setItem(row_idx, col_idx,
-                                                  QTableWidgetItem(str(value)))
-            self.ui.table_clients.resizeColumnsToContents()
-            logger.info(f"Загружено клиентов: {len(clients)}")
-        except mysql.connector.Error as err:
-            logger.error(f"Ошибка загрузки клиентов: {err}")
-            QMessageBox.warning(self, "Ошибка", f"Ошибка загрузки клиентов: {err}")
+        self.load_table("clients")
 
     def load_employees(self):
         logger.debug("Загрузка сотрудников из БД")
-        try:
-            cursor.execute("SELECT * FROM employee")
-            employees = cursor.fetchall()
-
-            self.ui.table_employees.setRowCount(len(employees))
-            for row_idx, employee in enumerate(employees):
-                for col_idx, value in enumerate(employee):
-                    self.ui.table_employees.setItem(row_idx, col_idx,
-                                                    QTableWidgetItem(str(value)))
-            self.ui.table_employees.resizeColumnsToContents()
-            logger.info(f"Загружено сотрудников: {len(employees)}")
-        except mysql.connector.Error as err:
-            logger.error(f"Ошибка загрузки сотрудников: {err}")
-            QMessageBox.warning(self, "Ошибка", f"Ошибка загрузки сотрудников: {err}")
+        self.load_table("employees")
 
     def load_projects(self):
         logger.debug("Загрузка проектов из БД")
-        try:
-            cursor.execute("SELECT * FROM project")
-            projects = cursor.fetchall()
-
-            self.ui.table_projects.setRowCount(len(projects))
-            for row_idx, project in enumerate(projects):
-                for col_idx, value in enumerate(project):
-                    self.ui.table_projects.setItem(row_idx, col_idx,
-                                                   QTableWidgetItem(str(value)))
-            self.ui.table_projects.resizeColumnsToContents()
-            logger.info(f"Загружено проектов: {len(projects)}")
-        except mysql.connector.Error as err:
-            logger.error(f"Ошибка загрузки проектов: {err}")
-            QMessageBox.warning(self, "Ошибка", f"Ошибка загрузки проектов: {err}")
+        self.load_table("projects")
 
     def load_tasks(self):
         logger.debug("Загрузка задач из БД")
-        try:
-            cursor.execute("""
-                           SELECT t.task_id,
-                                  t.task_description,
-                                  t.task_project,
-                                  t.task_due_date,
-                                  t.task_status,
-                                  COALESCE(e.employee_name, 'Не назначен') as employee
-                           FROM task t
-                                    LEFT JOIN employee e ON t.task_assigned_employee = e.employee_id
-                           """)
-            tasks = cursor.fetchall()
-            self.ui.table_tasks.setRowCount(len(tasks))
-            for row_idx, task in enumerate(tasks):
-                for col_idx, value in enumerate(task):
-                    self.ui.table_tasks.setItem(row_idx, col_idx,
-                                                QTableWidgetItem(str(value)))
-            self.ui.table_tasks.resizeColumnsToContents()
-            logger.info(f"Загружено задач: {len(tasks)}")
-        except mysql.connector.Error as err:
-            logger.error(f"Ошибка загрузки задач: {err}")
-            QMessageBox.warning(self, "Ошибка", f"Ошибка загрузки задач: {err}")
+        self.load_table("tasks")
+
+    def load_table(self, key):
+        select, pk = TABLE_QUERIES[key]
+        if LOCAL_SEARCH_ENABLED and key not in self.search_indexes and not self.index_loader.is_loading(key):
+            self.build_search_index(key)
+        if PAGING_ENABLED:
+            self.load_page(key, after_key=0)
+        else:
+            self._load_modes[key] = "full"
+            self.loader.start(key, f"{select} ORDER BY {pk}", sink=self.models[key].new_store())
+        self.load_row_estimates()
+
+    def load_page(self, key, after_key):
+        # Keyset-пагинация: WHERE pk > последний загруженный ключ ORDER BY pk LIMIT n
+        select, pk = TABLE_QUERIES[key]
+        self._load_modes[key] = "append" if after_key != 0 else "page"
+        self.loader.start(key, f"{select} WHERE {pk} > %s ORDER BY {pk} LIMIT %s", (after_key, PAGE_SIZE))
+
+    def load_row_estimates(self):
+        # Оценка числа строк из статистики InnoDB (без COUNT(*) по всей таблице)
+        self.stats_loader.start(
+            "row_estimates",
+            "SELECT TABLE_NAME, TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()"
+        )
+
+    def on_row_estimates_loaded(self, _, rows):
+        estimates = {name: count for name, count in rows}
+        for key, table_name in TABLE_NAMES.items():
+            self.row_estimates[key] = estimates.get(table_name)
+            self.update_tab_title(key)
+
+    def update_tab_title(self, key):
+        model = self.models[key]
+        tab = self.table_widget(key).parentWidget()
+        index = self.ui.tabWidget.indexOf(tab)
+        if index < 0:
+            return
+        if key not in self.tab_titles:
+            self.tab_titles[key] = self.ui.tabWidget.tabText(index)
+        title = self.tab_titles[key]
+        estimate = self.row_estimates.get(key)
+        if not model.has_more:
+            title = f"{title} ({len(model.store)})"
+        elif estimate is not None:
+            title = f"{title} (~{max(estimate, len(model.store))})"
+        self.ui.tabWidget.setTabText(index, title)
+
+    def refresh_rows(self, key, ids):
+        # Точечное обновление строк после изменения данных вместо полной перезагрузки таблицы
+        ids = [int(row_id) for row_id in ids]
+        if not ids:
+            return
+        searching = bool(self.search_text(key))
+        index = self.search_indexes.get(key)
+        select, pk = TABLE_QUERIES[key]
+        model = self.models[key]
+        if not searching or index is not None:
+            for start in range(0, len(ids), REFRESH_BATCH_SIZE):
+                batch = ids[start:start + REFRESH_BATCH_SIZE]
+                placeholders = ", ".join(["%s"] * len(batch))
+                rows = db.fetch_all(f"{select} WHERE {pk} IN ({placeholders}) ORDER BY {pk}", batch)
+                # Строки, которых уже нет в БД, убираем из таблицы
+                missing = set(batch) - {row[0] for row in rows}
+                self.sync_search_index(key, rows, missing)
+                if not searching:
+                    model.upsert_rows(rows)
+                    model.remove_keys(missing)
+        if searching:
+            # Активен поиск: обновленная строка может перестать ему соответствовать
+            self.run_search(key)
+            return
+        self.update_tab_title(key)
+        logger.debug(f"Обновлено строк ({TABLE_LABELS[key]}): {len(ids)}")
+
+    def refresh_rows_where(self, key, condition, params):
+        # Точечное обновление строк, выбранных условием (например, задач сотрудника)
+        searching = bool(self.search_text(key))
+        if not searching or key in self.search_indexes:
+            select, pk = TABLE_QUERIES[key]
+            rows = db.fetch_all(f"{select} WHERE {condition} ORDER BY {pk}", params)
+            self.sync_search_index(key, rows)
+            if not searching:
+                self.models[key].upsert_rows(rows)
+                self.update_tab_title(key)
+        if searching:
+            self.run_search(key)
+
+    def refresh_imported_rows(self, key, first_id, imported):
+        # Импортированные строки догружаются в фоне, а не запросом в GUI-потоке. Если импортировано больше
+        # страницы (или таблица уже загружается), таблица просто загружается заново: в постраничном режиме
+        # это одна первая страница. Иначе читаются только строки с ID от first_id (не дальше последней
+        # загруженной строки, остальные придут с fetchMore) и вливаются в модель в on_table_loaded
+        if self.search_text(key):
+            if key in self.search_indexes:
+                self.build_search_index(key)
+            self.run_search(key)
+            return
+        if imported > PAGE_SIZE or self.loader.is_loading(key):
+            if key in self.search_indexes:
+                self.build_search_index(key)
+            self.load_table(key)
+            return
+        select, pk = TABLE_QUERIES[key]
+        model = self.models[key]
+        conditions, params = [f"{pk} >= %s"], [first_id]
+        if model.has_more:
+            conditions.append(f"{pk} <= %s")
+            params.append(model.last_key())
+        self._load_modes[key] = "merge"
+        self.loader.start(key, f"{select} WHERE {' AND '.join(conditions)} ORDER BY {pk} LIMIT %s",
+                          params + [PAGE_SIZE])
+
+    def remove_rows(self, key, ids):
+        ids = [int(row_id) for row_id in ids]
+        self.sync_search_index(key, removed=ids)
+        self.models[key].remove_keys(ids)
+        self.update_tab_title(key)
+
+    def build_search_index(self, key):
+        # Загрузка всей таблицы в локальный индекс поиска; индекс строится в рабочем потоке
+        select, pk = TABLE_QUERIES[key]
+        self.index_loader.start(key, f"{select} ORDER BY {pk}", sink=TrigramIndex(key))
+
+    def sync_search_index(self, key, rows=(), removed=()):
+        # Изменения, сделанные программой, переносятся в локальный индекс поиска
+        if self.index_loader.is_loading(key):
+            # Индекс еще строится и мог не увидеть изменение - начинаем построение заново
+            self.build_search_index(key)
+            return
+        index = self.search_indexes.get(key)
+        if index is not None:
+            index.upsert(rows)
+            index.remove(removed)
+
+    def on_search_index_loaded(self, key, index):
+        self.search_indexes[key] = index
+        memory = index.nbytes()
+        per_100k = memory * 100_000 // max(len(index), 1)
+        logger.info(f"Индекс поиска {TABLE_LABELS[key]}: {len(index)} строк, {memory // 1024} КБ "
+                    f"({per_100k // 1024 // 1024} МБ на 100 тыс. строк)")
+
+    def on_search_index_failed(self, key, message):
+        # Без индекса поиск продолжает выполняться на сервере БД
+        logger.warning(f"Не удалось построить индекс поиска {TABLE_LABELS[key]}: {message}")
+
+    def search_text(self, key):
+        return self.search_fields()[key].text().strip()
+
+    def search_fields(self):
+        return {
+            "clients": self.ui.line_search_client,
+            "employees": self.ui.line_search_employee,
+            "projects": self.ui.line_search_project,
+            "tasks": self.ui.line_search_task,
+        }
+
+    def run_search(self, key):
+        # Повтор текущего поиска без задержки (после изменения данных)
+        self.search_controller.trigger_now(key, self.search_text(key))
+
+    def table_widget(self, key):
+        return {
+            "clients": self.ui.table_clients,
+            "employees": self.ui.table_employees,
+            "projects": self.ui.table_projects,
+            "tasks": self.ui.table_tasks,
+        }[key]
+
+    def on_table_loaded(self, key, result):
+        model = self.models[key]
+        mode = self._load_modes.get(key)
+        if mode == "merge":
+            # Строки, добавленные импортом (refresh_imported_rows)
+            self.sync_search_index(key, result)
+            model.merge_rows(result)
+            self.update_tab_title(key)
+            return
+        if mode in ("full", "search"):
+            # Подмена данных модели результатом фоновой загрузки (колонки уже собраны в рабочем потоке)
+            model.set_store(result)
+        else:
+            # Неполная страница означает, что таблица загружена до конца
+            has_more = len(result) == PAGE_SIZE
+            if mode == "append":
+                model.append_rows(result, has_more)
+            else:
+                model.set_rows(result, has_more)
+        if mode != "append" or not PAGING_ENABLED:
+            self.table_widget(key).resizeColumnsToContents()
+        self.update_tab_title(key)
+        if mode == "search":
+            backend = self._search_backends_used.get(key)
+            logger.info(f"Найдено {TABLE_LABELS[key]} по запросу '{self.search_text(key)}' ({backend}): {len(model.store)}")
+            self.statusBar().showMessage(f"Поиск {TABLE_LABELS[key]}: {len(model.store)} ({backend})", 5000)
+        else:
+            logger.info(f"Загружено {TABLE_LABELS[key]}: {len(model.store)} ({model.memory_usage() // 1024} КБ)")
+
+    def on_load_progress(self, key, count):
+        self.load_status_label.setText(f"Загрузка {TABLE_LABELS[key]}: {count}")
+
+    def on_load_failed(self, key, message):
+        self.models[key].fetch_failed()
+        if self._load_modes.get(key) == "search" and self._search_backends_used.get(key) == BACKEND_FULLTEXT:
+            # Индекс FULLTEXT недоступен (например, удален): повторяем поиск через LIKE
+            logger.warning(f"Ошибка поиска {TABLE_LABELS[key]} по индексу FULLTEXT: {message}")
+            self.search_backend.disable(key)
+            self.run_search(key)
+            return
+        logger.error(f"Ошибка загрузки {TABLE_LABELS[key]}: {message}")
+        QMessageBox.warning(self, "Ошибка", f"Ошибка загрузки {TABLE_LABELS[key]}: {message}")
+
+    def on_loader_busy_changed(self, busy):
+        self.load_progress.setVisible(busy)
+        if not busy:
+            self.load_status_label.clear()
 
     def add_client(self):
         logger.debug("Попытка добавления клиента")
@@ -1393,7 +1666,8 @@ ID задачи: {task_id}
             logger.debug("Валидация данных клиента пройдена")
 
             # Проверка уникальности email
-            Validator.check_email_uniqueness(contact, cursor)
+            with db.cursor() as cur:
+                Validator.check_email_uniqueness(contact, cur)
             logger.debug("Проверка уникальности email пройдена")
 
             client = Client(name=name, contact=contact)
@@ -1402,7 +1676,7 @@ ID задачи: {task_id}
                                         f"Клиент '{name}' успешно добавлен!\nEmail: {contact}")
                 self.ui.line_client_name.clear()
                 self.ui.line_client_contact.clear()
-                self.load_clients()
+                self.refresh_rows("clients", [client.id])
             else:
                 raise DatabaseError("добавление клиента", "Неизвестная ошибка")
         except InvalidEmailError as e:
@@ -1429,7 +1703,8 @@ ID задачи: {task_id}
             logger.debug("Валидация данных сотрудника пройдена")
 
             # Проверка уникальности имени сотрудника
-            Validator.check_employee_name_uniqueness(name, cursor)
+            with db.cursor() as cur:
+                Validator.check_employee_name_uniqueness(name, cur)
             logger.debug("Проверка уникальности имени сотрудника пройдена")
 
             employee = Employee(name=name, position=position)
@@ -1438,7 +1713,7 @@ ID задачи: {task_id}
                                         f"Сотрудник '{name}' успешно добавлен!")
                 self.ui.line_employee_name.clear()
                 self.ui.line_employee_position.clear()
-                self.load_employees()
+                self.refresh_rows("employees", [employee.id])
             else:
                 raise DatabaseError("добавление сотрудника", "Неизвестная ошибка")
 
@@ -1468,8 +1743,7 @@ ID задачи: {task_id}
             logger.debug("Валидация данных проекта пройдена")
 
             # Проверяем наличие клиентов
-            cursor.execute("SELECT client_id, client_name FROM clients")
-            clients = cursor.fetchall()
+            clients = db.fetch_all("SELECT client_id, client_name FROM clients")
             if not clients:
                 logger.warning("Попытка добавить проект без существующих клиентов")
                 QMessageBox.warning(self, "Предупреждение",
@@ -1504,7 +1778,7 @@ ID задачи: {task_id}
                 QMessageBox.information(self, "Успех",
                                         f"Проект '{name}' успешно добавлен для клиента!")
                 self.ui.line_project_name.clear()
-                self.load_projects()
+                self.refresh_rows("projects", [project.id])
             else:
                 raise DatabaseError("добавление проекта", "Неизвестная ошибка")
         except ValidationError as e:
@@ -1532,8 +1806,7 @@ ID задачи: {task_id}
             logger.debug("Валидация описания задачи пройдена")
 
             # Проверяем наличие проектов
-            cursor.execute("SELECT project_id, project_name FROM project")
-            projects = cursor.fetchall()
+            projects = db.fetch_all("SELECT project_id, project_name FROM project")
             if not projects:
                 logger.warning("Попытка добавить задачу без существующих проектов")
                 QMessageBox.warning(self, "Предупреждение",
@@ -1562,8 +1835,7 @@ ID задачи: {task_id}
             logger.debug("Валидация срока задачи относительно проекта пройдена")
 
             # Проверяем наличие сотрудников
-            cursor.execute("SELECT employee_id, employee_name, employee_position FROM employee")
-            employees = cursor.fetchall()
+            employees = db.fetch_all("SELECT employee_id, employee_name, employee_position FROM employee")
 
             employee_id = None
             if employees:
@@ -1600,7 +1872,7 @@ ID задачи: {task_id}
                 QMessageBox.information(self, "Успех",
                                         f"Задача '{description}' успешно добавлена!")
                 self.ui.line_task_description.clear()
-                self.load_tasks()
+                self.refresh_rows("tasks", [task.id])
             else:
                 raise DatabaseError("добавление задачи", "Неизвестная ошибка")
         except ValidationError as e:
@@ -1615,30 +1887,20 @@ ID задачи: {task_id}
 
     def delete_client(self):
         logger.debug("Попытка удаления клиента")
-        selected_row = self.ui.table_clients.currentRow()
+        selected_row = self.ui.table_clients.currentIndex().row()
         if selected_row < 0:
             logger.warning("Попытка удалить клиента без выбора строки")
             QMessageBox.warning(self, "Предупреждение",
                                 "Выберите клиента для удаления!")
             return
 
-        client_id = self.ui.table_clients.item(selected_row, 0).text()
-        client_name = self.ui.table_clients.item(selected_row, 1).text()
+        client_id = self.models["clients"].text(selected_row, 0)
+        client_name = self.models["clients"].text(selected_row, 1)
         logger.debug(f"Выбран клиент для удаления: ID={client_id}, Имя={client_name}")
 
         try:
-            # Проверяем наличие связанных проектов
-            cursor.execute("SELECT COUNT(*) FROM project WHERE project_client = %s", (client_id,))
-            project_count = cursor.fetchone()[0]
-
-            # Проверяем наличие задач в проектах клиента
-            cursor.execute("""
-                           SELECT COUNT(*)
-                           FROM task t
-                                    INNER JOIN project p ON t.task_project = p.project_id
-                           WHERE p.project_client = %s
-                           """, (client_id,))
-            task_count = cursor.fetchone()[0]
+            # Проверяем наличие связанных проектов и задач в них (одним запросом)
+            project_count, task_count = client_dependents(db, client_id)
 
             if project_count > 0 or task_count > 0:
                 reply = QMessageBox.question(
@@ -1663,27 +1925,30 @@ ID задачи: {task_id}
                 )
 
             if reply == QMessageBox.Yes:
-                # Удаляем в правильном порядке: задачи → проекты → клиент
-
-                # 1. Удаляем задачи из проектов клиента
-                if task_count > 0:
-                    cursor.execute("""
-                                   DELETE
-                                   FROM task
-                                   WHERE task_project IN (SELECT project_id
-                                                          FROM project
-                                                          WHERE project_client = %s)
-                                   """, (client_id,))
-                    logger.info(f"Удалено {task_count} задач(и) клиента ID={client_id}")
-
-                # 2. Удаляем проекты клиента
-                if project_count > 0:
-                    cursor.execute("DELETE FROM project WHERE project_client = %s", (client_id,))
-                    logger.info(f"Удалено {project_count} проект(ов) клиента ID={client_id}")
-
-                # 3. Удаляем самого клиента
-                cursor.execute("DELETE FROM clients WHERE client_id = %s", (client_id,))
-                conn.commit()
+                # Удаляем в правильном порядке: задачи → проекты → клиент (одной транзакцией)
+                with db.transaction() as cur:
+                    # Запоминаем удаляемые строки, чтобы убрать из таблиц только их
+                    project_ids, task_ids = client_dependent_ids(cur, client_id)
+                    project_count, task_count = len(project_ids), len(task_ids)
+
+                    # 1. Удаляем задачи из проектов клиента
+                    if task_count > 0:
+                        cur.execute("""
+                                    DELETE
+                                    FROM task
+                                    WHERE task_project IN (SELECT project_id
+                                                           FROM project
+                                                           WHERE project_client = %s)
+                                    """, (client_id,))
+                        logger.info(f"Удалено {task_count} задач(и) клиента ID={client_id}")
+
+                    # 2. Удаляем проекты клиента
+                    if project_count > 0:
+                        cur.execute("DELETE FROM project WHERE project_client = %s", (client_id,))
+                        logger.info(f"Удалено {project_count} проект(ов) клиента ID={client_id}")
+
+                    # 3. Удаляем самого клиента
+                    cur.execute("DELETE FROM clients WHERE client_id = %s", (client_id,))
 
                 logger.info(f"Клиент успешно удален: ID={client_id}, Имя={client_name}")
 
@@ -1696,9 +1961,9 @@ ID задачи: {task_id}
                         summary += f"\n  • Задач: {task_count}"
 
                 QMessageBox.information(self, "Успех", summary)
-                self.load_clients()
-                self.load_projects()
-                self.load_tasks()
+                self.remove_rows("clients", [client_id])
+                self.remove_rows("projects", project_ids)
+                self.remove_rows("tasks", task_ids)
             else:
                 logger.debug(f"Удаление клиента ID={client_id} отменено пользователем")
 
@@ -1708,15 +1973,15 @@ ID задачи: {task_id}
 
     def delete_employee(self):
         logger.debug("Попытка удаления сотрудника")
-        selected_row = self.ui.table_employees.currentRow()
+        selected_row = self.ui.table_employees.currentIndex().row()
         if selected_row < 0:
             logger.warning("Попытка удалить сотрудника без выбора строки")
             QMessageBox.warning(self, "Предупреждение",
                                 "Выберите сотрудника для удаления!")
             return
 
-        employee_id = self.ui.table_employees.item(selected_row, 0).text()
-        employee_name = self.ui.table_employees.item(selected_row, 1).text()
+        employee_id = self.models["employees"].text(selected_row, 0)
+        employee_name = self.models["employees"].text(selected_row, 1)
         logger.debug(f"Выбран сотрудник для удаления: ID={employee_id}, Имя={employee_name}")
 
         reply = QMessageBox.question(
@@ -1730,11 +1995,14 @@ ID задачи: {task_id}
 
         if reply == QMessageBox.Yes:
             try:
-                cursor.execute("DELETE FROM employee WHERE employee_id = %s", (employee_id,))
-                conn.commit()
+                # Задачи сотрудника после удаления останутся без исполнителя (ON DELETE SET NULL)
+                task_ids = [row[0] for row in db.fetch_all(
+                    "SELECT task_id FROM task WHERE task_assigned_employee = %s", (employee_id,))]
+                db.execute("DELETE FROM employee WHERE employee_id = %s", (employee_id,))
                 logger.info(f"Сотрудник успешно удален: ID={employee_id}, Имя={employee_name}")
                 QMessageBox.information(self, "Успех", "Сотрудник удален!")
-                self.load_employees()
+                self.remove_rows("employees", [employee_id])
+                self.refresh_rows("tasks", task_ids)
             except mysql.connector.Error as err:
                 logger.error(f"Ошибка удаления сотрудника ID={employee_id}: {err}")
                 QMessageBox.critical(self, "Ошибка", f"Ошибка удаления: {err}")
@@ -1743,21 +2011,20 @@ ID задачи: {task_id}
 
     def delete_project(self):
         logger.debug("Попытка удаления проекта")
-        selected_row = self.ui.table_projects.currentRow()
+        selected_row = self.ui.table_projects.currentIndex().row()
         if selected_row < 0:
             logger.warning("Попытка удалить проект без выбора строки")
             QMessageBox.warning(self, "Предупреждение",
                                 "Выберите проект для удаления!")
             return
 
-        project_id = self.ui.table_projects.item(selected_row, 0).text()
-        project_name = self.ui.table_projects.item(selected_row, 1).text()
+        project_id = self.models["projects"].text(selected_row, 0)
+        project_name = self.models["projects"].text(selected_row, 1)
         logger.debug(f"Выбран проект для удаления: ID={project_id}, Название={project_name}")
 
         try:
             # Проверяем наличие связанных задач
-            cursor.execute("SELECT COUNT(*) FROM task WHERE task_project = %s", (project_id,))
-            task_count = cursor.fetchone()[0]
+            task_count = db.fetch_value("SELECT COUNT(*) FROM task WHERE task_project = %s", (project_id,))
 
             if task_count > 0:
                 reply = QMessageBox.question(
@@ -1780,20 +2047,23 @@ ID задачи: {task_id}
                 )
 
             if reply == QMessageBox.Yes:
-                # Сначала удаляем все задачи проекта
-                if task_count > 0:
-                    cursor.execute("DELETE FROM task WHERE task_project = %s", (project_id,))
-                    logger.info(f"Удалено {task_count} задач(и) проекта ID={project_id}")
+                with db.transaction() as cur:
+                    cur.execute("SELECT task_id FROM task WHERE task_project = %s", (project_id,))
+                    task_ids = [row[0] for row in cur.fetchall()]
+
+                    # Сначала удаляем все задачи проекта
+                    if task_count > 0:
+                        cur.execute("DELETE FROM task WHERE task_project = %s", (project_id,))
+                        logger.info(f"Удалено {task_count} задач(и) проекта ID={project_id}")
 
-                # Затем удаляем сам проект
-                cursor.execute("DELETE FROM project WHERE project_id = %s", (project_id,))
-                conn.commit()
+                    # Затем удаляем сам проект
+                    cur.execute("DELETE FROM project WHERE project_id = %s", (project_id,))
 
                 logger.info(f"Проект успешно удален: ID={project_id}, Название={project_name}")
                 QMessageBox.information(self, "Успех",
                                         f"Проект удален!\n{'Также удалено задач: ' + str(task_count) if task_count > 0 else ''}")
-                self.load_projects()
-                self.load_tasks()  # Обновляем таблицу задач
+                self.remove_rows("projects", [project_id])
+                self.remove_rows("tasks", task_ids)  # Обновляем таблицу задач
             else:
                 logger.debug(f"Удаление проекта ID={project_id} отменено пользователем")
 
@@ -1803,15 +2073,15 @@ ID задачи: {task_id}
 
     def delete_task(self):
         logger.debug("Попытка удаления задачи")
-        selected_row = self.ui.table_tasks.currentRow()
+        selected_row = self.ui.table_tasks.currentIndex().row()
         if selected_row < 0:
             logger.warning("Попытка удалить задачу без выбора строки")
             QMessageBox.warning(self, "Предупреждение",
                                 "Выберите задачу для удаления!")
             return
 
-        task_id = self.ui.table_tasks.item(selected_row, 0).text()
-        task_desc = self.ui.table_tasks.item(selected_row, 1).text()
+        task_id = self.models["tasks"].text(selected_row, 0)
+        task_desc = self.models["tasks"].text(selected_row, 1)
         logger.debug(f"Выбрана задача для удаления: ID={task_id}, Описание={task_desc}")
 
         reply = QMessageBox.question(
@@ -1825,11 +2095,10 @@ ID задачи: {task_id}
 
         if reply == QMessageBox.Yes:
             try:
-                cursor.execute("DELETE FROM task WHERE task_id = %s", (task_id,))
-                conn.commit()
+                db.execute("DELETE FROM task WHERE task_id = %s", (task_id,))
                 logger.info(f"Задача успешно удалена: ID={task_id}, Описание={task_desc}")
                 QMessageBox.information(self, "Успех", "Задача удалена!")
-                self.load_tasks()
+                self.remove_rows("tasks", [task_id])
             except mysql.connector.Error as err:
                 logger.error(f"Ошибка удаления задачи ID={task_id}: {err}")
                 QMessageBox.critical(self, "Ошибка", f"Ошибка удаления: {err}")
@@ -1837,245 +2106,169 @@ ID задачи: {task_id}
             logger.debug(f"Удаление задачи ID={task_id} отменено пользователем")
 
     def search_clients(self):
-        search_text = self.ui.line_search_client.text().strip()
-        logger.debug(f"Поиск клиентов по запросу: '{search_text}'")
-
-        if not search_text:
-            logger.debug("Поисковый запрос пуст, загрузка всех клиентов")
-            self.load_clients()
-            return
-
-        try:
-            # Поиск по ID, имени или контакту
-            sql = "SELECT * FROM clients WHERE client_id = %s OR client_name LIKE %s OR client_contact LIKE %s"
-            cursor.execute(sql, (search_text if search_text.isdigit() else None, f"%{search_text}%", f"%{search_text}%"))
-            clients = cursor.fetchall()
-            logger.info(f"Найдено клиентов по запросу '{search_text}': {len(clients)}")
-
-            self.ui.table_clients.setRowCount(len(clients))
-            for row_idx, client in enumerate(clients):
-                for col_idx, value in enumerate(client):
-                    self.ui.table_clients.setItem(row_idx, col_idx,
-                                                  QTableWidgetItem(str(value)))
-            self.ui.table_clients.resizeColumnsToContents()
-        except mysql.connector.Error as err:
-            logger.error(f"Ошибка поиска клиентов: {err}")
-            QMessageBox.warning(self, "Ошибка", f"Ошибка поиска: {err}")
+        self.search_controller.schedule("clients", self.ui.line_search_client.text())
 
     def search_employees(self):
-        search_text = self.ui.line_search_employee.text().strip()
-        logger.debug(f"Поиск сотрудников по запросу: '{search_text}'")
-
-        if not search_text:
-            logger.debug("Поисковый запрос пуст, загрузка всех сотрудников")
-            self.load_employees()
-            return
-
-        try:
-            # Поиск по ID, имени или должности
-            sql = "SELECT * FROM employee WHERE employee_id = %s OR employee_name LIKE %s OR employee_position LIKE %s"
-            cursor.execute(sql, (search_text if search_text.isdigit() else None, f"%{search_text}%", f"%{search_text}%"))
-            employees = cursor.fetchall()
-            logger.info(f"Найдено сотрудников по запросу '{search_text}': {len(employees)}")
-
-            self.ui.table_employees.setRowCount(len(employees))
-            for row_idx, employee in enumerate(employees):
-                for col_idx, value in enumerate(employee):
-                    self.ui.table_employees.setItem(row_idx, col_idx,
-                                                    QTableWidgetItem(str(value)))
-            self.ui.table_employees.resizeColumnsToContents()
-        except mysql.connector.Error as err:
-            logger.error(f"Ошибка поиска сотрудников: {err}")
-            QMessageBox.warning(self, "Ошибка", f"Ошибка поиска: {err}")
+        self.search_controller.schedule("employees", self.ui.line_search_employee.text())
 
     def search_projects(self):
-        search_text = self.ui.line_search_project.text().strip()
-        logger.debug(f"Поиск проектов по запросу: '{search_text}'")
-
-        if not search_text:
-            logger.debug("Поисковый запрос пуст, загрузка всех проектов")
-            self.load_projects()
-            return
-
-        try:
-            # Поиск по ID проекта, названию или ID клиента
-            sql = "SELECT * FROM project WHERE project_id = %s OR project_name LIKE %s OR project_client = %s"
-            cursor.execute(sql, (search_text if search_text.isdigit() else None, f"%{search_text}%", search_text if search_text.isdigit() else None))
-            projects = cursor.fetchall()
-            logger.info(f"Найдено проектов по запросу '{search_text}': {len(projects)}")
-
-            self.ui.table_projects.setRowCount(len(projects))
-            for row_idx, project in enumerate(projects):
-                for col_idx, value in enumerate(project):
-                    self.ui.table_projects.setItem(row_idx, col_idx,
-                                                   QTableWidgetItem(str(value)))
-            self.ui.table_projects.resizeColumnsToContents()
-        except mysql.connector.Error as err:
-            logger.error(f"Ошибка поиска проектов: {err}")
-            QMessageBox.warning(self, "Ошибка", f"Ошибка поиска: {err}")
+        self.search_controller.schedule("projects", self.ui.line_search_project.text())
 
     def search_tasks(self):
-        search_text = self.ui.line_search_task.text().strip()
-        logger.debug(f"Поиск задач по запросу: '{search_text}'")
+        self.search_controller.schedule("tasks", self.ui.line_search_task.text())
 
+    def on_search_triggered(self, key, search_text):
+        logger.debug(f"Поиск ({TABLE_LABELS[key]}) по запросу: '{search_text}'")
         if not search_text:
-            logger.debug("Поисковый запрос пуст, загрузка всех задач")
-            self.load_tasks()
+            logger.debug(f"Поисковый запрос пуст, загрузка всех {TABLE_LABELS[key]}")
+            self.load_table(key)
             return
-
-        try:
-            # Поиск по ID задачи, описанию, статусу или ID проекта
-            sql = "SELECT * FROM task WHERE task_id = %s OR task_description LIKE %s OR task_status LIKE %s OR task_project = %s"
-            cursor.execute(sql, (search_text if search_text.isdigit() else None, f"%{search_text}%", f"%{search_text}%", search_text if search_text.isdigit() else None))
-            tasks = cursor.fetchall()
-            logger.info(f"Найдено задач по запросу '{search_text}': {len(tasks)}")
-
-            self.ui.table_tasks.setRowCount(len(tasks))
-            for row_idx, task in enumerate(tasks):
-                for col_idx, value in enumerate(task):
-                    self.ui.table_tasks.setItem(row_idx, col_idx,
-                                                QTableWidgetItem(str(value)))
-            self.ui.table_tasks.resizeColumnsToContents()
-        except mysql.connector.Error as err:
-            logger.error(f"Ошибка поиска задач: {err}")
-            QMessageBox.warning(self, "Ошибка", f"Ошибка поиска: {err}")
+        index = self.search_indexes.get(key)
+        if index is not None:
+            self.search_local(key, index, search_text)
+            return
+        # Поиск выполняется в фоне; незавершенный предыдущий поиск или загрузка по этой таблице отменяется.
+        # Способ поиска (индекс FULLTEXT или LIKE) выбирается по наличию индекса в БД
+        select, pk = TABLE_QUERIES[key]
+        sql, params, backend = self.search_backend.query(key, select, pk, search_text)
+        self._load_modes[key] = "search"
+        self._search_backends_used[key] = backend
+        self.loader.start(key, sql, params, sink=self.models[key].new_store())
+
+    def search_local(self, key, index, search_text):
+        # Поиск по локальному индексу, без обращения к серверу БД
+        self.loader.cancel(key)
+        started = time.perf_counter()
+        rows = index.rows(index.search(search_text))
+        elapsed = (time.perf_counter() - started) * 1000
+        self.models[key].set_rows(rows)
+        self.table_widget(key).resizeColumnsToContents()
+        self.update_tab_title(key)
+        logger.info(f"Найдено {TABLE_LABELS[key]} по запросу '{search_text}' (index): {len(rows)} за {elapsed:.2f} мс")
+        self.statusBar().showMessage(f"Поиск {TABLE_LABELS[key]}: {len(rows)} (index, {elapsed:.1f} мс)", 5000)
 
     def export_to_excel(self):
         logger.info("Начало экспорта данных в Excel")
-        file_path, _ = QFileDialog.getSaveFileName(self, "Сохранить в Excel", "", "Excel Files (*.xlsx)")
+        # Кроме Excel доступны CSV, Parquet и Arrow IPC (по файлу на таблицу)
+        filters = ";;".join(file_filter for file_filter, _ in EXPORT_FORMATS.values())
+        file_path, selected_filter = QFileDialog.getSaveFileName(self, "Сохранить в Excel", "", filters)
         if not file_path:
             logger.debug("Экспорт в Excel отменен пользователем")
             return
 
-        logger.debug(f"Выбран файл для экспорта: {file_path}")
+        export_format, file_path = exporter_for(file_path, selected_filter)
+        logger.debug(f"Выбран файл для экспорта: {file_path} (формат {export_format})")
 
-        try:
-            with pd.ExcelWriter(file_path) as writer:
-                # Клиенты
-                cursor.execute("SELECT * FROM clients")
-                clients = cursor.fetchall()
-                df_clients = pd.DataFrame(clients, columns=['ID', 'Имя', 'Контакт'])
-                df_clients.to_excel(writer, sheet_name='Клиенты', index=False)
-                logger.debug(f"Экспортировано клиентов: {len(clients)}")
-
-                # Сотрудники
-                cursor.execute("SELECT * FROM employee")
-                employees = cursor.fetchall()
-                df_employees = pd.DataFrame(employees, columns=['ID', 'Имя', 'Должность'])
-                df_employees.to_excel(writer, sheet_name='Сотрудники', index=False)
-                logger.debug(f"Экспортировано сотрудников: {len(employees)}")
-
-                # Проекты
-                cursor.execute("SELECT * FROM project")
-                projects = cursor.fetchall()
-                df_projects = pd.DataFrame(projects, columns=['ID', 'Название', 'Клиент', 'Начало', 'Окончание'])
-                df_projects.to_excel(writer, sheet_name='Проекты', index=False)
-                logger.debug(f"Экспортировано проектов: {len(projects)}")
-
-                # Задачи - ИСПРАВЛЕНО: добавлен столбец "Исполнитель"
-                cursor.execute("SELECT * FROM task")
-                tasks = cursor.fetchall()
-                df_tasks = pd.DataFrame(tasks, columns=['ID', 'Описание', 'Проект', 'Срок', 'Статус', 'Исполнитель'])
-                df_tasks.to_excel(writer, sheet_name='Задачи', index=False)
-                logger.debug(f"Экспортировано задач: {len(tasks)}")
-
-            logger.info(f"Данные успешно экспортированы в Excel: {file_path}")
-            QMessageBox.information(self, "Успех", "Данные экспортированы в Excel!")
-        except Exception as e:
-            logger.error(f"Ошибка экспорта в Excel: {e}")
-            QMessageBox.critical(self, "Ошибка", f"Ошибка экспорта: {e}")
+        # Строки читаются с сервера порциями и сразу пишутся в файл
+        self.exporter = EXPORTERS[export_format](db, parallel=PARALLEL_EXPORT, read_lock=EXPORT_READ_LOCK)
+        self.start_file_job(self.exporter, self.exporter.export, file_path, "Экспорт",
+                            self.on_export_finished, self.on_export_failed)
+
+    def on_export_finished(self, counts):
+        self.finish_file_job()
+        if counts is None:
+            logger.info("Экспорт в Excel отменен пользователем")
+            return
+        summary = "\n".join(f"{sheet}: {count}" for sheet, count in counts.items())
+        logger.info(f"Данные успешно экспортированы ({self.exporter.format_name}): {', '.join(summary.splitlines())}")
+        QMessageBox.information(self, "Успех", f"Данные экспортированы ({self.exporter.format_name})!\n\n{summary}")
+
+    def on_export_failed(self, message):
+        self.finish_file_job()
+        logger.error(f"Ошибка экспорта ({self.exporter.format_name}): {message}")
+        QMessageBox.critical(self, "Ошибка", f"Ошибка экспорта: {message}")
 
     def import_from_excel(self):
         logger.info("Начало импорта данных из Excel")
-        file_path, _ = QFileDialog.getOpenFileName(self, "Открыть Excel", "", "Excel Files (*.xlsx)")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Открыть файл для импорта", "",
+                                                   "Excel Files (*.xlsx);;CSV (*.csv)")
         if not file_path:
             logger.debug("Импорт из Excel отменен пользователем")
             return
 
         logger.debug(f"Выбран файл для импорта: {file_path}")
 
-        try:
-            xls = pd.ExcelFile(file_path)
-            imported_counts = {'Клиенты': 0, 'Сотрудники': 0, 'Проекты': 0, 'Задачи': 0}
-            error_counts = {'Клиенты': 0, 'Сотрудники': 0, 'Проекты': 0, 'Задачи': 0}
-
-            # Клиенты
-            if 'Клиенты' in xls.sheet_names:
-                df_clients = pd.read_excel(xls, 'Клиенты')
-                for idx, row in df_clients.iterrows():
-                    try:
-                        client = Client(name=row['Имя'], contact=row['Контакт'])
-                        if client.save_to_db():
-                            imported_counts['Клиенты'] += 1
-                    except Exception as e:
-                        error_counts['Клиенты'] += 1
-                        logger.warning(f"Ошибка импорта клиента (строка {idx + 2}): {e}")
-                logger.info(f"Импортировано клиентов: {imported_counts['Клиенты']}, ошибок: {error_counts['Клиенты']}")
-
-            # Сотрудники
-            if 'Сотрудники' in xls.sheet_names:
-                df_employees = pd.read_excel(xls, 'Сотрудники')
-                for idx, row in df_employees.iterrows():
-                    try:
-                        employee = Employee(name=row['Имя'], position=row['Должность'])
-                        if employee.save_to_db():
-                            imported_counts['Сотрудники'] += 1
-                    except Exception as e:
-                        error_counts['Сотрудники'] += 1
-                        logger.warning(f"Ошибка импорта сотрудника (строка {idx + 2}): {e}")
-                logger.info(
-                    f"Импортировано сотрудников: {imported_counts['Сотрудники']}, ошибок: {error_counts['Сотрудники']}")
-
-            # Проекты
-            if 'Проекты' in xls.sheet_names:
-                df_projects = pd.read_excel(xls, 'Проекты')
-                for idx, row in df_projects.iterrows():
-                    try:
-                        project = Project(name=row['Название'], client_id=row['Клиент'],
-                                          start_date=row['Начало'], end_date=row['Окончание'])
-                        if project.save_to_db():
-                            imported_counts['Проекты'] += 1
-                    except Exception as e:
-                        error_counts['Проекты'] += 1
-                        logger.warning(f"Ошибка импорта проекта (строка {idx + 2}): {e}")
-                logger.info(f"Импортировано проектов: {imported_counts['Проекты']}, ошибок: {error_counts['Проекты']}")
-
-            # Задачи
-            if 'Задачи' in xls.sheet_names:
-                df_tasks = pd.read_excel(xls, 'Задачи')
-                for idx, row in df_tasks.iterrows():
-                    try:
-                        employee_id = row.get('Исполнитель', None)
-                        if pd.isna(employee_id):
-                            employee_id = None
-                        else:
-                            employee_id = int(employee_id)
-                        task = Task(description=row['Описание'], project_id=row['Проект'],
-                                    due_date=row['Срок'], status=row['Статус'], employee_id=employee_id)
-                        if task.save_to_db():
-                            imported_counts['Задачи'] += 1
-                    except Exception as e:
-                        error_counts['Задачи'] += 1
-                        logger.warning(f"Ошибка импорта задачи (строка {idx + 2}): {e}")
-                logger.info(f"Импортировано задач: {imported_counts['Задачи']}, ошибок: {error_counts['Задачи']}")
-
-            self.load_all_data()
-
-            total_errors = sum(error_counts.values())
-            summary = "\n".join([f"{key}: {value}" for key, value in imported_counts.items()])
-
-            if total_errors > 0:
-                logger.warning(f"Импорт завершен с ошибками. Всего ошибок: {total_errors}")
-                QMessageBox.warning(self, "Импорт завершен с ошибками",
-                                    f"Импортировано:\n{summary}\n\nОшибок: {total_errors}\nПодробности в project_manager.log")
-            else:
-                logger.info(f"Импорт успешно завершен без ошибок")
-                QMessageBox.information(self, "Успех", f"Данные импортированы из Excel!\n\n{summary}")
+        # Импорт выполняется в рабочем потоке: листы проверяются и вставляются пачками
+        # (или загружаются через LOAD DATA), по одной транзакции на лист; большие файлы читаются потоково.
+        # CSV - файлы таблиц в формате экспорта
+        importer_class = BulkImporter if BULK_IMPORT_ENABLED else ExcelImporter
+        self.importer = importer_class(db, upsert=UPSERT_IMPORT)
+        action = self.importer.import_csv if file_path.lower().endswith(".csv") else self.importer.import_file
+        self.start_file_job(self.importer, action, file_path, "Импорт",
+                            self.on_import_finished, self.on_import_failed)
+
+    def start_file_job(self, job, action, file_path, title, on_finished, on_failed, part="листа"):
+        # Импорт/экспорт файла в рабочем потоке с окном прогресса и кнопкой отмены.
+        # part - как называть в окне прогресса части работы (листы файла, разделы отчета)
+        self.file_job = FileJobWorker(job, action, file_path)
+        self.file_job_title = title
+        self.file_job_part = part
+        self.file_job.signals.progress.connect(self.on_file_job_progress)
+        self.file_job.signals.finished.connect(on_finished)
+        self.file_job.signals.failed.connect(on_failed)
+
+        self.file_job_progress = QProgressDialog(f"{title}...", "Отмена", 0, 0, self)
+        self.file_job_progress.setWindowTitle(title)
+        self.file_job_progress.setWindowModality(Qt.WindowModal)
+        self.file_job_progress.setMinimumDuration(0)
+        self.file_job_progress.setAutoReset(False)
+        self.file_job_progress.setAutoClose(False)
+        self.file_job_progress.canceled.connect(self.file_job.cancel)
+        self.file_job_progress.show()
+        QThreadPool.globalInstance().start(self.file_job)
+
+    def on_file_job_progress(self, sheet, done, total):
+        # total = 0: общее число строк неизвестно, индикатор показывает только ход работы
+        if total:
+            self.file_job_progress.setLabelText(
+                f"{self.file_job_title} {self.file_job_part} '{sheet}': {done} из {total} строк")
+        else:
+            self.file_job_progress.setLabelText(f"{self.file_job_title} {self.file_job_part} '{sheet}': {done} строк")
+        self.file_job_progress.setMaximum(total)
+        self.file_job_progress.setValue(done)
+
+    def finish_file_job(self):
+        self.file_job_progress.canceled.disconnect()
+        self.file_job_progress.close()
+        self.file_job = None
+
+    def on_import_finished(self, results):
+        self.finish_file_job()
+        imported_counts = {sheet: 0 for sheet, _, _, _ in IMPORT_SHEETS}
+        error_counts = {sheet: 0 for sheet, _, _, _ in IMPORT_SHEETS}
+        for sheet, result in results.items():
+            imported_counts[sheet] = result.imported
+            error_counts[sheet] = result.error_count
+
+            # Добавляем в таблицы только импортированные строки (ID не меньше первого вставленного)
+            if result.first_id is not None:
+                self.refresh_imported_rows(result.key, result.first_id, result.imported)
+            self.refresh_rows(result.key, result.updated_ids)
+
+        total_errors = sum(error_counts.values())
+        summary = "\n".join([f"{key}: {value}" for key, value in imported_counts.items()])
+        if self.importer.upsert:
+            updated = sum(len(result.updated_ids) for result in results.values())
+            unchanged = sum(result.unchanged for result in results.values())
+            summary += f"\n\nОбновлено: {updated}\nБез изменений: {unchanged}"
+
+        if self.importer.cancelled:
+            logger.warning("Импорт из Excel прерван пользователем")
+            QMessageBox.warning(self, "Импорт прерван",
+                                f"Импорт прерван, незавершенный лист отменен.\n\nИмпортировано:\n{summary}")
+        elif total_errors > 0:
+            logger.warning(f"Импорт завершен с ошибками. Всего ошибок: {total_errors}")
+            QMessageBox.warning(self, "Импорт завершен с ошибками",
+                                f"Импортировано:\n{summary}\n\nОшибок: {total_errors}\nПодробности в project_manager.log")
+        else:
+            logger.info(f"Импорт успешно завершен без ошибок")
+            QMessageBox.information(self, "Успех", f"Данные импортированы из Excel!\n\n{summary}")
 
-        except Exception as e:
-            logger.error(f"Критическая ошибка импорта из Excel: {e}")
-            QMessageBox.critical(self, "Ошибка",
-                                 f"Критическая ошибка импорта:\n{e}\n\nПроверьте структуру файла Excel.")
+    def on_import_failed(self, message):
+        self.finish_file_job()
+        logger.error(f"Критическая ошибка импорта из Excel: {message}")
+        QMessageBox.critical(self, "Ошибка",
+                             f"Критическая ошибка импорта:\n{message}\n\nПроверьте структуру файла Excel.")
 
     def report_projects_by_client(self):
         # Отчет: Перечень проектов для определённого клиента
@@ -2084,8 +2277,7 @@ ID задачи: {task_id}
         from PySide6.QtWidgets import QInputDialog
 
         # Получаем список клиентов
-        cursor.execute("SELECT client_id, client_name FROM clients ORDER BY client_name")
-        clients = cursor.fetchall()
+        clients = db.fetch_all("SELECT client_id, client_name FROM clients ORDER BY client_name")
 
         if not clients:
             QMessageBox.warning(self, "Нет данных", "В базе нет клиентов")
@@ -2106,16 +2298,31 @@ ID задачи: {task_id}
             client_id = clients[client_names.index(client_str)][0]
             client_name = clients[client_names.index(client_str)][1]
 
-            # Получаем проекты клиента
-            cursor.execute(
-                """SELECT project_id, project_name, project_start_date, project_end_date
-                   FROM project
-                   WHERE project_client = %s""",
-                (client_id,)
-            )
-            projects = cursor.fetchall()
+            def build():
+                # Получаем проекты клиента
+                projects = db.fetch_all(
+                    """SELECT project_id, project_name, project_start_date, project_end_date
+                       FROM project
+                       WHERE project_client = %s""",
+                    (client_id,)
+                )
 
-            if not projects:
+                if not projects:
+                    return None
+
+                # Формируем отчет
+                report = f"📊 ОТЧЕТ: Проекты клиента '{client_name}'\n\n"
+                report += f"Всего проектов: {len(projects)}\n\n"
+
+                for idx, proj in enumerate(projects, 1):
+                    report += f"{idx}. {proj[1]}\n"
+                    report += f"   ID: {proj[0]}\n"
+                    report += f"   Период: {proj[2]} — {proj[3]}\n\n"
+                logger.info(f"Отчет по проектам клиента {client_name} сформирован: {len(projects)} проектов")
+                return report
+
+            report = self.report_cache.text("projects_by_client", (client_id, client_name), ("project",), build)
+            if report is None:
                 QMessageBox.information(
                     self,
                     "Результат",
@@ -2123,18 +2330,8 @@ ID задачи: {task_id}
                 )
                 return
 
-            # Формируем отчет
-            report = f"📊 ОТЧЕТ: Проекты клиента '{client_name}'\n\n"
-            report += f"Всего проектов: {len(projects)}\n\n"
-
-            for idx, proj in enumerate(projects, 1):
-                report += f"{idx}. {proj[1]}\n"
-                report += f"   ID: {proj[0]}\n"
-                report += f"   Период: {proj[2]} — {proj[3]}\n\n"
-
             dialog = ReportDialog("Отчет: Проекты клиента", report, self)
             dialog.exec()
-            logger.info(f"Отчет по проектам клиента {client_name} сформирован: {len(projects)} проектов")
 
     def report_overdue_projects(self):
         # Отчет: Проекты с нарушением сроков выполнения задач
@@ -2144,23 +2341,26 @@ ID задачи: {task_id}
 
         current_date = QDate.currentDate().toString("yyyy-MM-dd")
 
-        # Находим проекты, в которых есть просроченные задачи
-        cursor.execute(
-            """SELECT DISTINCT p.project_id,
-                               p.project_name,
-                               p.project_end_date,
-                               COUNT(t.task_id) as overdue_tasks
-               FROM project p
-                        INNER JOIN task t ON p.project_id = t.task_project
-               WHERE t.task_due_date < %s
-                 AND t.task_status != 'completed'
-               GROUP BY p.project_id, p.project_name, p.project_end_date
-               ORDER BY overdue_tasks DESC""",
-            (current_date,)
-        )
-        overdue_projects = cursor.fetchall()
+        def build():
+            # Находим проекты, в которых есть просроченные задачи
+            projects = overdue_projects(db, current_date, self.summary_tables.installed())
 
-        if not overdue_projects:
+            if not projects:
+                return None
+
+            # Формируем отчет
+            report = f"⚠️ ОТЧЕТ: Проекты с нарушением сроков\n\n"
+            report += f"Всего проектов с просрочками: {len(projects)}\n\n"
+
+            for idx, proj in enumerate(projects, 1):
+                report += f"{idx}. {proj[1]} (ID: {proj[0]})\n"
+                report += f"   Дедлайн проекта: {proj[2]}\n"
+                report += f"   Просроченных задач: {proj[3]}\n\n"
+            logger.info(f"Отчет по просроченным проектам: {len(projects)} проектов")
+            return report
+
+        report = self.report_cache.text("overdue_projects", (current_date,), ("project", "task"), build)
+        if report is None:
             QMessageBox.information(
                 self,
                 "Отчет",
@@ -2168,18 +2368,8 @@ ID задачи: {task_id}
             )
             return
 
-        # Формируем отчет
-        report = f"⚠️ ОТЧЕТ: Проекты с нарушением сроков\n\n"
-        report += f"Всего проектов с просрочками: {len(overdue_projects)}\n\n"
-
-        for idx, proj in enumerate(overdue_projects, 1):
-            report += f"{idx}. {proj[1]} (ID: {proj[0]})\n"
-            report += f"   Дедлайн проекта: {proj[2]}\n"
-            report += f"   Просроченных задач: {proj[3]}\n\n"
-
         dialog = ReportDialog("⚠️ Отчет: Проекты с нарушением сроков", report, self)
         dialog.exec()
-        logger.info(f"Отчет по просроченным проектам: {len(overdue_projects)} проектов")
 
     def report_employees_on_project(self):
         # Отчет: Список сотрудников, занятых на определённом проекте (через задачи)
@@ -2188,8 +2378,7 @@ ID задачи: {task_id}
         from PySide6.QtWidgets import QInputDialog
 
         # Получаем список проектов
-        cursor.execute("SELECT project_id, project_name FROM project ORDER BY project_name")
-        projects = cursor.fetchall()
+        projects = db.fetch_all("SELECT project_id, project_name FROM project ORDER BY project_name")
 
         if not projects:
             QMessageBox.warning(self, "Нет данных", "В базе нет проектов")
@@ -2210,59 +2399,55 @@ ID задачи: {task_id}
             project_id = projects[project_names.index(project_str)][0]
             project_name = projects[project_names.index(project_str)][1]
 
-            # Получаем сотрудников, назначенных на задачи этого проекта
-            cursor.execute("""
-                           SELECT DISTINCT e.employee_id,
-                                           e.employee_name,
-                                           e.employee_position,
-                                           COUNT(t.task_id)                                             as task_count,
-                                           SUM(CASE WHEN t.task_status = 'completed' THEN 1 ELSE 0 END) as completed_tasks
-                           FROM employee e
-                                    INNER JOIN task t ON e.employee_id = t.task_assigned_employee
-                           WHERE t.task_project = %s
-                           GROUP BY e.employee_id, e.employee_name, e.employee_position
-                           ORDER BY e.employee_name
-                           """, (project_id,))
-            employees = cursor.fetchall()
-
-            # Получаем общую статистику по проекту
-            cursor.execute("SELECT COUNT(*) FROM task WHERE task_project = %s", (project_id,))
-            total_tasks = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM task WHERE task_project = %s AND task_assigned_employee IS NULL",
-                           (project_id,))
-            unassigned_tasks = cursor.fetchone()[0]
+            def build():
+                # Итоги проекта и задачи по сотрудникам - одним запросом
+                staff = project_staff(db, project_id)
+                staff = staff[0] if staff else ProjectStaff(project_id, project_name)
+                logger.info(f"Отчет по сотрудникам проекта {project_name}: {len(staff.employees)} назначенных")
+                return format_project_staff(staff)
 
-            # Формируем отчет
-            report = f"""👥 ОТЧЕТ: СОТРУДНИКИ НА ПРОЕКТЕ
-{'=' * 70}
+            report = self.report_cache.text("employees_on_project", (project_id, project_name),
+                                            ("project", "employee", "task"), build)
+            dialog = ReportDialog(f"Отчет: {project_name}", report, self)
+            dialog.exec()
 
-📁 Проект: {project_name}
-📊 Всего задач: {total_tasks}
-⚠️ Без назначения: {unassigned_tasks}
-👷 Назначенных сотрудников: {len(employees)}
+    def report_employees_all_projects(self):
+        # Отчет: Сотрудники на проекте - сразу по всем проектам, одним запросом
+        logger.info("Запуск отчета: Сотрудники на всех проектах")
 
-{'=' * 70}
-"""
+        def build():
+            projects = project_staff(db)
+            if not projects:
+                return None
+            logger.info(f"Отчет по сотрудникам всех проектов: {len(projects)} проектов")
+            return f"\n{'#' * 70}\n\n".join(format_project_staff(staff) for staff in projects)
 
-            if employees:
-                report += "\n🔹 СОТРУДНИКИ И ИХ ЗАДАЧИ:\n\n"
-                for idx, emp in enumerate(employees, 1):
-                    emp_id, emp_name, emp_pos, task_count, completed = emp
-                    completion = (completed * 100 // task_count) if task_count > 0 else 0
-                    report += f"{idx}. {emp_name} - {emp_pos}\n"
-                    report += f"   Задач: {task_count} (✓ {completed}, {completion}% завершено)\n\n"
-            else:
-                report += "\n⚠️ На этот проект пока не назначено ни одного сотрудника\n"
+        report = self.report_cache.text("employees_all_projects", (), ("project", "employee", "task"), build)
+        if report is None:
+            QMessageBox.warning(self, "Нет данных", "В базе нет проектов")
+            return
 
-            if unassigned_tasks > 0:
-                report += f"\n{'=' * 70}\n"
-                report += f"💡 РЕКОМЕНДАЦИЯ: Есть {unassigned_tasks} задач(а) без исполнителя.\n"
-                report += f"   Назначьте сотрудников через двойной клик по задаче.\n"
+        dialog = ReportDialog("Отчет: Сотрудники на всех проектах", report, self)
+        dialog.exec()
 
-            dialog = ReportDialog(f"Отчет: {project_name}", report, self)
-            dialog.exec()
-            logger.info(f"Отчет по сотрудникам проекта {project_name}: {len(employees)} назначенных")
+    def report_employee_open_tasks(self):
+        # Отчет: Открытые задачи сотрудников, самые загруженные сначала
+        logger.info("Запуск отчета: Открытые задачи сотрудников")
+
+        def build():
+            rows = employee_open_tasks(db, self.summary_tables.installed())
+            if not rows:
+                return None
+            logger.info(f"Отчет по открытым задачам сотрудников: {len(rows)} сотрудников")
+            return format_employee_open_tasks(rows)
+
+        report = self.report_cache.text("employee_open_tasks", (), ("employee", "task"), build)
+        if report is None:
+            QMessageBox.warning(self, "Нет данных", "В базе нет сотрудников")
+            return
+
+        dialog = ReportDialog("📌 Отчет: Открытые задачи сотрудников", report, self)
+        dialog.exec()
 
     def report_employee_workload(self):
         # Отчет: Загрузка сотрудника (задачи по проектам)
@@ -2271,8 +2456,7 @@ ID задачи: {task_id}
         from PySide6.QtWidgets import QInputDialog
 
         # Получаем список сотрудников
-        cursor.execute("SELECT employee_id, employee_name, employee_position FROM employee ORDER BY employee_name")
-        employees = cursor.fetchall()
+        employees = db.fetch_all("SELECT employee_id, employee_name, employee_position FROM employee ORDER BY employee_name")
 
         if not employees:
             QMessageBox.warning(self, "Нет данных", "В базе нет сотрудников")
@@ -2294,115 +2478,110 @@ ID задачи: {task_id}
             employee_name = employees[employee_names.index(employee_str)][1]
             employee_position = employees[employee_names.index(employee_str)][2]
 
-            # Получаем задачи сотрудника с информацией о проектах
-            cursor.execute("""
-                           SELECT t.task_id,
-                                  t.task_description,
-                                  t.task_due_date,
-                                  t.task_status,
-                                  p.project_name,
-                                  c.client_name
-                           FROM task t
-                                    INNER JOIN project p ON t.task_project = p.project_id
-                                    INNER JOIN clients c ON p.project_client = c.client_id
-                           WHERE t.task_assigned_employee = %s
-                           ORDER BY t.task_due_date
-                           """, (employee_id,))
-            tasks = cursor.fetchall()
-
-            # Статистика по задачам сотрудника
-            total_employee_tasks = len(tasks)
-            completed = sum(1 for t in tasks if t[3] == 'completed')
-            in_progress = sum(1 for t in tasks if t[3] == 'in progress')
-            pending = sum(1 for t in tasks if t[3] == 'pending')
-
-            # Группируем задачи по проектам
-            projects_dict = {}
-            for task in tasks:
-                proj_name = task[4]
-                if proj_name not in projects_dict:
-                    projects_dict[proj_name] = []
-                projects_dict[proj_name].append(task)
-
-            # Формируем отчёт
-            report = f"""💼 ОТЧЁТ: ЗАГРУЗКА СОТРУДНИКА
-{'=' * 70}
-
-👤 ИНФОРМАЦИЯ:
-ID: {employee_id}
-Имя: {employee_name}
-Должность: {employee_position}
-
-{'=' * 70}
-📊 СТАТИСТИКА СОТРУДНИКА:
-{'=' * 70}
-Всего задач: {total_employee_tasks}
-  ✓ Завершено: {completed} ({completed * 100 // total_employee_tasks if total_employee_tasks > 0 else 0}%)
-  ⏳ В работе: {in_progress} ({in_progress * 100 // total_employee_tasks if total_employee_tasks > 0 else 0}%)
-  ⏸ Ожидает: {pending} ({pending * 100 // total_employee_tasks if total_employee_tasks > 0 else 0}%)
-
-{'=' * 70}
-"""
-
-            if tasks:
-                report += f"📋 ЗАДАЧИ ПО ПРОЕКТАМ ({len(projects_dict)} проектов):\n"
-                report += f"{'=' * 70}\n\n"
-
-                for proj_name, proj_tasks in projects_dict.items():
-                    client_name = proj_tasks[0][5]
-                    report += f"🔹 Проект: {proj_name}\n"
-                    report += f"   Клиент: {client_name}\n"
-                    report += f"   Задач: {len(proj_tasks)}\n\n"
-
-                    for task in proj_tasks:
-                        task_id, desc, due_date, status, _, _ = task
-                        status_icon = "✓" if status == "completed" else "⏳" if status == "in progress" else "⏸"
-                        report += f"   {status_icon} #{task_id}: {desc}\n"
-                        report += f"      Срок: {due_date} | Статус: {status}\n"
-                    report += f"\n{'-' * 70}\n\n"
-            else:
-                report += "⚠️ Сотрудник пока не назначен ни на одну задачу\n"
-                report += "\n💡 Назначьте задачи через двойной клик по задаче в основном окне\n"
+            def build():
+                # Задачи сотрудника, статистика и группировка по проектам - за один проход
+                workloads = list(employee_workloads(db, employee_id))
+                workload = workloads[0] if workloads else EmployeeWorkload(employee_id, employee_name,
+                                                                            employee_position)
+                logger.info(f"Отчёт по сотруднику {employee_name} (ID: {employee_id})")
+                return format_employee_workload(workload)
 
+            report = self.report_cache.text("employee_workload", (employee_id, employee_name, employee_position),
+                                            ("employee", "task", "project", "clients"), build)
             dialog = ReportDialog(f"💼 Отчёт: {employee_name}", report, self)
             dialog.exec()
-            logger.info(f"Отчёт по сотруднику {employee_name} (ID: {employee_id})")
 
-    def generate_pdf_simple(self):
-        logger.info("Начало генерации PDF-отчета")
-        try:
-            report_gen = ReportGenerator(cursor)
-            pdf_path = report_gen.generate_pdf_report_simple()
-            logger.info(f"PDF-отчет успешно создан: {pdf_path}")
+    def report_all_employees_workload(self):
+        # Отчет: Загрузка всех сотрудников - строится в отдельном процессе и пишется сразу в файл
+        logger.info("Запуск отчета: Загрузка всех сотрудников")
+        filters = ";;".join(file_filter for file_filter, _ in WORKLOAD_FORMATS.values())
+        file_path, selected_filter = QFileDialog.getSaveFileName(self, "Сохранить отчет о загрузке", "", filters)
+        if not file_path:
+            return
 
-            reply = QMessageBox.question(
-                self,
-                "PDF создан",
-                f"PDF-отчет успешно создан!\n\nОткрыть файл?",
-                QMessageBox.Yes | QMessageBox.No
-            )
+        _, file_path = workload_file_path(file_path, selected_filter)
+        self.report_job = ReportJob(db, cache=self.report_cache)
+        self.start_file_job(self.report_job, self.report_job.build_workload, file_path, "Построение",
+                            self.on_workload_finished, self.on_workload_failed, part="отчета")
 
-            if reply == QMessageBox.Yes:
-                logger.debug(f"Открытие PDF-файла: {pdf_path}")
-                if platform.system() == "Windows":
-                    os.startfile(pdf_path)
-                    logger.debug("PDF открыт через os.startfile (Windows)")
-                elif platform.system() == "Darwin":
-                    subprocess.run(["open", pdf_path])
-                    logger.debug("PDF открыт через команду open (macOS)")
-            else:
-                logger.debug("Пользователь отказался от открытия PDF")
+    def on_workload_finished(self, file_path):
+        self.finish_file_job()
+        if file_path is None:
+            logger.info("Построение отчета о загрузке отменено пользователем")
+            return
+        note = f"\n\n{CACHED_REPORT_NOTE}" if self.report_job.timings.get("cached") else ""
+        reply = QMessageBox.question(
+            self,
+            "Отчет создан",
+            f"Отчет о загрузке сотрудников сохранен:\n{file_path}{note}\n\nОткрыть файл?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            self.open_file(file_path)
 
-        except Exception as e:
-            logger.error(f"Ошибка генерации PDF: {e}")
-            QMessageBox.critical(self, "Ошибка", f"Ошибка генерации PDF: {e}")
+    def on_workload_failed(self, message):
+        self.finish_file_job()
+        logger.error(f"Ошибка построения отчета о загрузке: {message}")
+        QMessageBox.critical(self, "Ошибка", f"Ошибка построения отчета: {message}")
 
+    def generate_pdf_simple(self):
+        logger.info("Начало генерации PDF-отчета")
+        # Отчет строится в отдельном процессе, окно остается доступным; прогресс - по разделам отчета
+        self.report_job = ReportJob(db, cache=self.report_cache)
+        self.start_file_job(self.report_job, self.report_job.build, "report.pdf", "Построение",
+                            self.on_report_finished, self.on_report_failed, part="раздела")
+
+    def on_report_finished(self, pdf_path):
+        self.finish_file_job()
+        if pdf_path is None:
+            logger.info("Генерация PDF отменена пользователем")
+            return
+        # Шрифт и стили загружаются только при первом отчете, следующие строятся без этой задержки
+        timings = self.report_job.timings
+        logger.info(f"PDF-отчет успешно создан: {pdf_path} за {timings['total']:.2f} с "
+                    f"(загрузка шрифта и стилей: {timings['resources']:.2f} с)")
+
+        note = f"\n\n{CACHED_REPORT_NOTE}" if timings.get("cached") else ""
+        reply = QMessageBox.question(
+            self,
+            "PDF создан",
+            f"PDF-отчет успешно создан!{note}\n\nОткрыть файл?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+
+        if reply == QMessageBox.Yes:
+            self.open_file(pdf_path)
+        else:
+            logger.debug("Пользователь отказался от открытия PDF")
+
+    def open_file(self, path):
+        logger.debug(f"Открытие файла: {path}")
+        if platform.system() == "Windows":
+            os.startfile(path)
+            logger.debug("Файл открыт через os.startfile (Windows)")
+        elif platform.system() == "Darwin":
+            subprocess.run(["open", path])
+            logger.debug("Файл открыт через команду open (macOS)")
+
+    def on_report_failed(self, message):
+        self.finish_file_job()
+        logger.error(f"Ошибка генерации PDF: {message}")
+        QMessageBox.critical(self, "Ошибка", f"Ошибка генерации PDF: {message}")
 
 def main():
     logger.info("=" * 50)
     logger.info("Запуск приложения ProjectManager")
     logger.info("=" * 50)
 
+    # Проверка подключения выполняется здесь, а не при импорте модуля: процессы построения
+    # отчетов (spawn) импортируют этот модуль заново и не должны открывать пул соединений
+    try:
+        db.fetch_value("SELECT 1")
+        logger.info("Успешное подключение к базе данных")
+    except mysql.connector.Error as err:
+        logger.critical(f"Ошибка подключения к базе данных: {err}")
+        raise
+
     try:
         app = QApplication(sys.argv)
         logger.debug("QApplication создан")
@@ -0,0 +1,222 @@
+# Слой доступа к данным: пул соединений MySQL и вспомогательные методы запросов
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import errorcode
+from mysql.connector.pooling import MySQLConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# Параметры подключения к БД
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "12345678",
+    "database": "course_db",
+    "charset": "utf8mb4",
+    "collation": "utf8mb4_unicode_ci",
+    # Непрочитанные строки отмененных фоновых запросов дочитываются при закрытии курсора
+    "consume_results": True,
+}
+
+# Размер пула: GUI, фоновые загрузки, отчеты и импорт работают на своих соединениях
+POOL_SIZE = 5
+
+# Сколько раз повторять запрос после потери соединения с сервером
+RECONNECT_ATTEMPTS = 3
+RECONNECT_DELAY = 1
+
+# Коды ошибок "server has gone away" / "lost connection"
+_CONNECTION_LOST_ERRORS = {
+    errorcode.CR_SERVER_GONE_ERROR,
+    errorcode.CR_SERVER_LOST,
+    errorcode.CR_CONN_HOST_ERROR,
+    errorcode.CR_SERVER_LOST_EXTENDED,
+}
+
+
+def is_connection_lost(err):
+    # Проверка, что ошибка вызвана обрывом соединения, а не самим запросом
+    if isinstance(err, (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError)):
+        return err.errno in _CONNECTION_LOST_ERRORS
+    return False
+
+
+class Database:
+    # Пул соединений MySQL с проверкой соединения при выдаче и переподключением
+    def __init__(self, config=None, pool_size=POOL_SIZE, pool_name="course_pool"):
+        self.config = dict(config or DB_CONFIG)
+        self.pool_size = pool_size
+        self.pool_name = pool_name
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # MySQLConnectionPool не ждет освобождения соединения, поэтому ограничиваем выдачу семафором
+        self._slots = threading.BoundedSemaphore(pool_size)
+        # Отдельное соединение вне пула для KILL QUERY: оно доступно, даже когда пул занят
+        self._control_conn = None
+        self._control_lock = threading.Lock()
+        # Счетчик транзакций, зафиксированных через этот объект (версия данных для кэша отчетов)
+        self.write_count = 0
+        self._write_count_lock = threading.Lock()
+
+    @property
+    def pool(self):
+        # Пул создается лениво, при первом запросе соединения
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = MySQLConnectionPool(
+                        pool_name=self.pool_name,
+                        pool_size=self.pool_size,
+                        pool_reset_session=True,
+                        **self.config
+                    )
+                    logger.info(f"Создан пул соединений '{self.pool_name}' на {self.pool_size} соединений")
+        return self._pool
+
+    def _checkout(self):
+        # Выдача соединения из пула с проверкой его работоспособности
+        self._slots.acquire()
+        try:
+            conn = self.pool.get_connection()
+            try:
+                conn.ping(reconnect=True, attempts=RECONNECT_ATTEMPTS, delay=RECONNECT_DELAY)
+            except mysql.connector.Error:
+                conn.close()
+                raise
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _checkin(self, conn):
+        try:
+            conn.close()  # Для PooledMySQLConnection это возврат в пул
+        except mysql.connector.Error as err:
+            logger.warning(f"Ошибка возврата соединения в пул: {err}")
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        # Соединение из пула на время блока with
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._checkin(conn)
+
+    @contextmanager
+    def cursor(self, buffered=True):
+        # Курсор на отдельном соединении из пула (только для чтения, без commit)
+        with self.connection() as conn:
+            cur = conn.cursor(buffered=buffered)
+            try:
+                yield cur
+            finally:
+                cur.close()
+
+    @contextmanager
+    def transaction(self):
+        # Транзакция: commit при успешном выходе из блока, rollback при исключении
+        with self.connection() as conn:
+            cur = conn.cursor()
+            try:
+                yield cur
+                conn.commit()
+                with self._write_count_lock:
+                    self.write_count += 1
+            except Exception:
+                try:
+                    conn.rollback()
+                except mysql.connector.Error as err:
+                    logger.warning(f"Ошибка отката транзакции: {err}")
+                raise
+            finally:
+                cur.close()
+
+    def _run(self, operation, can_retry=None):
+        # Выполнение операции с повтором на новом соединении после обрыва связи с сервером.
+        # can_retry() - можно ли повторить операцию после этого обрыва (по умолчанию - всегда)
+        for attempt in range(1, RECONNECT_ATTEMPTS + 1):
+            try:
+                return operation()
+            except mysql.connector.Error as err:
+                if (not is_connection_lost(err) or attempt == RECONNECT_ATTEMPTS
+                        or (can_retry is not None and not can_retry())):
+                    raise
+                logger.warning(f"Потеряно соединение с БД ({err}), повтор {attempt}/{RECONNECT_ATTEMPTS - 1}")
+                time.sleep(RECONNECT_DELAY)
+
+    def fetch_all(self, sql, params=None):
+        def operation():
+            with self.cursor() as cur:
+                cur.execute(sql, params)
+                return cur.fetchall()
+        return self._run(operation)
+
+    def fetch_one(self, sql, params=None):
+        def operation():
+            with self.cursor() as cur:
+                cur.execute(sql, params)
+                return cur.fetchone()
+        return self._run(operation)
+
+    def fetch_value(self, sql, params=None):
+        row = self.fetch_one(sql, params)
+        return row[0] if row else None
+
+    def _write(self, apply):
+        # Запись apply(cur) в своей транзакции. Повтор - только если соединение потеряно при выдаче
+        # из пула, до отправки запроса: после отправки сервер мог успеть зафиксировать изменение,
+        # и повтор выполнил бы его второй раз. Такая ошибка передается вызывающему коду
+        sent = []
+
+        def operation():
+            sent.clear()
+            with self.transaction() as cur:
+                sent.append(True)
+                return apply(cur)
+        return self._run(operation, can_retry=lambda: not sent)
+
+    def execute(self, sql, params=None):
+        # Одиночный INSERT/UPDATE/DELETE в своей транзакции, возвращает (lastrowid, rowcount)
+        def apply(cur):
+            cur.execute(sql, params)
+            return cur.lastrowid, cur.rowcount
+        return self._write(apply)
+
+    def executemany(self, sql, seq_params):
+        def apply(cur):
+            cur.executemany(sql, seq_params)
+            return cur.lastrowid, cur.rowcount
+        return self._write(apply)
+
+    def kill_query(self, connection_id):
+        # Прерывание выполняющегося запроса на другом соединении (KILL QUERY)
+        with self._control_lock:
+            if self._control_conn is None or not self._control_conn.is_connected():
+                self._control_conn = mysql.connector.connect(**self.config)
+            cur = self._control_conn.cursor()
+            try:
+                cur.execute(f"KILL QUERY {int(connection_id)}")
+            finally:
+                cur.close()
+        logger.debug(f"Прерван запрос на соединении {connection_id}")
+
+    def close(self):
+        # Закрытие всех свободных соединений пула (при выходе из программы)
+        if self._pool is not None:
+            removed = self._pool._remove_connections()
+            logger.info(f"Пул соединений закрыт, закрыто соединений: {removed}")
+        with self._control_lock:
+            if self._control_conn is not None:
+                self._control_conn.close()
+                self._control_conn = None
+
+
+db = Database()
@@ -0,0 +1,624 @@
+# Пакетный импорт данных из Excel: строки листа проверяются целиком по колонкам (pandas),
+# вставляются пачками через executemany (многострочный INSERT ... VALUES),
+# а транзакция фиксируется один раз на лист.
+# Большие файлы читаются потоково (openpyxl read_only) частями по STREAM_CHUNK_ROWS строк,
+# поэтому память не зависит от размера листа.
+# Ссылки на клиентов, проекты и исполнителей проверяются до отправки строк на сервер
+# по множествам ID, загруженным один раз на импорт (ReferenceCache).
+# Кроме Excel, импортируются CSV-файлы таблиц в формате экспорта (import_csv).
+# В режиме upsert повторный импорт того же файла ничего не дублирует: клиенты и сотрудники
+# обновляются по UNIQUE-колонке (INSERT ... ON DUPLICATE KEY UPDATE), проекты и задачи
+# сравниваются с существующими по хешу содержимого; неизмененные строки на сервер не отправляются
+
+import hashlib
+import logging
+import os
+import sys
+import time
+
+import mysql.connector
+import pandas as pd
+from openpyxl import load_workbook
+
+from database import is_connection_lost
+from exporter import EXPORT_SHEETS, table_file_path
+from validation import Validator, ValidationError, EmptyFieldError, InvalidDateError, InvalidEmailError
+
+logger = logging.getLogger(__name__)
+
+# Сколько строк вставлять одним INSERT
+IMPORT_BATCH_SIZE = 1000
+
+# Первая строка данных на листе Excel (строка 1 - заголовки)
+FIRST_DATA_ROW = 2
+
+# Файлы больше этого размера (байт) читаются потоково, а не целиком через pandas
+STREAMING_THRESHOLD = 20 * 1024 * 1024
+
+# Сколько строк листа держать в памяти при потоковом чтении
+STREAM_CHUNK_ROWS = 5000
+
+# Допустимые статусы задач (как в Task.status)
+VALID_STATUSES = ["in progress", "completed", "pending", "cancelled"]
+
+EMAIL_PATTERN = r'^[a-zA-Z0-9._-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+
+# Шаблоны Validator.validate_*_data
+LETTER_PATTERN = r'[A-Za-zА-Яа-яЁё]'
+NAME_PATTERN = r'^[A-Za-zА-Яа-яЁё\s\-]+$'
+TITLE_PATTERN = r'^[A-Za-zА-Яа-яЁё0-9\s\-]+$'
+
+# Таблицы, на которые ссылаются листы: ключ -> (таблица БД, колонка ID)
+REFERENCE_TABLES = {
+    "clients": ("clients", "client_id"),
+    "employees": ("employee", "employee_id"),
+    "projects": ("project", "project_id"),
+}
+
+# Сколько ID читать с сервера за раз при загрузке ReferenceCache
+REFERENCE_FETCH_SIZE = 10000
+
+# Режим upsert для таблиц с UNIQUE-колонкой: (таблица, колонка ID, уникальная колонка,
+# колонки вставки в порядке строки, обновление при совпадении)
+UPSERT_KEYS = {
+    "clients": ("clients", "client_id", "client_contact", "client_name, client_contact",
+                "client_name = VALUES(client_name)"),
+    "employees": ("employee", "employee_id", "employee_name", "employee_name, employee_position",
+                  "employee_position = VALUES(employee_position)"),
+}
+
+# Режим upsert для таблиц без естественного ключа: строка считается уже импортированной,
+# если в таблице есть строка с тем же содержимым (колонки вставки в порядке строки)
+CONTENT_HASH_COLUMNS = {
+    "projects": ("project", "project_name, project_client, project_start_date, project_end_date"),
+    "tasks": ("task", "task_description, task_project, task_due_date, task_status, task_assigned_employee"),
+}
+
+# Листы в порядке импорта (сначала родительские таблицы): (лист, ключ таблицы, SQL вставки, подпись для сообщений)
+SHEETS = [
+    ("Клиенты", "clients",
+     "INSERT INTO clients (client_name, client_contact) VALUES (%s, %s)", "клиента"),
+    ("Сотрудники", "employees",
+     "INSERT INTO employee (employee_name, employee_position) VALUES (%s, %s)", "сотрудника"),
+    ("Проекты", "projects",
+     "INSERT INTO project (project_name, project_client, project_start_date, project_end_date) "
+     "VALUES (%s, %s, %s, %s)", "проекта"),
+    ("Задачи", "tasks",
+     "INSERT INTO task (task_description, task_project, task_due_date, task_status, task_assigned_employee) "
+     "VALUES (%s, %s, %s, %s, %s)", "задачи"),
+]
+
+
+class SheetResult:
+    # Итог импорта одного листа
+    def __init__(self, sheet_name, key):
+        self.sheet_name = sheet_name
+        self.key = key
+        self.imported = 0
+        self.error_count = 0
+        # Ошибки вставки текущей части листа; после записи в лог не хранятся
+        self.pending_errors = []  # (номер строки на листе, текст ошибки)
+        self.first_id = None  # наименьший ID вставленных строк
+        # Режим upsert: ID обновленных строк и число строк, совпавших с данными в БД
+        self.updated_ids = []
+        self.unchanged = 0
+
+    def add_inserted(self, first_id, count):
+        self.imported += count
+        if count and first_id and (self.first_id is None or first_id < self.first_id):
+            self.first_id = first_id
+
+
+class ReferenceCache:
+    # ID существующих клиентов, сотрудников и проектов (для проектов - с датой окончания).
+    # Загружается один раз перед импортом; строки, вставленные предыдущими листами, дописываются
+    # после фиксации листа запросом по ID >= первого вставленного
+    def __init__(self):
+        self.ids = {key: set() for key in REFERENCE_TABLES}
+        self.project_end = {}
+
+    def load(self, conn, key, first_id=None):
+        table, pk = REFERENCE_TABLES[key]
+        columns = f"{pk}, project_end_date" if key == "projects" else pk
+        sql = f"SELECT {columns} FROM {table}"
+        params = ()
+        if first_id is not None:
+            sql += f" WHERE {pk} >= %s"
+            params = (first_id,)
+        ids = self.ids[key]
+        count = 0
+        cur = conn.cursor(buffered=False)
+        try:
+            cur.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(REFERENCE_FETCH_SIZE)
+                if not rows:
+                    break
+                if key == "projects":
+                    for project_id, end_date in rows:
+                        ids.add(project_id)
+                        self.project_end[project_id] = end_date
+                else:
+                    ids.update(row[0] for row in rows)
+                count += len(rows)
+        finally:
+            cur.close()
+        return count
+
+    def load_all(self, conn):
+        for key in REFERENCE_TABLES:
+            self.load(conn, key)
+        logger.debug("Загружены ID для проверки ссылок: "
+                     + ", ".join(f"{key} {len(ids)}" for key, ids in self.ids.items()))
+
+    def add_inserted(self, conn, key, first_id):
+        # ID, созданные импортом: при параллельной записи в таблицу они не обязаны идти подряд,
+        # поэтому перечитываются с сервера, а не вычисляются по lastrowid и числу строк
+        if key in REFERENCE_TABLES and first_id is not None:
+            self.load(conn, key, first_id)
+
+
+def unique_key(value):
+    # Сравнение значений UNIQUE-колонок без учета регистра, как в collation utf8mb4_unicode_ci
+    return str(value).casefold()
+
+
+def content_hash(row):
+    # Хеш содержимого строки; строки из листа и из БД приводятся к одним типам (str, int, date, None)
+    return hashlib.blake2b(repr(tuple(row)).encode("utf-8"), digest_size=16).digest()
+
+
+def load_content_hashes(conn, key):
+    table, columns = CONTENT_HASH_COLUMNS[key]
+    hashes = set()
+    cur = conn.cursor(buffered=False)
+    try:
+        cur.execute(f"SELECT {columns} FROM {table}")
+        while True:
+            rows = cur.fetchmany(REFERENCE_FETCH_SIZE)
+            if not rows:
+                break
+            hashes.update(content_hash(row) for row in rows)
+    finally:
+        cur.close()
+    return hashes
+
+
+class SheetValidator:
+    # Проверка колонок листа целиком; для каждой строки сохраняется первая найденная ошибка
+    def __init__(self, df):
+        self.df = df
+        self.errors = pd.Series(None, index=df.index, dtype=object)
+
+    def fail(self, mask, message):
+        # message - строка или Series с текстом ошибки для каждой строки
+        mask = mask & self.errors.isna()
+        if mask.any():
+            self.errors[mask] = message[mask] if isinstance(message, pd.Series) else message
+
+    def column(self, name):
+        if name in self.df.columns:
+            return self.df[name]
+        self.fail(pd.Series(True, index=self.df.index), f"Нет колонки '{name}'")
+        return pd.Series(None, index=self.df.index, dtype=object)
+
+    def text(self, name, field_name, max_length=90):
+        # То же, что Validator.validate_non_empty для каждой строки
+        values = self.column(name)
+        text = values.where(values.notna(), "").astype(str).str.strip()
+        self.fail(text == "", str(EmptyFieldError(field_name)))
+        lengths = text.str.len()
+        too_long = lengths > max_length
+        if too_long.any():
+            messages = lengths[too_long].map(lambda length: str(ValidationError(
+                f"Превышена максимальная длина ({length}/{max_length} символов)", field_name)))
+            self.fail(too_long, messages)
+        return text
+
+    def email(self, name, field_name):
+        # Шаблон проверяется по всей колонке, библиотека email-validator - только для строк, прошедших шаблон
+        text = self.text(name, field_name)
+        bad = ~text.str.match(EMAIL_PATTERN) & self.errors.isna()
+        if bad.any():
+            self.fail(bad, text[bad].map(lambda email: str(InvalidEmailError(
+                email, "Email должен содержать только английские буквы, цифры и символы ._-@"))))
+        for idx in text.index[self.errors.isna()]:
+            try:
+                text[idx] = Validator.validate_email(text[idx])
+            except InvalidEmailError as e:
+                self.errors[idx] = str(e)
+        return text
+
+    def integer(self, name, field_name, required=True):
+        values = self.column(name)
+        numbers = pd.to_numeric(values, errors="coerce")
+        invalid = (values.notna() & (numbers.isna() | (numbers % 1 != 0))) | (numbers <= 0)
+        if required:
+            invalid |= values.isna()
+        self.fail(invalid, str(ValidationError("Некорректный ID", field_name)))
+        return numbers
+
+    def date(self, name, field_name):
+        values = self.column(name)
+        dates = pd.to_datetime(values, errors="coerce")
+        self.fail(dates.isna(), str(InvalidDateError("Некорректная дата", field_name)))
+        return dates
+
+    def pattern(self, text, regex, message, field_name, search=False):
+        # Проверка колонки регулярным выражением: search - хотя бы одно совпадение, иначе вся строка
+        matched = text.str.contains(regex, regex=True) if search else text.str.match(regex)
+        self.fail(~matched.fillna(False).astype(bool), str(ValidationError(message, field_name)))
+
+    def min_length(self, text, length, message, field_name):
+        self.fail(text.str.len() < length, str(ValidationError(message, field_name)))
+
+    def reference(self, numbers, ids, field_name, label):
+        # Ссылка на запись, которой нет ни в БД, ни среди строк, вставленных этим импортом.
+        # Пустые и некорректные значения уже отмечены integer()
+        missing = pd.Series([pd.notna(value) and int(value) not in ids for value in numbers.tolist()],
+                            index=numbers.index, dtype=bool)
+        if missing.any():
+            self.fail(missing, numbers[missing].map(
+                lambda value: str(ValidationError(f"{label} с ID {int(value)} не найден", field_name))))
+
+    def valid(self):
+        return self.errors.isna()
+
+    def error_rows(self):
+        # (номер строки на листе, текст ошибки) для строк, не прошедших проверку
+        return list(self.errors.dropna().items())
+
+
+def _ints(series):
+    # numpy-числа драйвер MySQL не принимает, поэтому приводим к int/None
+    return [None if pd.isna(value) else int(value) for value in series.tolist()]
+
+
+def _dates(series):
+    return [None if pd.isna(value) else value.date() for value in series.tolist()]
+
+
+def prepare_rows(key, df, refs=None):
+    # Проверка части листа и подготовка строк для INSERT: (строки, номера строк на листе, ошибки).
+    # Индекс df - номера строк на листе Excel. Правила те же, что у Validator.validate_*_data;
+    # если передан refs (ReferenceCache), проверяются и ссылки на клиентов, проекты и исполнителей
+    check = SheetValidator(df)
+    if key == "clients":
+        name = check.text("Имя", "Имя клиента")
+        check.pattern(name, LETTER_PATTERN, "Имя должно содержать хотя бы одну букву", "Имя клиента", search=True)
+        check.pattern(name, NAME_PATTERN, "Имя может содержать только буквы, пробелы и дефисы", "Имя клиента")
+        columns = [name, check.email("Контакт", "Контакт")]
+    elif key == "employees":
+        name, position = check.text("Имя", "Имя сотрудника"), check.text("Должность", "Должность")
+        check.pattern(name, LETTER_PATTERN, "Имя должно содержать хотя бы одну букву", "Имя сотрудника",
+                      search=True)
+        check.pattern(position, LETTER_PATTERN, "Должность должна содержать хотя бы одну букву", "Должность",
+                      search=True)
+        check.pattern(name, NAME_PATTERN, "Имя может содержать только буквы, пробелы и дефисы", "Имя сотрудника")
+        check.pattern(position, NAME_PATTERN, "Должность может содержать только буквы, пробелы и дефисы",
+                      "Должность")
+        check.min_length(name, 2, "Имя должно быть не короче 2 символов", "Имя сотрудника")
+        check.min_length(position, 2, "Должность должна быть не короче 2 символов", "Должность")
+        columns = [name, position]
+    elif key == "projects":
+        name = check.text("Название", "Название проекта")
+        check.pattern(name, LETTER_PATTERN, "Название должно содержать хотя бы одну букву", "Название проекта",
+                      search=True)
+        check.pattern(name, TITLE_PATTERN, "Название может содержать только буквы, цифры, пробелы и дефисы",
+                      "Название проекта")
+        client = check.integer("Клиент", "ID клиента")
+        if refs is not None:
+            check.reference(client, refs.ids["clients"], "ID клиента", "Клиент")
+        start, end = check.date("Начало", "Дата начала"), check.date("Окончание", "Дата окончания")
+        bad_dates = (end <= start) & check.valid()
+        if bad_dates.any():
+            check.fail(bad_dates, pd.Series([
+                str(InvalidDateError(f"Дата окончания ({e:%d.%m.%Y}) должна быть позже даты начала ({s:%d.%m.%Y})",
+                                     "Дата окончания"))
+                for s, e in zip(start[bad_dates], end[bad_dates])], index=start.index[bad_dates]))
+        columns = [name, client, start, end]
+    else:
+        description = check.text("Описание", "Описание задачи", max_length=150)
+        check.min_length(description, 5, "Описание должно содержать не менее 5 символов", "Описание задачи")
+        check.pattern(description, LETTER_PATTERN, "Описание должно содержать хотя бы одну букву",
+                      "Описание задачи", search=True)
+        check.pattern(description, TITLE_PATTERN, "Описание может содержать только буквы, цифры, пробелы и дефисы",
+                      "Описание задачи")
+        project, due_date = check.integer("Проект", "ID проекта"), check.date("Срок", "Срок выполнения")
+        status = check.column("Статус")
+        check.fail(~status.isin(VALID_STATUSES + [""]),
+                   f"Недопустимый статус. Допустимые: {', '.join(VALID_STATUSES)}")
+        # Исполнитель необязателен, как и сама колонка
+        employee = (check.integer("Исполнитель", "ID исполнителя", required=False)
+                    if "Исполнитель" in check.df.columns else pd.Series(None, index=check.df.index, dtype=object))
+        if refs is not None:
+            check.reference(project, refs.ids["projects"], "ID проекта", "Проект")
+            check.reference(employee, refs.ids["employees"], "ID исполнителя", "Исполнитель")
+            # Срок задачи не позже окончания проекта
+            project_end = pd.to_datetime(project.map(refs.project_end), errors="coerce")
+            too_late = (due_date > project_end) & check.valid()
+            if too_late.any():
+                check.fail(too_late, pd.Series([
+                    str(InvalidDateError(f"Срок задачи ({d:%d.%m.%Y}) не может быть позже "
+                                         f"окончания проекта ({e:%d.%m.%Y})", "Срок выполнения"))
+                    for d, e in zip(due_date[too_late], project_end[too_late])], index=due_date.index[too_late]))
+        columns = [description, project, due_date, status, employee]
+
+    valid = check.valid()
+    values = []
+    for column in columns:
+        column = column[valid]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            values.append(_dates(column))
+        elif pd.api.types.is_numeric_dtype(column):
+            values.append(_ints(column))
+        else:
+            values.append([None if pd.isna(value) else value for value in column.tolist()])
+    rows = list(zip(*values)) if values else []
+    row_numbers = check.df.index[valid].tolist()
+    return rows, row_numbers, check.error_rows()
+
+
+def read_sheet_chunks(ws, chunk_rows=STREAM_CHUNK_ROWS):
+    # Потоковое чтение листа openpyxl (read_only): части листа в виде DataFrame с номерами строк в индексе
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [str(name).strip() if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+    width = len(columns)
+    chunk, numbers, empty = [], [], []
+    for row_number, values in enumerate(rows, FIRST_DATA_ROW):
+        if all(value is None for value in values):
+            # Пустые строки в конце листа (например, только с форматированием) отбрасываются, как в pandas;
+            # пустые строки между данными попадают в проверку
+            empty.append(row_number)
+            continue
+        for empty_number in empty:
+            chunk.append((None,) * width)
+            numbers.append(empty_number)
+        empty = []
+        chunk.append(tuple(values[:width]) + (None,) * (width - len(values)))
+        numbers.append(row_number)
+        if len(chunk) >= chunk_rows:
+            yield pd.DataFrame(chunk, columns=columns, index=numbers)
+            chunk, numbers = [], []
+    if chunk:
+        yield pd.DataFrame(chunk, columns=columns, index=numbers)
+
+
+def read_csv_chunks(file_path, chunk_rows=STREAM_CHUNK_ROWS):
+    # Части CSV-файла в виде DataFrame с номерами строк файла в индексе, как у листов Excel.
+    # Значения читаются строками (проверка сама приводит числа и даты), пустое значение - NULL
+    start = FIRST_DATA_ROW
+    for df in pd.read_csv(file_path, chunksize=chunk_rows, dtype=str, keep_default_na=False,
+                          na_values=[""], encoding="utf-8"):
+        df.index = pd.RangeIndex(start, start + len(df))
+        start += len(df)
+        yield df
+
+
+def csv_table_files(file_path):
+    # {лист: файл} для CSV-файлов таблиц, названных как при экспорте (export_clients.csv, export_task.csv ...).
+    # Выбрать можно любой из этих файлов или общее имя без суффикса таблицы
+    base, ext = os.path.splitext(file_path)
+    for _, table, _, _, _ in EXPORT_SHEETS:
+        if base.endswith(f"_{table}"):
+            base = base[:-len(table) - 1]
+            break
+    files = {}
+    for sheet_name, table, _, _, _ in EXPORT_SHEETS:
+        path = table_file_path(base + ext, table)
+        if os.path.exists(path):
+            files[sheet_name] = path
+    return files
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+class ExcelImporter:
+    # Импорт файла Excel на одном соединении из пула.
+    # progress(лист, обработано строк, всего строк или 0, если неизвестно) вызывается после каждой части листа
+    def __init__(self, db, batch_size=IMPORT_BATCH_SIZE, streaming=None, chunk_rows=STREAM_CHUNK_ROWS, upsert=False):
+        self.db = db
+        self.batch_size = batch_size
+        self.upsert = upsert
+        self.streaming = streaming  # None - выбирать по размеру файла
+        self.chunk_rows = chunk_rows
+        self.cancelled = False
+
+    def cancel(self):
+        # Прерывание импорта: текущий лист откатывается, уже импортированные листы сохраняются
+        self.cancelled = True
+
+    def import_file(self, file_path, progress=None):
+        # Возвращает {лист: SheetResult} для импортированных листов
+        streaming = self.streaming
+        if streaming is None:
+            streaming = os.path.getsize(file_path) > STREAMING_THRESHOLD
+        logger.info(f"Импорт файла {file_path} ({'потоковое чтение' if streaming else 'чтение целиком'})")
+        if streaming:
+            return self._import_streaming(file_path, progress)
+
+        xls = pd.ExcelFile(file_path)
+        sheets = {}
+        for sheet_name, _, _, _ in SHEETS:
+            if sheet_name in xls.sheet_names:
+                df = pd.read_excel(xls, sheet_name)
+                df.index += FIRST_DATA_ROW
+                sheets[sheet_name] = ([df], len(df))
+        return self._import_sheets(sheets, progress)
+
+    def import_csv(self, file_path, progress=None):
+        # Импорт CSV-файлов таблиц; число строк заранее неизвестно
+        files = csv_table_files(file_path)
+        logger.info(f"Импорт CSV: {', '.join(files.values()) or 'файлы таблиц не найдены'}")
+        sheets = {sheet_name: (read_csv_chunks(path, self.chunk_rows), 0) for sheet_name, path in files.items()}
+        return self._import_sheets(sheets, progress)
+
+    def _import_streaming(self, file_path, progress):
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            sheets = {}
+            for sheet_name, _, _, _ in SHEETS:
+                if sheet_name in wb.sheetnames:
+                    ws = wb[sheet_name]
+                    # max_row берется из размеров листа в файле и может отсутствовать
+                    total = ws.max_row - 1 if ws.max_row else 0
+                    sheets[sheet_name] = (read_sheet_chunks(ws, self.chunk_rows), total)
+            return self._import_sheets(sheets, progress)
+        finally:
+            wb.close()
+
+    def _import_sheets(self, sheets, progress):
+        results = {}
+        with self.connect() as conn:
+            refs = ReferenceCache()
+            refs.load_all(conn)
+            # Чтение ID открыло транзакцию; фиксация нужна, чтобы листы видели свежие данные
+            conn.commit()
+            for sheet_name, key, sql, label in SHEETS:
+                if sheet_name not in sheets:
+                    continue
+                chunks, total = sheets[sheet_name]
+                try:
+                    results[sheet_name] = self.import_sheet(conn, chunks, total, sheet_name, key, sql, label,
+                                                            progress, refs)
+                except ImportCancelled:
+                    logger.warning(f"Импорт прерван пользователем на листе '{sheet_name}', лист откатывается")
+                    break
+        return results
+
+    def connect(self):
+        return self.db.connection()
+
+    def log_errors(self, result, label, errors):
+        # Ошибки пишутся в лог по мере обработки, по порядку строк части листа
+        errors = sorted(errors + result.pending_errors)
+        result.pending_errors = []
+        result.error_count += len(errors)
+        for row_number, message in errors:
+            logger.warning(f"Ошибка импорта {label} (строка {row_number}): {message}")
+
+    def import_sheet(self, conn, chunks, total, sheet_name, key, sql, label, progress=None, refs=None):
+        result = SheetResult(sheet_name, key)
+        processed = 0
+        hashes = load_content_hashes(conn, key) if self.upsert and key in CONTENT_HASH_COLUMNS else None
+        cur = conn.cursor()
+        try:
+            for df in chunks:
+                if self.cancelled:
+                    raise ImportCancelled()
+                rows, row_numbers, errors = prepare_rows(key, df, refs)
+                if hashes is not None:
+                    rows, row_numbers = self._skip_known(rows, row_numbers, hashes, result)
+                for start in range(0, len(rows), self.batch_size):
+                    batch, numbers = rows[start:start + self.batch_size], row_numbers[start:start + self.batch_size]
+                    if self.upsert and key in UPSERT_KEYS:
+                        self._upsert_batch(cur, key, sql, batch, numbers, result)
+                    else:
+                        self._insert_batch(cur, sql, batch, numbers, result)
+                self.log_errors(result, label, errors)
+                processed += len(df)
+                if progress is not None:
+                    progress(sheet_name, processed, max(total, processed))
+            conn.commit()
+            if refs is not None:
+                refs.add_inserted(conn, key, result.first_id)
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+        if self.upsert:
+            logger.info(f"Лист '{sheet_name}': импортировано {result.imported}, обновлено {len(result.updated_ids)}, "
+                        f"без изменений {result.unchanged}, ошибок: {result.error_count}")
+        else:
+            logger.info(f"Лист '{sheet_name}': импортировано {result.imported}, ошибок: {result.error_count}")
+        return result
+
+    def _skip_known(self, rows, row_numbers, hashes, result):
+        # Строки, содержимое которых уже есть в таблице (или выше в файле), не отправляются на сервер
+        kept_rows, kept_numbers = [], []
+        for row, row_number in zip(rows, row_numbers):
+            digest = content_hash(row)
+            if digest in hashes:
+                result.unchanged += 1
+                continue
+            hashes.add(digest)
+            kept_rows.append(row)
+            kept_numbers.append(row_number)
+        return kept_rows, kept_numbers
+
+    def _upsert_batch(self, cur, key, sql, batch, row_numbers, result):
+        # Существующие строки пачки выбираются одним запросом по UNIQUE-колонке; совпадающие полностью
+        # пропускаются, новые и измененные отправляются одним INSERT ... ON DUPLICATE KEY UPDATE
+        table, pk, unique, columns, update = UPSERT_KEYS[key]
+        position = columns.split(", ").index(unique)
+        values = list({row[position] for row in batch})
+        cur.execute(f"SELECT {pk}, {columns} FROM {table} WHERE {unique} IN ({', '.join(['%s'] * len(values))})",
+                    values)
+        existing = {unique_key(row[1 + position]): (row[0], tuple(row[1:])) for row in cur.fetchall()}
+        changed, changed_numbers, updated = [], [], 0
+        for row, row_number in zip(batch, row_numbers):
+            found = existing.get(unique_key(row[position]))
+            if found is not None and found[1] == tuple(row):
+                result.unchanged += 1
+                continue
+            if found is not None:
+                updated += 1
+                if found[0] is not None:
+                    result.updated_ids.append(found[0])
+            # Повтор той же строки ниже в файле тоже будет пропущен
+            existing[unique_key(row[position])] = (found[0] if found else None, tuple(row))
+            changed.append(row)
+            changed_numbers.append(row_number)
+        if changed:
+            self._insert_batch(cur, f"{sql} ON DUPLICATE KEY UPDATE {update}", changed, changed_numbers, result,
+                               updated)
+
+    def _insert_batch(self, cur, sql, batch, row_numbers, result, updated=0):
+        # Ошибочный INSERT откатывается сервером целиком (атомарность оператора), остальная транзакция
+        # листа сохраняется. Тогда пачка вставляется построчно, чтобы найти строки с ошибками.
+        # updated - сколько строк пачки обновят существующие записи (ON DUPLICATE KEY UPDATE)
+        try:
+            cur.executemany(sql, batch)
+            result.add_inserted(cur.lastrowid, len(batch) - updated)
+            return
+        except mysql.connector.Error as err:
+            if is_connection_lost(err):
+                raise
+            logger.debug(f"Пачка из {len(batch)} строк не вставлена ({err}), вставка по одной строке")
+
+        for row, row_number in zip(batch, row_numbers):
+            try:
+                cur.execute(sql, row)
+                # ON DUPLICATE KEY UPDATE: 1 - строка вставлена, 2 - обновлена
+                result.add_inserted(cur.lastrowid, 1 if cur.rowcount == 1 else 0)
+            except mysql.connector.Error as err:
+                if is_connection_lost(err):
+                    raise
+                result.pending_errors.append((row_number, str(err)))
+
+
+if __name__ == "__main__":
+    # Импорт из консоли, например для ночной синхронизации: python excel_import.py <файл.xlsx | файл.csv> [--upsert]
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    from database import db
+
+    if len(sys.argv) < 2:
+        print("Использование: python excel_import.py <файл.xlsx | файл.csv> [--upsert]")
+        sys.exit(1)
+    file_path = sys.argv[1]
+    importer = ExcelImporter(db, upsert="--upsert" in sys.argv)
+    started = time.perf_counter()
+    results = importer.import_csv(file_path) if file_path.lower().endswith(".csv") else importer.import_file(file_path)
+    for result in results.values():
+        print(f"{result.sheet_name}: импортировано {result.imported}, обновлено {len(result.updated_ids)}, "
+              f"без изменений {result.unchanged}, ошибок {result.error_count}")
+    print(f"Время импорта: {time.perf_counter() - started:.2f} с")
+    db.close()
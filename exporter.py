@@ -0,0 +1,438 @@
+# Потоковый экспорт таблиц: строки читаются с сервера небуферизованным курсором порциями
+# и сразу пишутся в файл, поэтому память не зависит от числа строк.
+# Форматы: Excel (все таблицы на листах одной книги), CSV, Parquet и Arrow IPC (файл на таблицу).
+# Для Parquet и Arrow нужна библиотека pyarrow (необязательная зависимость).
+# В параллельном режиме данные читаются из одного согласованного снимка: все таблицы по очереди
+# в одной транзакции на одном соединении. Файлы таблиц (CSV, Parquet, Arrow) читаются одновременно,
+# каждый на своем соединении, только если разрешена блокировка записи (read_lock) и она удалась:
+# лишь тогда снимки всех соединений соответствуют одному моменту
+
+import csv
+import logging
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+import mysql.connector
+from openpyxl import Workbook
+
+logger = logging.getLogger(__name__)
+
+# Сколько строк читать с сервера за один fetchmany
+EXPORT_CHUNK_SIZE = 5000
+
+# Сколько порций строк таблицы держать в очереди при параллельном экспорте
+PARALLEL_QUEUE_CHUNKS = 20
+
+# Сколько секунд ждать блокировки записи при открытии согласованных снимков
+SNAPSHOT_LOCK_TIMEOUT = 5
+
+# Таблицы экспорта: (лист, таблица БД, SELECT, заголовки колонок, типы колонок).
+# Листы совпадают с листами импорта; типы задают схему для Parquet и Arrow
+EXPORT_SHEETS = [
+    ("Клиенты", "clients", "SELECT * FROM clients",
+     ['ID', 'Имя', 'Контакт'], ["int", "text", "text"]),
+    ("Сотрудники", "employee", "SELECT * FROM employee",
+     ['ID', 'Имя', 'Должность'], ["int", "text", "category"]),
+    ("Проекты", "project", "SELECT * FROM project",
+     ['ID', 'Название', 'Клиент', 'Начало', 'Окончание'], ["int", "text", "int", "date", "date"]),
+    ("Задачи", "task", "SELECT * FROM task",
+     ['ID', 'Описание', 'Проект', 'Срок', 'Статус', 'Исполнитель'],
+     ["int", "text", "int", "date", "category", "int"]),
+]
+
+# Форматы экспорта: (фильтр диалога сохранения, расширение файла)
+EXPORT_FORMATS = {
+    "xlsx": ("Excel Files (*.xlsx)", ".xlsx"),
+    "csv": ("CSV (*.csv)", ".csv"),
+    "parquet": ("Parquet (*.parquet)", ".parquet"),
+    "arrow": ("Arrow IPC (*.arrow)", ".arrow"),
+}
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def fetch_chunks(conn, sql, chunk_size=EXPORT_CHUNK_SIZE):
+    # Порции строк запроса на соединении conn (небуферизованный курсор)
+    cur = conn.cursor(buffered=False)
+    try:
+        cur.execute(sql)
+        while True:
+            chunk = cur.fetchmany(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        cur.close()
+
+
+def stream_rows(db, sql, chunk_size=EXPORT_CHUNK_SIZE):
+    # Порции строк запроса; соединение из пула занято, пока генератор не исчерпан или не закрыт
+    with db.connection() as conn:
+        yield from fetch_chunks(conn, sql, chunk_size)
+
+
+def start_consistent_snapshots(db, connections, read_lock=False):
+    # Снимок START TRANSACTION WITH CONSISTENT SNAPSHOT на каждом соединении. Возвращает True, если
+    # все снимки соответствуют одному моменту. Для нескольких соединений это гарантирует только
+    # read_lock: на время открытия снимков запись блокируется FLUSH TABLES WITH READ LOCK на отдельном
+    # соединении. Это глобальная блокировка всего сервера (пишущие запросы других программ тоже ждут),
+    # и для нее нужна привилегия RELOAD; без нее снимки открываются подряд
+    lock_conn = None
+    if read_lock and len(connections) > 1:
+        try:
+            lock_conn = mysql.connector.connect(**db.config)
+            cur = lock_conn.cursor()
+            cur.execute(f"SET SESSION lock_wait_timeout = {int(SNAPSHOT_LOCK_TIMEOUT)}")
+            cur.execute("FLUSH TABLES WITH READ LOCK")
+            cur.close()
+        except mysql.connector.Error as err:
+            logger.warning(f"Не удалось заблокировать запись для согласованного экспорта: {err}")
+            if lock_conn is not None:
+                lock_conn.close()
+            lock_conn = None
+    try:
+        for conn in connections:
+            conn.start_transaction(consistent_snapshot=True, isolation_level="REPEATABLE READ", readonly=True)
+    finally:
+        if lock_conn is not None:
+            cur = lock_conn.cursor()
+            cur.execute("UNLOCK TABLES")
+            cur.close()
+            lock_conn.close()
+    return len(connections) <= 1 or lock_conn is not None
+
+
+def table_file_path(file_path, table):
+    # Файл отдельной таблицы рядом с выбранным: export.csv -> export_task.csv
+    base, ext = os.path.splitext(file_path)
+    return f"{base}_{table}{ext}"
+
+
+def import_pyarrow():
+    # pyarrow импортируется только при экспорте в Parquet/Arrow
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError("Для экспорта в Parquet и Arrow установите пакет pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+class Exporter(ABC):
+    # Общая часть экспортеров: чтение таблиц порциями, отмена и прогресс.
+    # progress(лист, выгружено строк, 0) вызывается после каждой порции.
+    # parallel_tables - таблицы можно писать одновременно (файл на таблицу); в книге Excel листы
+    # пишутся по очереди, и потокам чтения пришлось бы ждать с непрочитанным результатом
+    format_name = None
+    parallel_tables = False
+
+    def __init__(self, db, chunk_size=EXPORT_CHUNK_SIZE, parallel=False, read_lock=False):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.parallel = parallel
+        self.read_lock = read_lock
+        self.cancelled = False
+        # Очереди порций строк по листам (параллельный режим) или соединение единого снимка
+        self._queues = None
+        self._snapshot_conn = None
+        self._stop = threading.Event()
+
+    def cancel(self):
+        # Незавершенный файл при отмене не сохраняется
+        self.cancelled = True
+
+    def chunks(self, sheet_name, sql, progress):
+        count = 0
+        if self._queues is not None:
+            rows = self._queued_chunks(self._queues[sheet_name])
+        elif self._snapshot_conn is not None:
+            rows = fetch_chunks(self._snapshot_conn, sql, self.chunk_size)
+        else:
+            rows = stream_rows(self.db, sql, self.chunk_size)
+        try:
+            for chunk in rows:
+                if self.cancelled:
+                    raise ExportCancelled()
+                yield chunk
+                count += len(chunk)
+                if progress is not None:
+                    progress(sheet_name, count, 0)
+        finally:
+            rows.close()
+
+    def export(self, file_path, progress=None):
+        # Возвращает {лист: число строк} или None, если экспорт отменен
+        started = time.perf_counter()
+        counts = {}
+        try:
+            if self.parallel and self.parallel_tables and self.read_lock:
+                if not self._export_parallel(file_path, counts, progress):
+                    self._export_snapshot(file_path, counts, progress)
+            elif self.parallel:
+                self._export_snapshot(file_path, counts, progress)
+            else:
+                self.write(file_path, counts, progress)
+        except ExportCancelled:
+            logger.warning(f"Экспорт ({self.format_name}) в {file_path} отменен пользователем")
+            return None
+        total = sum(counts.values())
+        logger.info(f"Экспорт ({self.format_name}) в {file_path}: {total} строк за {time.perf_counter() - started:.2f} с")
+        return counts
+
+    def _export_snapshot(self, file_path, counts, progress):
+        # Все таблицы читаются по очереди в одной транзакции только для чтения: один снимок,
+        # одно соединение из пула и никаких блокировок
+        with self.db.connection() as conn:
+            start_consistent_snapshots(self.db, [conn])
+            self._snapshot_conn = conn
+            try:
+                self.write(file_path, counts, progress)
+            finally:
+                self._snapshot_conn = None
+                try:
+                    conn.rollback()  # Завершение транзакции только для чтения
+                except mysql.connector.Error as err:
+                    logger.warning(f"Ошибка завершения транзакции экспорта: {err}")
+
+    def _export_parallel(self, file_path, counts, progress):
+        # Возвращает False, если снимки не удалось открыть на один момент (ничего еще не выгружено).
+        # Каждая таблица читается в своем потоке на своем соединении и передается записи через очередь;
+        # время чтения примерно равно времени самой большой таблицы, а не сумме. Соединения открываются
+        # отдельно от пула, чтобы экспорт не занимал соединения окна программы. Каждую очередь разбирает
+        # свой поток записи, поэтому поток чтения не простаивает с непрочитанным результатом дольше net_write_timeout
+        with ExitStack() as stack:
+            connections = []
+            for _ in EXPORT_SHEETS:
+                conn = mysql.connector.connect(**self.db.config)
+                stack.callback(conn.close)
+                connections.append(conn)
+            if not start_consistent_snapshots(self.db, connections, self.read_lock):
+                # Без блокировки снимки разных соединений не согласованы: экспорт выполняется в одном снимке
+                logger.warning("Блокировка записи не получена, таблицы выгружаются по очереди в одном снимке")
+                return False
+            self._stop.clear()
+            self._queues = {sheet_name: queue.Queue(PARALLEL_QUEUE_CHUNKS) for sheet_name, *_ in EXPORT_SHEETS}
+            producers = []
+            for conn, (sheet_name, _, sql, _, _) in zip(connections, EXPORT_SHEETS):
+                producer = threading.Thread(target=self._produce, args=(conn, sql, self._queues[sheet_name]),
+                                            name=f"export-{sheet_name}", daemon=True)
+                producer.start()
+                producers.append((conn, producer))
+            try:
+                self.write(file_path, counts, progress)
+            finally:
+                self._stop_producers(producers)
+                self._queues = None
+                for conn in connections:
+                    try:
+                        conn.rollback()  # Завершение транзакции только для чтения
+                    except mysql.connector.Error as err:
+                        logger.warning(f"Ошибка завершения транзакции экспорта: {err}")
+        return True
+
+    def _produce(self, conn, sql, chunks):
+        try:
+            cur = conn.cursor(buffered=False)
+            try:
+                cur.execute(sql)
+                while not self._stop.is_set():
+                    chunk = cur.fetchmany(self.chunk_size)
+                    self._put(chunks, chunk)
+                    if not chunk:
+                        break
+            finally:
+                cur.close()
+        except Exception as e:
+            if not self._stop.is_set():
+                self._put(chunks, e)
+
+    def _put(self, chunks, item):
+        # Очередь ограничена: поток чтения ждет, пока запись не заберет порцию (или пока экспорт не остановлен)
+        while not self._stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _queued_chunks(self, chunks):
+        while True:
+            chunk = chunks.get()
+            if isinstance(chunk, Exception):
+                raise chunk
+            if not chunk:
+                return
+            yield chunk
+
+    def _stop_producers(self, producers):
+        self._stop.set()
+        for conn, producer in producers:
+            if producer.is_alive():
+                # Непрочитанный результат прерываем на сервере, чтобы не дочитывать его при закрытии курсора
+                try:
+                    self.db.kill_query(conn.connection_id)
+                except mysql.connector.Error as err:
+                    logger.warning(f"Не удалось прервать запрос экспорта: {err}")
+            producer.join()
+
+    @abstractmethod
+    def write(self, file_path, counts, progress):
+        pass
+
+
+class TableFilesExporter(Exporter):
+    # Экспорт каждой таблицы в отдельный файл; файл пишется во временный и переименовывается по готовности.
+    # В параллельном режиме файлы таблиц тоже пишутся одновременно
+    parallel_tables = True
+
+    def write(self, file_path, counts, progress):
+        if self._queues is not None:
+            with ThreadPoolExecutor(max_workers=len(EXPORT_SHEETS)) as pool:
+                futures = {sheet[0]: pool.submit(self._write_file, file_path, sheet, progress) for sheet in EXPORT_SHEETS}
+                for sheet_name, future in futures.items():
+                    counts[sheet_name] = future.result()
+        else:
+            for sheet in EXPORT_SHEETS:
+                counts[sheet[0]] = self._write_file(file_path, sheet, progress)
+
+    def _write_file(self, file_path, sheet, progress):
+        sheet_name, table, sql, headers, types = sheet
+        path = table_file_path(file_path, table)
+        temp_path = path + ".part"
+        started = time.perf_counter()
+        try:
+            count = self.write_table(temp_path, sheet_name, sql, headers, types, progress)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        os.replace(temp_path, path)
+        logger.info(f"{self.format_name}: {table} - {count} строк за "
+                    f"{time.perf_counter() - started:.2f} с, {os.path.getsize(path) // 1024} КБ")
+        return count
+
+    @abstractmethod
+    def write_table(self, path, sheet_name, sql, headers, types, progress):
+        pass
+
+
+class ExcelExporter(Exporter):
+    # Экспорт всех листов в xlsx через openpyxl в режиме write_only: строки сразу сбрасываются
+    # во временный файл книги, а не накапливаются в памяти
+    format_name = "xlsx"
+
+    def write(self, file_path, counts, progress):
+        wb = Workbook(write_only=True)
+        try:
+            for sheet_name, _, sql, headers, _ in EXPORT_SHEETS:
+                started = time.perf_counter()
+                ws = wb.create_sheet(sheet_name)
+                ws.append(headers)
+                count = 0
+                for chunk in self.chunks(sheet_name, sql, progress):
+                    for row in chunk:
+                        ws.append(row)
+                    count += len(chunk)
+                counts[sheet_name] = count
+                logger.debug(f"Экспортировано строк на лист '{sheet_name}': {count} за {time.perf_counter() - started:.2f} с")
+        except BaseException:
+            # Закрываем временные файлы листов несохраненной книги
+            for ws in wb.worksheets:
+                ws.close()
+            raise
+        wb.save(file_path)
+
+
+class CsvExporter(TableFilesExporter):
+    # CSV в UTF-8, даты в формате ГГГГ-ММ-ДД, NULL - пустое значение
+    format_name = "csv"
+
+    def write_table(self, path, sheet_name, sql, headers, types, progress):
+        count = 0
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            for chunk in self.chunks(sheet_name, sql, progress):
+                writer.writerows(chunk)
+                count += len(chunk)
+        return count
+
+
+class ArrowExporter(TableFilesExporter):
+    # Arrow IPC (формат файла Feather v2): каждая порция строк записывается как RecordBatch.
+    # Файловый формат IPC не допускает разных словарей в разных RecordBatch,
+    # поэтому category-колонки здесь пишутся обычными строками
+    format_name = "arrow"
+    dictionary_categories = False
+
+    def schema(self, pa, headers, types):
+        arrow_types = {
+            "int": pa.int64(),
+            "text": pa.string(),
+            "date": pa.date32(),
+            "category": pa.dictionary(pa.int32(), pa.string()) if self.dictionary_categories else pa.string(),
+        }
+        return pa.schema([(header, arrow_types[kind]) for header, kind in zip(headers, types)])
+
+    def record_batch(self, pa, schema, chunk):
+        arrays = []
+        for field, values in zip(schema, zip(*chunk)):
+            if pa.types.is_dictionary(field.type):
+                arrays.append(pa.array(values, pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(values, field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def open_writer(self, pa, path, schema):
+        import pyarrow.ipc as ipc
+        return ipc.new_file(path, schema)
+
+    def write_table(self, path, sheet_name, sql, headers, types, progress):
+        pa = import_pyarrow()
+        schema = self.schema(pa, headers, types)
+        count = 0
+        writer = self.open_writer(pa, path, schema)
+        try:
+            for chunk in self.chunks(sheet_name, sql, progress):
+                writer.write_batch(self.record_batch(pa, schema, chunk))
+                count += len(chunk)
+        finally:
+            writer.close()
+        return count
+
+
+class ParquetExporter(ArrowExporter):
+    # Parquet: порция строк - группа строк файла. category-колонки (статус задачи, должность)
+    # хранятся со словарным кодированием: значения записываются один раз на группу строк
+    format_name = "parquet"
+    dictionary_categories = True
+
+    def open_writer(self, pa, path, schema):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(path, schema, compression="snappy")
+
+
+EXPORTERS = {
+    "xlsx": ExcelExporter,
+    "csv": CsvExporter,
+    "parquet": ParquetExporter,
+    "arrow": ArrowExporter,
+}
+
+
+def exporter_for(file_path, selected_filter=None):
+    # Формат экспорта по фильтру диалога сохранения или по расширению файла
+    for name, (file_filter, ext) in EXPORT_FORMATS.items():
+        if selected_filter == file_filter:
+            return name, file_path if file_path.lower().endswith(ext) else file_path + ext
+    ext = os.path.splitext(file_path)[1].lower()
+    for name, (_, format_ext) in EXPORT_FORMATS.items():
+        if ext == format_ext:
+            return name, file_path
+    return "xlsx", file_path + ".xlsx"
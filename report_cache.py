@@ -0,0 +1,135 @@
+# Кэш отчетов на диске: повторный отчет по неизменившимся данным берется из файла без запросов и верстки.
+# Ключ записи - тип отчета, параметры и версия данных таблиц, из которых строится отчет.
+# Версия данных - UPDATE_TIME таблиц из information_schema (меняется при любой записи, в том числе
+# из другой программы или каскадном удалении) и счетчик транзакций этой программы (Database.write_count).
+# UPDATE_TIME хранится с точностью до секунды, поэтому отчет, начатый в ту же секунду, что и последняя
+# запись, в кэш не сохраняется: следующая запись в эту же секунду не изменила бы версию.
+# После перезапуска сервера UPDATE_TIME равен NULL до первой записи в таблицу, а счетчик транзакций
+# начинается с нуля при каждом запуске программы, поэтому при NULL отчет тоже не сохраняется в кэш.
+# Записи вытесняются по давности использования (LRU), список записей хранится в index.json
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+import mysql.connector
+
+logger = logging.getLogger(__name__)
+
+REPORT_CACHE_DIR = os.path.join("reports", "cache")
+
+# Ограничения кэша: число записей и общий размер файлов
+REPORT_CACHE_ENTRIES = 32
+REPORT_CACHE_BYTES = 200 * 1024 * 1024
+
+
+class ReportCache:
+    # Используется из GUI-потока и из рабочих потоков построения отчетов
+    def __init__(self, db, directory=REPORT_CACHE_DIR, max_entries=REPORT_CACHE_ENTRIES,
+                 max_bytes=REPORT_CACHE_BYTES):
+        self.db = db
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Ключ -> (имя файла, размер), от давно использованных к недавним
+        self._entries = OrderedDict()
+        self._load_index()
+
+    def _index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def _load_index(self):
+        try:
+            with open(self._index_path(), encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        for key, filename, size in entries:
+            if os.path.exists(os.path.join(self.directory, filename)):
+                self._entries[key] = (filename, size)
+
+    def _save_index(self):
+        with open(self._index_path(), "w", encoding="utf-8") as f:
+            json.dump([[key, filename, size] for key, (filename, size) in self._entries.items()], f)
+
+    def version(self, tables):
+        # Версия данных таблиц и признак, что отчет по ней можно сохранить в кэш
+        with self.db.cursor() as cur:
+            try:
+                # MySQL 8 по умолчанию отдает UPDATE_TIME из кэша статистики возрастом до суток
+                cur.execute("SET SESSION information_schema_stats_expiry = 0")
+            except mysql.connector.Error:
+                pass
+            placeholders = ", ".join(["%s"] * len(tables))
+            cur.execute(f"SELECT NOW(), TABLE_NAME, UPDATE_TIME FROM information_schema.TABLES "
+                        f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({placeholders})", tuple(tables))
+            rows = cur.fetchall()
+        update_times = {table.lower(): update_time for _, table, update_time in rows}
+        known = [update_time for update_time in update_times.values() if update_time is not None]
+        cacheable = (len(known) == len(tables) and len(update_times) == len(tables)
+                     and rows[0][0] > max(known))
+        version = [self.db.write_count] + [str(update_times.get(table.lower())) for table in sorted(tables)]
+        return version, cacheable
+
+    def lookup(self, kind, params, tables):
+        # Возвращает (путь к файлу записи или None, метка для store). По версии, которую нельзя
+        # кэшировать, запись и не ищется: такой ключ мог быть сохранен до перезапуска сервера
+        version, cacheable = self.version(tables)
+        key = hashlib.sha256(json.dumps([kind, list(params), version], default=str).encode("utf-8")).hexdigest()
+        if not cacheable:
+            return None, (key, cacheable)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                path = os.path.join(self.directory, entry[0])
+                if os.path.exists(path):
+                    self._entries.move_to_end(key)
+                    return path, None
+                del self._entries[key]
+        return None, (key, cacheable)
+
+    def store(self, token, source_path, extension):
+        # Копия построенного отчета в кэш; метка None или "нельзя кэшировать" - ничего не делается
+        if token is None or not token[1]:
+            return
+        filename = f"{token[0]}{extension}"
+        os.makedirs(self.directory, exist_ok=True)
+        shutil.copyfile(source_path, os.path.join(self.directory, filename))
+        self._add(token[0], filename)
+
+    def _add(self, key, filename):
+        with self._lock:
+            self._entries[key] = (filename, os.path.getsize(os.path.join(self.directory, filename)))
+            self._evict()
+            self._save_index()
+
+    def _evict(self):
+        total = sum(size for _, size in self._entries.values())
+        while self._entries and (len(self._entries) > self.max_entries or total > self.max_bytes):
+            _, (filename, size) = self._entries.popitem(last=False)
+            total -= size
+            try:
+                os.remove(os.path.join(self.directory, filename))
+            except OSError as err:
+                logger.warning(f"Не удалось удалить файл кэша отчетов {filename}: {err}")
+
+    def text(self, kind, params, tables, build):
+        # Текстовый отчет: из кэша или build() (None - отчет пуст, не кэшируется)
+        path, token = self.lookup(kind, params, tables)
+        if path is not None:
+            logger.info(f"Отчет '{kind}' взят из кэша")
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+        report = build()
+        if report is not None and token[1]:
+            filename = f"{token[0]}.txt"
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, filename), "w", encoding="utf-8") as f:
+                f.write(report)
+            self._add(token[0], filename)
+        return report
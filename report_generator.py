@@ -1,172 +1,208 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Flowable
 from reportlab.lib import colors
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.enums import TA_CENTER
+import logging
 import os
+import threading
+import time
 from datetime import datetime
 
-class ReportGenerator:
-    def __init__(self, cursor, output_dir="reports"):
-        self.cursor = cursor
-        self.output_dir = output_dir
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-        
-        # Регистрация кириллического шрифта
-        font_path = r'timesnewromanpsmt.ttf'
-        self.font_name = 'Times'
-        
+logger = logging.getLogger(__name__)
+
+FONT_PATH = r'timesnewromanpsmt.ttf'
+FONT_NAME = 'Times'
+
+# Сколько строк читать с сервера за один fetchmany
+REPORT_FETCH_SIZE = 2000
+
+# Разделы отчета: (ключ стиля, заголовок, таблица, колонка ID, SQL без ORDER BY, заголовки колонок,
+# ширины колонок в дюймах, максимальная длина текста колонок, высота строки заголовка и строк данных
+# в пунктах, текст при отсутствии данных, разрыв страницы после раздела).
+# Ширины и высоты заданы заранее, чтобы ReportLab не измерял каждую ячейку; длинный текст обрезается.
+# Разделы между разрывами страниц можно строить отдельными файлами: после склейки отчет тот же
+REPORT_SECTIONS = [
+    ("clients", "Клиенты", "clients", "client_id",
+     "SELECT client_id, client_name, client_contact FROM clients",
+     ['ID', 'Имя', 'Контакт'], [0.6, 2.6, 3.0], [None, 40, 44], (30, 18),
+     "Нет данных о клиентах", False),
+    ("projects", "Проекты", "project p", "p.project_id", """
+            SELECT p.project_id, p.project_name, c.client_name, p.project_start_date, p.project_end_date
+            FROM project p
+            LEFT JOIN clients c ON p.project_client = c.client_id
+        """,
+     ['ID', 'Название', 'Клиент', 'Начало', 'Окончание'], [0.6, 2.0, 1.7, 0.95, 0.95], [None, 32, 26, None, None],
+     (27, 17), "Нет данных о проектах", True),
+    ("employees", "Сотрудники", "employee", "employee_id",
+     "SELECT employee_id, employee_name, employee_position FROM employee",
+     ['ID', 'Имя', 'Должность'], [0.6, 2.8, 2.8], [None, 42, 42], (30, 18),
+     "Нет данных о сотрудниках", False),
+    ("tasks", "Задачи с назначенными исполнителями", "task t", "t.task_id", """
+            SELECT t.task_id, t.task_description, p.project_name, t.task_due_date,
+                   t.task_status, COALESCE(e.employee_name, 'Не назначен') as employee_name
+            FROM task t
+            LEFT JOIN project p ON t.task_project = p.project_id
+            LEFT JOIN employee e ON t.task_assigned_employee = e.employee_id
+        """,
+     ['ID', 'Описание', 'Проект', 'Срок', 'Статус', 'Исполнитель'], [0.4, 1.6, 1.3, 0.9, 0.9, 1.3],
+     [None, 30, 22, None, None, 22], (21, 17), "Нет данных о задачах", False),
+]
+
+
+def format_cell(value, limit=None):
+    if value is None:
+        return "—"
+    text = str(value)
+    if limit and len(text) > limit:
+        return text[:limit] + "..."
+    return text
+
+
+def draw_page_number(canvas, doc=None, number=None):
+    # Номер страницы внизу справа; при склейке файлов разделов номер задается явно
+    canvas.saveState()
+    canvas.setFont(FONT_NAME, 8)
+    canvas.drawRightString(A4[0] - inch, 0.5*inch, f"Страница {number or canvas.getPageNumber()}")
+    canvas.restoreState()
+
+
+class ReportCancelled(Exception):
+    pass
+
+
+class RowSource:
+    # Строки раздела для StreamedTable и его продолжений на следующих страницах: итератор строк,
+    # заранее прочитанная строка, счетчик для прогресса и проверка отмены
+    def __init__(self, rows, section, progress=None, cancelled=None):
+        self.rows = rows
+        self.section = section
+        self.progress = progress
+        self.cancelled = cancelled
+        self.pending = None
+        self.count = 0
+
+    def take(self, count):
+        if self.cancelled is not None and self.cancelled():
+            raise ReportCancelled()
+        rows = []
+        if self.pending is not None:
+            rows.append(self.pending)
+            self.pending = None
+        for row in self.rows:
+            rows.append(row)
+            if len(rows) >= count:
+                break
+        self.count += len(rows)
+        if self.progress is not None and rows:
+            self.progress(self.section, self.count)
+        return rows
+
+    def has_more(self):
+        if self.pending is None:
+            self.pending = next(self.rows, None)
+        return self.pending is not None
+
+    def close(self):
+        if hasattr(self.rows, "close"):
+            self.rows.close()
+
+
+class StreamedTable(Flowable):
+    # Таблица, строки которой берутся из RowSource по мере верстки: на каждую страницу
+    # создается своя Table с повторенным заголовком, ровно по свободному месту на странице.
+    # Время верстки линейно по числу строк, в памяти только строки текущей страницы.
+    # row_style(строка, номер строки в таблице страницы) - дополнительные команды стиля отдельных строк
+    def __init__(self, source, headers, col_widths, heights, style, empty, row_style=None):
+        Flowable.__init__(self)
+        self.source = source
+        self.headers = headers
+        self.col_widths = col_widths
+        self.heights = heights
+        self.style = style
+        self.empty = empty
+        self.row_style = row_style
+
+    def wrap(self, availWidth, availHeight):
+        # Высота заранее неизвестна: таблица всегда "не помещается", и платформа вызывает split
+        return sum(self.col_widths), availHeight + 1
+
+    def split(self, availWidth, availHeight):
+        header_height, row_height = self.heights
+        count = int((availHeight - header_height) // row_height)
+        if count < 1:
+            return []
+        rows = self.source.take(count)
+        if not rows:
+            return [self.empty]
+        table = Table([self.headers] + rows, colWidths=self.col_widths,
+                      rowHeights=[header_height] + [row_height] * len(rows), repeatRows=1)
+        table.setStyle(self.style)
+        if self.row_style is not None:
+            table.setStyle(TableStyle([command for index, row in enumerate(rows, 1)
+                                       for command in self.row_style(row, index)]))
+        if len(rows) < count or not self.source.has_more():
+            return [table]
+        # Продолжение - новый объект: платформа помечает отложенные на следующую страницу flowable
+        return [table, StreamedTable(self.source, self.headers, self.col_widths, self.heights, self.style,
+                                     self.empty, self.row_style)]
+
+    def draw(self):
+        pass
+
+
+class ReportResources:
+    # Кириллический шрифт и стили отчетов, общие для всех ReportGenerator процесса.
+    # Шрифт разбирается один раз, при первом PDF-отчете
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, font_name=FONT_NAME, font_path=FONT_PATH):
+        started = time.perf_counter()
+        self.font_name = font_name
         try:
-            pdfmetrics.registerFont(TTFont(self.font_name, font_path))
-            print(f"✓ Шрифт {self.font_name} зарегистрирован успешно")
+            pdfmetrics.registerFont(TTFont(font_name, font_path))
+            logger.info(f"Шрифт {font_name} зарегистрирован успешно")
         except Exception as e:
-            print(f"✗ Ошибка регистрации {self.font_name}: {e}")
+            logger.error(f"Ошибка регистрации шрифта {font_name}: {e}")
             raise
-    def generate_pdf_report_simple(self, template_name="simple_report", output_filename="report.pdf"):
-        filepath = os.path.join(self.output_dir, output_filename)
-        doc = SimpleDocTemplate(filepath, pagesize=A4)
-        story = []
+
         styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
+        self.title_style = ParagraphStyle(
             'CustomTitle',
             parent=styles['Heading1'],
             fontSize=24,
             textColor=colors.HexColor('#2c3e50'),
             spaceAfter=30,
             alignment=TA_CENTER,
-            fontName=self.font_name
+            fontName=font_name
         )
-        heading_style = ParagraphStyle(
+        self.heading_style = ParagraphStyle(
             'CustomHeading',
             parent=styles['Heading2'],
             fontSize=16,
             textColor=colors.HexColor('#3498db'),
             spaceAfter=12,
-            fontName=self.font_name
+            fontName=font_name
         )
-        normal_style = ParagraphStyle(
+        self.normal_style = ParagraphStyle(
             'CustomNormal',
             parent=styles['Normal'],
-            fontName=self.font_name,
+            fontName=font_name,
             fontSize=10
         )
-        story.append(Paragraph("Отчет по управлению проектами", title_style))
-        story.append(Paragraph(f"Дата создания: {datetime.now().strftime('%d.%m.%Y %H:%M')}", normal_style))
-        story.append(Spacer(1, 0.3*inch))
-        story.append(Paragraph("Клиенты", heading_style))
-        self.cursor.execute("SELECT * FROM clients")
-        clients = self.cursor.fetchall()
-        if clients:
-            data = [['ID', 'Имя', 'Контакт']]
-            for client in clients:
-                data.append([str(client[0]), str(client[1]), str(client[2])])
-            table = Table(data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, -1), self.font_name),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('FONTSIZE', (0, 1), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            story.append(table)
-        else:
-            story.append(Paragraph("Нет данных о клиентах", normal_style))
-        story.append(Spacer(1, 0.3*inch))
-        story.append(Paragraph("Проекты", heading_style))
-        self.cursor.execute("""
-            SELECT p.project_id, p.project_name, c.client_name, p.project_start_date, p.project_end_date
-            FROM project p
-            LEFT JOIN clients c ON p.project_client = c.client_id
-        """)
-        projects = self.cursor.fetchall()
-        if projects:
-            data = [['ID', 'Название', 'Клиент', 'Начало', 'Окончание']]
-            for project in projects:
-                data.append([
-                    str(project[0]),
-                    str(project[1]),
-                    str(project[2]) if project[2] else "—",
-                    str(project[3]),
-                    str(project[4])
-                ])
-            table = Table(data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2ecc71')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, -1), self.font_name),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.lightgreen),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            story.append(table)
-        else:
-            story.append(Paragraph("Нет данных о проектах", normal_style))
-        story.append(PageBreak())
-        
-        # Таблица сотрудников
-        story.append(Paragraph("Сотрудники", heading_style))
-        self.cursor.execute("SELECT * FROM employee")
-        employees = self.cursor.fetchall()
-        if employees:
-            data = [['ID', 'Имя', 'Должность']]
-            for emp in employees:
-                data.append([str(emp[0]), str(emp[1]), str(emp[2])])
-            table = Table(data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#9b59b6')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, -1), self.font_name),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('FONTSIZE', (0, 1), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.lavender),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            story.append(table)
-        else:
-            story.append(Paragraph("Нет данных о сотрудниках", normal_style))
-        
-        story.append(Spacer(1, 0.3*inch))
-        
-        # Таблица задач с исполнителями
-        story.append(Paragraph("Задачи с назначенными исполнителями", heading_style))
-        self.cursor.execute("""
-            SELECT t.task_id, t.task_description, p.project_name, t.task_due_date, 
-                   t.task_status, COALESCE(e.employee_name, 'Не назначен') as employee_name
-            FROM task t
-            LEFT JOIN project p ON t.task_project = p.project_id
-            LEFT JOIN employee e ON t.task_assigned_employee = e.employee_id
-        """)
-        tasks = self.cursor.fetchall()
-        if tasks:
-            data = [['ID', 'Описание', 'Проект', 'Срок', 'Статус', 'Исполнитель']]
-            for task in tasks:
-                data.append([
-                    str(task[0]),
-                    str(task[1])[:30] + "..." if len(str(task[1])) > 30 else str(task[1]),
-                    str(task[2])[:22] + "..." if task[2] and len(str(task[2])) > 22 else (str(task[2]) if task[2] else "—"),
-                    str(task[3]),
-                    str(task[4]),
-                    str(task[5])[:22] + "..." if len(str(task[5])) > 22 else str(task[5])
-                ])
-            table = Table(data, colWidths=[0.4*inch, 1.6*inch, 1.3*inch, 0.9*inch, 0.9*inch, 1.3*inch])
-            table.setStyle(TableStyle([
+        self.table_styles = {
+            "clients": self.section_style('#3498db', colors.beige, 12, 10),
+            "projects": self.section_style('#2ecc71', colors.lightgreen, 10, 9),
+            "employees": self.section_style('#9b59b6', colors.lavender, 12, 10),
+            "tasks": TableStyle([
                 ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e74c3c')),
                 ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
                 ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, -1), self.font_name),
+                ('FONTNAME', (0, 0), (-1, -1), font_name),
                 ('FONTSIZE', (0, 0), (-1, 0), 8),
                 ('FONTSIZE', (0, 1), (-1, -1), 7),
                 ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
@@ -175,10 +211,95 @@ class ReportGenerator:
                 ('BACKGROUND', (0, 1), (-1, -1), colors.lightcoral),
                 ('GRID', (0, 0), (-1, -1), 1, colors.black),
                 ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')
-            ]))
-            story.append(table)
-        else:
-            story.append(Paragraph("Нет данных о задачах", normal_style))
-        
-        doc.build(story)
-        return filepath
\ No newline at end of file
+            ]),
+        }
+        self.load_time = time.perf_counter() - started
+
+    def section_style(self, header_color, body_color, header_size, body_size):
+        return TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(header_color)),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, -1), self.font_name),
+            ('FONTSIZE', (0, 0), (-1, 0), header_size),
+            ('FONTSIZE', (0, 1), (-1, -1), body_size),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), body_color),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+
+    @classmethod
+    def get(cls):
+        # Возвращает (ресурсы, загружены ли они этим вызовом)
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+                return cls._instance, True
+            return cls._instance, False
+
+
+class ReportGenerator:
+    def __init__(self, db, output_dir="reports"):
+        self.db = db
+        self.output_dir = output_dir
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        self.font_name = FONT_NAME
+        # Время последнего отчета: загрузка шрифта и стилей (0, если уже были загружены) и построение PDF
+        self.timings = {}
+
+    def generate_pdf_report_simple(self, template_name="simple_report", output_filename="report.pdf",
+                                   progress=None, cancelled=None):
+        # progress(раздел, выведено строк) вызывается после каждой страницы таблицы;
+        # cancelled() - проверка отмены между страницами (прерывает построение через ReportCancelled)
+        filepath = os.path.join(self.output_dir, output_filename)
+        return self.build_pdf(filepath, REPORT_SECTIONS, progress, cancelled)
+
+    def generate_sections_pdf(self, first, last, filepath, progress=None, cancelled=None):
+        # Разделы first..last-1 отдельным файлом, без номеров страниц - для параллельного построения.
+        # Заголовок отчета - в части с первым разделом
+        return self.build_pdf(filepath, REPORT_SECTIONS[first:last], progress, cancelled,
+                              title=first == 0, page_numbers=False)
+
+    def build_pdf(self, filepath, sections, progress=None, cancelled=None, title=True, page_numbers=True):
+        started = time.perf_counter()
+        resources, loaded = ReportResources.get()
+        self.timings = {"resources": resources.load_time if loaded else 0.0}
+        doc = SimpleDocTemplate(filepath, pagesize=A4)
+        story = []
+        if title:
+            story.append(Paragraph("Отчет по управлению проектами", resources.title_style))
+            # Время чтения данных: копия отчета из кэша по неизменившимся данным сохраняет его
+            story.append(Paragraph(f"Данные на: {datetime.now().strftime('%d.%m.%Y %H:%M')}",
+                                   resources.normal_style))
+            story.append(Spacer(1, 0.3*inch))
+        sources = []
+        for i, section in enumerate(sections):
+            key, section_title, _, pk, sql, headers, widths, limits, heights, empty_text, page_break = section
+            story.append(Paragraph(section_title, resources.heading_style))
+            source = RowSource(self.stream_rows(sql, pk, limits), section_title, progress, cancelled)
+            sources.append(source)
+            story.append(StreamedTable(source, headers, [width*inch for width in widths], heights,
+                                       resources.table_styles[key], Paragraph(empty_text, resources.normal_style)))
+            if i < len(sections) - 1:
+                story.append(PageBreak() if page_break else Spacer(1, 0.3*inch))
+        on_page = draw_page_number if page_numbers else (lambda canvas, doc: None)
+        try:
+            doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
+        finally:
+            for source in sources:
+                source.close()
+        self.timings["pages"] = doc.page
+        self.timings["total"] = time.perf_counter() - started
+        return filepath
+
+    def stream_rows(self, sql, pk, limits):
+        # Строки раздела читаются с сервера порциями по мере верстки страниц, а не целиком
+        with self.db.cursor(buffered=False) as cur:
+            cur.execute(f"{sql} ORDER BY {pk}")
+            while True:
+                rows = cur.fetchmany(REPORT_FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    yield [format_cell(value, limit) for value, limit in zip(row, limits)]
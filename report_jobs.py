@@ -0,0 +1,306 @@
+# Построение PDF-отчетов в отдельном процессе. ReportLab нагружает процессор и держит GIL,
+# поэтому в потоке того же процесса он замедлял бы интерфейс; в отдельном процессе окно
+# остается отзывчивым. Процессы создаются через spawn (fork процесса с Qt небезопасен)
+# и живут до закрытия программы: шрифт и стили загружаются в них один раз.
+# Прогресс передается через общую очередь, отмена - через общее событие.
+# В параллельном режиме (нужна библиотека pypdf) отчет делится на части только по разрывам страниц
+# между разделами (page_break), поэтому склеенный файл совпадает с построенным одним процессом.
+# Каждая часть строится в отдельный файл, затем процессы проставляют в частях сквозные номера страниц,
+# и части склеиваются в один файл. Части читают данные в разное время, каждая своими запросами
+# (как и разделы при построении одним процессом): строки, измененные во время построения,
+# могут попасть в один раздел и не попасть в другой
+import importlib.util
+import io
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen.canvas import Canvas
+
+from report_generator import ReportGenerator, ReportResources, ReportCancelled, REPORT_SECTIONS, draw_page_number
+from workload_report import WorkloadReport, WORKLOAD_SECTION
+
+logger = logging.getLogger(__name__)
+
+# Сколько процессов построения отчетов держать
+REPORT_PROCESSES = os.cpu_count() or 1
+
+# Строить отчет параллельно, если процессор многоядерный и установлена pypdf (иначе - одним процессом)
+PARALLEL_REPORT = True
+
+# Таблицы, из которых строится отчет (версия их данных - часть ключа кэша отчетов)
+REPORT_TABLES = ("clients", "project", "employee", "task")
+WORKLOAD_TABLES = ("employee", "task", "project", "clients")
+
+# Пояснение для пользователя к отчету, взятому из кэша: в файле остается время первого построения
+CACHED_REPORT_NOTE = ("Данные не изменились с прошлого построения, отчет взят из кэша. "
+                      "В отчете указано время, когда были прочитаны данные")
+
+# Как часто (секунд) проверять очередь прогресса
+PROGRESS_POLL_SECONDS = 0.2
+
+# Состояние процесса построения: очередь прогресса, событие отмены, соединение с БД
+_messages = None
+_cancel = None
+_db = None
+
+
+def _init_worker(messages, cancel, db_config):
+    # Очередь и событие передаются при создании процесса: через submit их передавать нельзя
+    global _messages, _cancel, _db
+    from database import Database
+
+    _messages = messages
+    _cancel = cancel
+    _db = Database(db_config, pool_size=1, pool_name="report_pool")
+
+
+def render_report(job_id, output_dir, output_filename):
+    # Выполняется в процессе построения; возвращает (путь к файлу, замеры времени)
+    def progress(section, rows):
+        _messages.put((job_id, 0, section, rows))
+
+    generator = ReportGenerator(_db, output_dir)
+    path = generator.generate_pdf_report_simple(output_filename=output_filename, progress=progress,
+                                                cancelled=_cancel.is_set)
+    return path, generator.timings
+
+
+def render_sections(job_id, part, first, last, output_dir, part_path):
+    # Выполняется в процессе построения: разделы first..last-1 в отдельный файл, без номеров страниц
+    def progress(section, rows):
+        _messages.put((job_id, part, section, rows))
+
+    generator = ReportGenerator(_db, output_dir)
+    generator.generate_sections_pdf(first, last, part_path, progress=progress, cancelled=_cancel.is_set)
+    return generator.timings
+
+
+def stamp_part(path, first_number):
+    # Выполняется в процессе построения: номера страниц части, начиная с first_number, рисуются
+    # в отдельном PDF и накладываются на страницы части; файл части перезаписывается
+    from pypdf import PdfReader, PdfWriter
+
+    ReportResources.get()
+    reader = PdfReader(path)
+    numbers = io.BytesIO()
+    canvas = Canvas(numbers, pagesize=A4)
+    for number in range(first_number, first_number + len(reader.pages)):
+        draw_page_number(canvas, number=number)
+        canvas.showPage()
+    canvas.save()
+    writer = PdfWriter()
+    for page, stamp in zip(reader.pages, PdfReader(numbers).pages):
+        page.merge_page(stamp)
+        writer.add_page(page)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+def render_workload(job_id, file_path):
+    # Выполняется в процессе построения: отчет о загрузке всех сотрудников, возвращает замеры времени
+    def progress(section, rows):
+        _messages.put((job_id, 0, section, rows))
+
+    return WorkloadReport(_db, progress=progress, cancelled=_cancel.is_set).write(file_path)
+
+
+def merge_parts(part_paths, filepath):
+    # Выполняется в процессе построения: склейка частей с уже проставленными номерами страниц
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for path in part_paths:
+        writer.append(path)
+    with open(filepath, "wb") as f:
+        writer.write(f)
+    return len(writer.pages)
+
+
+class ReportJob:
+    # Один отчет: build() блокирует вызывающий (рабочий) поток до готовности файла,
+    # cancel() можно вызвать из любого потока. Одновременно строится один отчет
+    _executor = None
+    _messages = None
+    _cancel = None
+    _lock = threading.Lock()
+    _job_ids = itertools.count(1)
+
+    def __init__(self, db, output_dir="reports", parallel=None, cache=None):
+        self.db = db
+        self.output_dir = output_dir
+        # ReportCache: отчет по неизменившимся данным копируется из кэша без построения
+        self.cache = cache
+        if parallel is None:
+            parallel = (PARALLEL_REPORT and REPORT_PROCESSES > 1
+                        and importlib.util.find_spec("pypdf") is not None)
+        self.parallel = parallel
+        self.cancelled = False
+        self.timings = {}
+
+    @classmethod
+    def executor(cls, db_config):
+        with cls._lock:
+            if cls._executor is None:
+                context = multiprocessing.get_context("spawn")
+                cls._messages = context.Queue()
+                cls._cancel = context.Event()
+                cls._executor = ProcessPoolExecutor(max_workers=REPORT_PROCESSES, mp_context=context,
+                                                    initializer=_init_worker,
+                                                    initargs=(cls._messages, cls._cancel, db_config))
+            return cls._executor
+
+    @classmethod
+    def shutdown(cls):
+        # При закрытии программы: текущий отчет прерывается, процессы завершаются
+        with cls._lock:
+            if cls._executor is not None:
+                cls._cancel.set()
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
+
+    def cancel(self):
+        self.cancelled = True
+        if ReportJob._cancel is not None:
+            ReportJob._cancel.set()
+
+    def build(self, output_filename, progress=None):
+        # Возвращает путь к файлу или None, если построение отменено.
+        # progress(раздел, выведено строк, всего строк); при построении одним процессом
+        # общее число строк заранее неизвестно и передается 0
+        filepath = os.path.join(self.output_dir, output_filename)
+        return self._run("pdf", (), REPORT_TABLES, filepath, progress, self._render_report)
+
+    def build_workload(self, file_path, progress=None):
+        # Отчет о загрузке всех сотрудников (формат - по расширению файла);
+        # progress(раздел, обработано сотрудников, всего сотрудников)
+        ext = os.path.splitext(file_path)[1].lower()
+        return self._run("workload", (ext,), WORKLOAD_TABLES, file_path, progress, self._render_workload)
+
+    def _run(self, kind, params, tables, filepath, progress, render):
+        started = time.perf_counter()
+        token = None
+        if self.cache is not None:
+            cached, token = self.cache.lookup(kind, params, tables)
+            if cached is not None:
+                os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+                shutil.copyfile(cached, filepath)
+                self.timings = {"resources": 0.0, "total": time.perf_counter() - started, "cached": True}
+                logger.info(f"Отчет '{kind}' взят из кэша: данные не изменились")
+                return filepath
+        executor = self.executor(self.db.config)
+        ReportJob._cancel.clear()
+        if self.cancelled:
+            return None
+        job_id = next(ReportJob._job_ids)
+        try:
+            render(executor, job_id, filepath, progress)
+            if self.cache is not None:
+                self.cache.store(token, filepath, os.path.splitext(filepath)[1].lower())
+            return filepath
+        except ReportCancelled:
+            logger.info("Построение отчета отменено")
+            return None
+        except BrokenProcessPool:
+            with ReportJob._lock:
+                ReportJob._executor = None
+            raise RuntimeError("Процесс построения отчета аварийно завершился")
+
+    def _render_report(self, executor, job_id, filepath, progress):
+        if self.parallel:
+            self._build_parallel(executor, job_id, filepath, progress)
+            return
+        future = executor.submit(render_report, job_id, self.output_dir, os.path.basename(filepath))
+        self._wait([future], job_id, progress)
+        _, self.timings = future.result()
+
+    def _render_workload(self, executor, job_id, filepath, progress):
+        totals = {WORKLOAD_SECTION: self.db.fetch_value("SELECT COUNT(*) FROM employee")}
+        future = executor.submit(render_workload, job_id, filepath)
+        self._wait([future], job_id, progress, totals)
+        self.timings = future.result()
+        logger.info(f"Отчет о загрузке сотрудников построен: {self.timings['employees']} сотрудников "
+                    f"за {self.timings['total']:.2f} с")
+
+    def plan_parts(self):
+        # Части отчета: (первый раздел, раздел после последнего) - разделы до разрыва страницы включительно,
+        # и число строк в разделах для прогресса (все COUNT(*) - в одном снимке данных)
+        parts, first = [], 0
+        for index, section in enumerate(REPORT_SECTIONS):
+            if section[10] or index == len(REPORT_SECTIONS) - 1:
+                parts.append((first, index + 1))
+                first = index + 1
+        with self.db.connection() as conn:
+            conn.start_transaction(consistent_snapshot=True, isolation_level="REPEATABLE READ", readonly=True)
+            cur = conn.cursor()
+            try:
+                counts = []
+                for section in REPORT_SECTIONS:
+                    cur.execute(f"SELECT COUNT(*) FROM {section[2]}")
+                    counts.append(cur.fetchone()[0])
+            finally:
+                cur.close()
+                conn.rollback()
+        return parts, counts
+
+    def _build_parallel(self, executor, job_id, filepath, progress):
+        started = time.perf_counter()
+        os.makedirs(self.output_dir, exist_ok=True)
+        base, ext = os.path.splitext(filepath)
+        parts, counts = self.plan_parts()
+        totals = {REPORT_SECTIONS[index][1]: count for index, count in enumerate(counts)}
+        part_paths = [f"{base}.part{number}{ext}" for number in range(len(parts))]
+        futures = [executor.submit(render_sections, job_id, number, first, last, self.output_dir, path)
+                   for number, ((first, last), path) in enumerate(zip(parts, part_paths))]
+        try:
+            # Ждем все части, даже если одна завершилась ошибкой: файлы удаляются после остановки процессов
+            self._wait(futures, job_id, progress, totals)
+            part_timings = [future.result() for future in futures]
+            rendered = time.perf_counter() - started
+
+            first_numbers = itertools.accumulate((timings["pages"] for timings in part_timings), initial=1)
+            stamps = [executor.submit(stamp_part, path, first) for path, first in zip(part_paths, first_numbers)]
+            self._wait(stamps, job_id, progress, totals)
+            for future in stamps:
+                future.result()
+            if self.cancelled:
+                raise ReportCancelled()
+            merge = executor.submit(merge_parts, part_paths, filepath)
+            self._wait([merge], job_id, progress, totals)
+            pages = merge.result()
+        finally:
+            for path in part_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+        self.timings = {
+            "resources": max(timings["resources"] for timings in part_timings),
+            "parts": [timings["total"] for timings in part_timings],
+            "render": rendered,
+            "total": time.perf_counter() - started,
+        }
+        logger.info(f"Отчет построен параллельно: {len(parts)} частей, {pages} страниц, "
+                    f"разделы {rendered:.2f} с, всего {self.timings['total']:.2f} с")
+
+    def _wait(self, futures, job_id, progress, totals=None):
+        # Пересылка прогресса из очереди, пока процессы не завершат работу.
+        # Строки раздела, построенного по частям, суммируются по всем его частям
+        done = {}
+        while not all(future.done() for future in futures):
+            try:
+                message_job, part, section, rows = ReportJob._messages.get(timeout=PROGRESS_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            # Сообщения прерванного ранее отчета пропускаются
+            if message_job != job_id or progress is None:
+                continue
+            done[part] = (section, rows)
+            rows = sum(count for name, count in done.values() if name == section)
+            progress(section, rows, (totals or {}).get(section, 0))
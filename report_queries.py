@@ -0,0 +1,302 @@
+# Запросы отчетов: статистика считается на сервере одним запросом вместо нескольких COUNT(*) подряд.
+# Итоги по проекту и разбивка по исполнителям получаются из одного GROUP BY ... WITH ROLLUP;
+# GROUPING() отличает итоговую строку проекта от группы задач без исполнителя (нужен MySQL 8.0)
+
+# Статистика задач проектов: по каждому исполнителю (NULL - задачи без исполнителя) и итог проекта.
+# LEFT JOIN оставляет проекты без задач (итог с нулями)
+PROJECT_STAFF_SQL = """
+    SELECT s.project_id, p.project_name, s.employee_id, e.employee_name, e.employee_position,
+           s.task_count, s.completed_tasks, s.completion, s.is_total
+    FROM (SELECT p.project_id,
+                 t.task_assigned_employee                                  AS employee_id,
+                 COUNT(t.task_id)                                          AS task_count,
+                 COALESCE(SUM(t.task_status = 'completed'), 0)             AS completed_tasks,
+                 COALESCE(FLOOR(SUM(t.task_status = 'completed') * 100 / COUNT(t.task_id)), 0) AS completion,
+                 GROUPING(t.task_assigned_employee)                        AS is_total
+          FROM project p
+                   LEFT JOIN task t ON t.task_project = p.project_id
+          {where}
+          GROUP BY p.project_id, t.task_assigned_employee WITH ROLLUP
+          HAVING GROUPING(p.project_id) = 0) s
+             JOIN project p ON p.project_id = s.project_id
+             LEFT JOIN employee e ON e.employee_id = s.employee_id
+    ORDER BY p.project_name, s.project_id, s.is_total DESC, e.employee_name
+"""
+
+
+class ProjectStaff:
+    # Статистика одного проекта для отчета "Сотрудники на проекте"
+    def __init__(self, project_id, project_name):
+        self.project_id = project_id
+        self.project_name = project_name
+        self.total_tasks = 0
+        self.unassigned_tasks = 0
+        # (ID, имя, должность, задач, завершено, % завершения) по имени сотрудника
+        self.employees = []
+
+
+def project_staff(db, project_id=None):
+    # Статистика по проекту project_id или по всем проектам сразу (по названию проекта)
+    where, params = ("WHERE p.project_id = %s", (project_id,)) if project_id is not None else ("", None)
+    projects = {}
+    for (pid, name, employee_id, employee_name, position,
+         task_count, completed, completion, is_total) in db.fetch_all(PROJECT_STAFF_SQL.format(where=where), params):
+        staff = projects.get(pid)
+        if staff is None:
+            staff = projects[pid] = ProjectStaff(pid, name)
+        if is_total:
+            staff.total_tasks = task_count
+        elif employee_id is None:
+            staff.unassigned_tasks = task_count
+        elif employee_name is not None:
+            staff.employees.append((employee_id, employee_name, position, task_count, int(completed),
+                                    int(completion)))
+    return list(projects.values())
+
+
+def format_project_staff(staff):
+    # Текст отчета по одному проекту
+    report = f"""👥 ОТЧЕТ: СОТРУДНИКИ НА ПРОЕКТЕ
+{'=' * 70}
+
+📁 Проект: {staff.project_name}
+📊 Всего задач: {staff.total_tasks}
+⚠️ Без назначения: {staff.unassigned_tasks}
+👷 Назначенных сотрудников: {len(staff.employees)}
+
+{'=' * 70}
+"""
+
+    if staff.employees:
+        report += "\n🔹 СОТРУДНИКИ И ИХ ЗАДАЧИ:\n\n"
+        for idx, (_, emp_name, emp_pos, task_count, completed, completion) in enumerate(staff.employees, 1):
+            report += f"{idx}. {emp_name} - {emp_pos}\n"
+            report += f"   Задач: {task_count} (✓ {completed}, {completion}% завершено)\n\n"
+    else:
+        report += "\n⚠️ На этот проект пока не назначено ни одного сотрудника\n"
+
+    if staff.unassigned_tasks > 0:
+        report += f"\n{'=' * 70}\n"
+        report += f"💡 РЕКОМЕНДАЦИЯ: Есть {staff.unassigned_tasks} задач(а) без исполнителя.\n"
+        report += "   Назначьте сотрудников через двойной клик по задаче.\n"
+    return report
+
+
+def client_dependents(db, client_id):
+    # Число проектов и задач клиента одним запросом: (проектов, задач)
+    row = db.fetch_one("""
+        SELECT COUNT(DISTINCT p.project_id), COUNT(t.task_id)
+        FROM project p
+                 LEFT JOIN task t ON t.task_project = p.project_id
+        WHERE p.project_client = %s
+    """, (client_id,))
+    return row[0], row[1]
+
+
+def client_dependent_ids(cur, client_id):
+    # ID проектов и задач клиента одним запросом (внутри транзакции удаления): (проекты, задачи)
+    cur.execute("""
+        SELECT p.project_id, t.task_id
+        FROM project p
+                 LEFT JOIN task t ON t.task_project = p.project_id
+        WHERE p.project_client = %s
+        ORDER BY p.project_id
+    """, (client_id,))
+    project_ids, task_ids = [], []
+    for project_id, task_id in cur.fetchall():
+        if not project_ids or project_ids[-1] != project_id:
+            project_ids.append(project_id)
+        if task_id is not None:
+            task_ids.append(task_id)
+    return project_ids, task_ids
+
+
+def project_details(db, project_id):
+    # Клиент и задачи проекта одним запросом: (имя клиента или None, [(описание, статус)])
+    rows = db.fetch_all("""
+        SELECT c.client_name, t.task_id, t.task_description, t.task_status
+        FROM project p
+                 LEFT JOIN clients c ON c.client_id = p.project_client
+                 LEFT JOIN task t ON t.task_project = p.project_id
+        WHERE p.project_id = %s
+        ORDER BY t.task_id
+    """, (project_id,))
+    client_name = rows[0][0] if rows else None
+    return client_name, [(description, status) for _, task_id, description, status in rows if task_id is not None]
+
+
+# Задачи сотрудников с проектами и клиентами, по сотрудникам и срокам. LEFT JOIN вложенного
+# INNER JOIN оставляет сотрудников без задач и, как прежний отчет, пропускает задачи без проекта или клиента
+WORKLOAD_SQL = """
+    SELECT e.employee_id, e.employee_name, e.employee_position,
+           t.task_id, t.task_description, t.task_due_date, t.task_status, p.project_name, c.client_name
+    FROM employee e
+             LEFT JOIN (task t
+                 INNER JOIN project p ON t.task_project = p.project_id
+                 INNER JOIN clients c ON p.project_client = c.client_id)
+                       ON t.task_assigned_employee = e.employee_id
+    {where}
+    ORDER BY e.employee_name, e.employee_id, t.task_due_date, t.task_id
+"""
+
+# Сколько строк отчета о загрузке читать с сервера за один fetchmany
+WORKLOAD_FETCH_SIZE = 2000
+
+
+class EmployeeWorkload:
+    # Загрузка одного сотрудника: статусы задач считаются и задачи группируются по проектам
+    # по мере добавления, за один проход по строкам
+    def __init__(self, employee_id, employee_name, employee_position):
+        self.employee_id = employee_id
+        self.employee_name = employee_name
+        self.employee_position = employee_position
+        self.total_tasks = 0
+        self.status_counts = {}
+        # Проект -> (клиент, [(ID, описание, срок, статус)]), проекты в порядке ближайшего срока
+        self.projects = {}
+
+    def add_task(self, task_id, description, due_date, status, project_name, client_name):
+        self.total_tasks += 1
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        project = self.projects.get(project_name)
+        if project is None:
+            project = self.projects[project_name] = (client_name, [])
+        project[1].append((task_id, description, due_date, status))
+
+    def count(self, status):
+        return self.status_counts.get(status, 0)
+
+    def percent(self, status):
+        return self.count(status) * 100 // self.total_tasks if self.total_tasks > 0 else 0
+
+
+def employee_workloads(db, employee_id=None):
+    # Загрузка сотрудника employee_id или всех сотрудников (по имени) из одного запроса.
+    # Строки читаются небуферизованным курсором, в памяти - только текущий сотрудник;
+    # соединение из пула занято, пока генератор не исчерпан или не закрыт
+    where, params = ("WHERE e.employee_id = %s", (employee_id,)) if employee_id is not None else ("", None)
+    with db.cursor(buffered=False) as cur:
+        cur.execute(WORKLOAD_SQL.format(where=where), params)
+        current = None
+        while True:
+            rows = cur.fetchmany(WORKLOAD_FETCH_SIZE)
+            if not rows:
+                break
+            for employee, name, position, task_id, *task in rows:
+                if current is None or current.employee_id != employee:
+                    if current is not None:
+                        yield current
+                    current = EmployeeWorkload(employee, name, position)
+                if task_id is not None:
+                    current.add_task(task_id, *task)
+        if current is not None:
+            yield current
+
+
+def format_employee_workload(workload):
+    # Текст отчета о загрузке одного сотрудника
+    total = workload.total_tasks
+    report = f"""💼 ОТЧЁТ: ЗАГРУЗКА СОТРУДНИКА
+{'=' * 70}
+
+👤 ИНФОРМАЦИЯ:
+ID: {workload.employee_id}
+Имя: {workload.employee_name}
+Должность: {workload.employee_position}
+
+{'=' * 70}
+📊 СТАТИСТИКА СОТРУДНИКА:
+{'=' * 70}
+Всего задач: {total}
+  ✓ Завершено: {workload.count('completed')} ({workload.percent('completed')}%)
+  ⏳ В работе: {workload.count('in progress')} ({workload.percent('in progress')}%)
+  ⏸ Ожидает: {workload.count('pending')} ({workload.percent('pending')}%)
+
+{'=' * 70}
+"""
+
+    if workload.projects:
+        report += f"📋 ЗАДАЧИ ПО ПРОЕКТАМ ({len(workload.projects)} проектов):\n"
+        report += f"{'=' * 70}\n\n"
+
+        for proj_name, (client_name, proj_tasks) in workload.projects.items():
+            report += f"🔹 Проект: {proj_name}\n"
+            report += f"   Клиент: {client_name}\n"
+            report += f"   Задач: {len(proj_tasks)}\n\n"
+
+            for task_id, desc, due_date, status in proj_tasks:
+                status_icon = "✓" if status == "completed" else "⏳" if status == "in progress" else "⏸"
+                report += f"   {status_icon} #{task_id}: {desc}\n"
+                report += f"      Срок: {due_date} | Статус: {status}\n"
+            report += f"\n{'-' * 70}\n\n"
+    else:
+        report += "⚠️ Сотрудник пока не назначен ни на одну задачу\n"
+        report += "\n💡 Назначьте задачи через двойной клик по задаче в основном окне\n"
+    return report
+
+
+# Проекты с просроченными незавершенными задачами: по таблице task или по сводке project_open_due
+# (summary_tables.py), где нужные строки читаются по индексу срока
+OVERDUE_PROJECTS_SQL = """
+    SELECT p.project_id, p.project_name, p.project_end_date, COUNT(t.task_id) AS overdue_tasks
+    FROM project p
+             INNER JOIN task t ON p.project_id = t.task_project
+    WHERE t.task_due_date < %s
+      AND t.task_status != 'completed'
+    GROUP BY p.project_id, p.project_name, p.project_end_date
+    ORDER BY overdue_tasks DESC
+"""
+
+OVERDUE_PROJECTS_SUMMARY_SQL = """
+    SELECT p.project_id, p.project_name, p.project_end_date, SUM(s.open_tasks) AS overdue_tasks
+    FROM project_open_due s
+             INNER JOIN project p ON p.project_id = s.project_id
+    WHERE s.task_due_date < %s
+      AND s.open_tasks > 0
+    GROUP BY p.project_id, p.project_name, p.project_end_date
+    ORDER BY overdue_tasks DESC
+"""
+
+
+def overdue_projects(db, current_date, summaries=False):
+    # [(ID, название, дедлайн проекта, просроченных задач)], по убыванию числа просрочек
+    return db.fetch_all(OVERDUE_PROJECTS_SUMMARY_SQL if summaries else OVERDUE_PROJECTS_SQL, (current_date,))
+
+
+# Открытые (незавершенные) задачи сотрудников: по таблице task или по сводке employee_task_summary
+EMPLOYEE_OPEN_TASKS_SQL = """
+    SELECT e.employee_id, e.employee_name, e.employee_position,
+           COALESCE(SUM(t.task_status != 'completed'), 0) AS open_tasks,
+           COALESCE(SUM(t.task_status = 'completed'), 0)  AS completed_tasks
+    FROM employee e
+             LEFT JOIN task t ON t.task_assigned_employee = e.employee_id
+    GROUP BY e.employee_id, e.employee_name, e.employee_position
+    ORDER BY open_tasks DESC, e.employee_name
+"""
+
+EMPLOYEE_OPEN_TASKS_SUMMARY_SQL = """
+    SELECT e.employee_id, e.employee_name, e.employee_position,
+           COALESCE(SUM(CASE WHEN s.task_status NOT IN ('completed', '') THEN s.task_count END), 0) AS open_tasks,
+           COALESCE(SUM(CASE WHEN s.task_status = 'completed' THEN s.task_count END), 0)          AS completed_tasks
+    FROM employee e
+             LEFT JOIN employee_task_summary s ON s.employee_id = e.employee_id
+    GROUP BY e.employee_id, e.employee_name, e.employee_position
+    ORDER BY open_tasks DESC, e.employee_name
+"""
+
+
+def employee_open_tasks(db, summaries=False):
+    # [(ID, имя, должность, открытых задач, завершенных задач)], самые загруженные сначала
+    return [(employee_id, name, position, int(open_tasks), int(completed))
+            for employee_id, name, position, open_tasks, completed in
+            db.fetch_all(EMPLOYEE_OPEN_TASKS_SUMMARY_SQL if summaries else EMPLOYEE_OPEN_TASKS_SQL)]
+
+
+def format_employee_open_tasks(rows):
+    # Текст отчета "Открытые задачи сотрудников"
+    report = f"📌 ОТЧЕТ: Открытые задачи сотрудников\n{'=' * 70}\n\n"
+    report += f"Сотрудников: {len(rows)}, открытых задач: {sum(row[3] for row in rows)}\n\n"
+    for idx, (employee_id, name, position, open_tasks, completed) in enumerate(rows, 1):
+        report += f"{idx}. {name} - {position} (ID: {employee_id})\n"
+        report += f"   Открытых задач: {open_tasks}, завершено: {completed}\n\n"
+    return report
@@ -0,0 +1,187 @@
+# Миграции схемы: составные и покрывающие индексы под запросы, которые выполняет программа,
+# и проверка планов этих запросов через EXPLAIN.
+# В схеме из README есть только первичные ключи, UNIQUE-колонки и индексы внешних ключей, поэтому
+# отчет о просрочках, задачи сотрудника по срокам и списки с ORDER BY по имени читают таблицы целиком
+# или сортируют их (filesort). Примененные миграции записываются в таблицу schema_migrations.
+# Команды: python schema_migrations.py --migrate | --status | --explain
+
+import logging
+import sys
+from datetime import date
+
+import mysql.connector
+
+from report_generator import REPORT_SECTIONS
+from report_queries import (PROJECT_STAFF_SQL, WORKLOAD_SQL, OVERDUE_PROJECTS_SQL, OVERDUE_PROJECTS_SUMMARY_SQL,
+                            EMPLOYEE_OPEN_TASKS_SQL, EMPLOYEE_OPEN_TASKS_SUMMARY_SQL)
+
+logger = logging.getLogger(__name__)
+
+# Миграции: (версия, таблица, имя индекса, колонки, для каких запросов).
+# Новые миграции добавляются в конец со следующим номером версии
+MIGRATIONS = [
+    (1, "task", "idx_task_due_status", ("task_due_date", "task_status", "task_project"),
+     "просроченные задачи: диапазон по сроку, статус и проект читаются из индекса"),
+    (2, "task", "idx_task_employee_due", ("task_assigned_employee", "task_due_date"),
+     "задачи сотрудника по сроку без сортировки"),
+    (3, "task", "idx_task_project_employee", ("task_project", "task_assigned_employee", "task_status"),
+     "статистика проекта по исполнителям и статусам только по индексу"),
+    (4, "clients", "idx_clients_name", ("client_name",), "список клиентов ORDER BY client_name"),
+    (5, "project", "idx_project_name", ("project_name",), "список проектов ORDER BY project_name"),
+]
+
+MIGRATIONS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT NOT NULL PRIMARY KEY,
+        description VARCHAR(200) NOT NULL,
+        applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )"""
+
+# Значения параметров запросов для EXPLAIN: имя -> запрос, возвращающий существующий ID
+SAMPLE_VALUES = {
+    "client_id": "SELECT MIN(client_id) FROM clients",
+    "employee_id": "SELECT MIN(employee_id) FROM employee",
+    "project_id": "SELECT MIN(project_id) FROM project",
+    "task_id": "SELECT MIN(task_id) FROM task",
+}
+
+# Запросы программы для проверки: (название, SQL, имена параметров, полный просмотр ожидается).
+# Полный просмотр ожидается у запросов, которые и должны прочитать всю таблицу (отчеты, списки выбора)
+APP_QUERIES = [
+    ("Страница клиентов", "SELECT * FROM clients WHERE client_id > %s ORDER BY client_id LIMIT %s",
+     ("zero", "page_size"), False),
+    ("Страница задач", """
+        SELECT t.task_id, t.task_description, t.task_project, t.task_due_date, t.task_status,
+               COALESCE(e.employee_name, 'Не назначен') as employee
+        FROM task t
+                 LEFT JOIN employee e ON t.task_assigned_employee = e.employee_id
+        WHERE t.task_id > %s ORDER BY t.task_id LIMIT %s""", ("zero", "page_size"), False),
+    ("Выбор клиента", "SELECT client_id, client_name FROM clients ORDER BY client_name", (), True),
+    ("Выбор проекта", "SELECT project_id, project_name FROM project ORDER BY project_name", (), True),
+    ("Выбор сотрудника", "SELECT employee_id, employee_name, employee_position FROM employee ORDER BY employee_name",
+     (), True),
+    ("Проекты клиента", """
+        SELECT project_id, project_name, project_start_date, project_end_date
+        FROM project
+        WHERE project_client = %s""", ("client_id",), False),
+    ("Число задач проекта", "SELECT COUNT(*) FROM task WHERE task_project = %s", ("project_id",), False),
+    ("Задачи сотрудника", "SELECT task_id FROM task WHERE task_assigned_employee = %s", ("employee_id",), False),
+    ("Исполнитель задачи", "SELECT task_assigned_employee FROM task WHERE task_id = %s", ("task_id",), False),
+    ("Проекты с нарушением сроков", OVERDUE_PROJECTS_SQL, ("today",), False),
+    ("Проекты с нарушением сроков (сводка)", OVERDUE_PROJECTS_SUMMARY_SQL, ("today",), False),
+    ("Сотрудники на проекте", PROJECT_STAFF_SQL.format(where="WHERE p.project_id = %s"), ("project_id",), False),
+    ("Сотрудники на всех проектах", PROJECT_STAFF_SQL.format(where=""), (), True),
+    ("Загрузка сотрудника", WORKLOAD_SQL.format(where="WHERE e.employee_id = %s"), ("employee_id",), False),
+    ("Загрузка всех сотрудников", WORKLOAD_SQL.format(where=""), (), True),
+    ("Открытые задачи сотрудников", EMPLOYEE_OPEN_TASKS_SQL, (), True),
+    ("Открытые задачи сотрудников (сводка)", EMPLOYEE_OPEN_TASKS_SUMMARY_SQL, (), True),
+] + [(f"PDF-отчет: {title}", f"{sql} ORDER BY {pk}", (), True)
+     for _, title, _, pk, sql, *_ in REPORT_SECTIONS]
+
+
+class SchemaMigrations:
+    def __init__(self, db):
+        self.db = db
+
+    def applied(self):
+        # Версии примененных миграций
+        self.db.execute(MIGRATIONS_TABLE_SQL)
+        return {row[0] for row in self.db.fetch_all("SELECT version FROM schema_migrations")}
+
+    def existing_indexes(self):
+        rows = self.db.fetch_all("SELECT DISTINCT TABLE_NAME, INDEX_NAME FROM information_schema.STATISTICS "
+                                 "WHERE TABLE_SCHEMA = DATABASE()")
+        return {(table.lower(), index.lower()) for table, index in rows}
+
+    def pending(self):
+        applied = self.applied()
+        return [migration for migration in MIGRATIONS if migration[0] not in applied]
+
+    def migrate(self):
+        # Применение недостающих миграций по порядку версий, возвращает список примененных версий.
+        # Индекс строится без блокировки записи в таблицу (ALGORITHM=INPLACE, LOCK=NONE).
+        # Индекс, уже созданный вручную или прерванной миграцией, только отмечается примененным
+        existing = self.existing_indexes()
+        done = []
+        for version, table, index, columns, reason in self.pending():
+            if (table, index.lower()) in existing:
+                logger.info(f"Миграция {version}: индекс {index} уже существует")
+            else:
+                logger.info(f"Миграция {version}: создание индекса {index} на {table}({', '.join(columns)})")
+                self.db.execute(f"ALTER TABLE {table} ADD INDEX {index} ({', '.join(columns)}), "
+                                f"ALGORITHM=INPLACE, LOCK=NONE")
+            self.db.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                            (version, f"{index}: {reason}"[:200]))
+            done.append(version)
+        return done
+
+
+def explain_plan(db, sql, params=None):
+    # Строки EXPLAIN в виде словарей по именам колонок (table, type, key, rows, Extra, ...)
+    with db.cursor() as cur:
+        cur.execute(f"EXPLAIN {sql}", params)
+        return [dict(zip(cur.column_names, row)) for row in cur.fetchall()]
+
+
+def plan_problems(row):
+    # Замечания к строке плана: полный просмотр таблицы или индекса, сортировка, временная таблица
+    problems = []
+    if row.get("type") == "ALL":
+        problems.append("полный просмотр таблицы")
+    elif row.get("type") == "index":
+        problems.append("полный просмотр индекса")
+    extra = row.get("Extra") or ""
+    if "Using filesort" in extra:
+        problems.append("сортировка (filesort)")
+    if "Using temporary" in extra:
+        problems.append("временная таблица")
+    return problems
+
+
+def explain_queries(db):
+    # EXPLAIN всех запросов APP_QUERIES: [(название, полный просмотр ожидается, [(строка плана, замечания)]
+    # или текст ошибки)]. Запросы к сводным таблицам без установленных сводок завершаются ошибкой
+    samples = {name: db.fetch_value(sql) or 0 for name, sql in SAMPLE_VALUES.items()}
+    samples.update(zero=0, page_size=500, today=date.today())
+    results = []
+    for name, sql, param_names, full_scan_expected in APP_QUERIES:
+        try:
+            plan = explain_plan(db, sql, tuple(samples[param] for param in param_names) or None)
+            results.append((name, full_scan_expected, [(row, plan_problems(row)) for row in plan]))
+        except mysql.connector.Error as err:
+            results.append((name, full_scan_expected, str(err)))
+    return results
+
+
+def print_advice(results):
+    # Отчет советника: полный просмотр в запросе, где он не ожидается, помечается "!!"
+    flagged = 0
+    for name, full_scan_expected, plan in results:
+        if isinstance(plan, str):
+            print(f"-- {name}: ошибка EXPLAIN: {plan}")
+            continue
+        full_scan = any(row.get("type") in ("ALL", "index") for row, _ in plan)
+        mark = "!!" if full_scan and not full_scan_expected else "ok"
+        flagged += mark == "!!"
+        print(f"{mark} {name}")
+        for row, problems in plan:
+            print(f"     {row.get('table')}: type={row.get('type')} key={row.get('key')} rows={row.get('rows')}"
+                  f"{' - ' + ', '.join(problems) if problems else ''}")
+    print(f"Запросов с неожиданным полным просмотром: {flagged}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    from database import db
+
+    migrations = SchemaMigrations(db)
+    if "--migrate" in sys.argv:
+        print(f"Применены миграции: {', '.join(map(str, migrations.migrate())) or 'нет (схема актуальна)'}")
+    if "--status" in sys.argv or len(sys.argv) == 1:
+        applied = migrations.applied()
+        for version, table, index, columns, reason in MIGRATIONS:
+            print(f"{version}: {'применена' if version in applied else 'ожидает'} - "
+                  f"{table}.{index} ({', '.join(columns)}): {reason}")
+    if "--explain" in sys.argv:
+        print_advice(explain_queries(db))
+    db.close()
@@ -0,0 +1,71 @@
+# Поиск по таблицам главного окна: запрос к БД отправляется не на каждое нажатие клавиши,
+# а после паузы во вводе (debounce) и только если строка поиска достаточно длинная
+
+import logging
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+logger = logging.getLogger(__name__)
+
+# Пауза во вводе (мс), после которой выполняется поиск
+SEARCH_DEBOUNCE_MS = 300
+
+# Минимальная длина строки поиска; числа (поиск по ID) ищутся при любой длине
+MIN_SEARCH_LENGTH = 2
+
+
+def is_searchable(text):
+    # Проверка, что строку поиска стоит отправлять в БД
+    return text.isdigit() or len(text) >= MIN_SEARCH_LENGTH
+
+
+class SearchController(QObject):
+    # Откладывает поиск до паузы во вводе: каждое изменение текста перезапускает таймер ключа.
+    # triggered(key, text) испускается для пустой строки (сброс поиска) и для строк, прошедших порог
+    triggered = Signal(str, str)
+
+    def __init__(self, parent=None, debounce_ms=SEARCH_DEBOUNCE_MS):
+        super().__init__(parent)
+        self.debounce_ms = debounce_ms
+        self._timers = {}
+        self._pending = {}
+        self._last = {}
+
+    def _timer(self, key):
+        timer = self._timers.get(key)
+        if timer is None:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda key=key: self._fire(key))
+            self._timers[key] = timer
+        return timer
+
+    def schedule(self, key, text):
+        self._pending[key] = text.strip()
+        self._timer(key).start(self.debounce_ms)
+
+    def trigger_now(self, key, text):
+        # Немедленный поиск (например, повтор после изменения данных), без проверки на повтор
+        self._timer(key).stop()
+        self._pending.pop(key, None)
+        self._emit(key, text.strip())
+
+    def cancel(self, key):
+        self._timer(key).stop()
+        self._pending.pop(key, None)
+
+    def _fire(self, key):
+        text = self._pending.pop(key, None)
+        if text is None:
+            return
+        if text and not is_searchable(text):
+            logger.debug(f"Строка поиска '{text}' короче {MIN_SEARCH_LENGTH} символов, запрос не выполняется")
+            return
+        if text == self._last.get(key):
+            # Текст вернулся к уже найденному значению - результат на экране актуален
+            return
+        self._emit(key, text)
+
+    def _emit(self, key, text):
+        self._last[key] = text
+        self.triggered.emit(key, text)
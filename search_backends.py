@@ -0,0 +1,138 @@
+# Построение SQL поиска по таблицам главного окна.
+# Если в БД есть индекс FULLTEXT с парсером ngram (нужен для кириллицы), текст ищется через
+# MATCH ... AGAINST по индексу; иначе - через LIKE '%текст%' с полным просмотром таблицы.
+# Индексы создаются командой: python search_backends.py --create-indexes
+
+import logging
+import sys
+
+import mysql.connector
+
+logger = logging.getLogger(__name__)
+
+BACKEND_FULLTEXT = "fulltext"
+BACKEND_LIKE = "like"
+
+# Поиск по таблицам: (таблица БД, имя индекса FULLTEXT, текстовые колонки, колонки для поиска по числу).
+# В индекс входят все текстовые колонки поиска, иначе OR с LIKE по соседней колонке снова дает полный просмотр
+SEARCH_SPECS = {
+    "clients": ("clients", "ft_clients_search", ("client_name", "client_contact"), ("client_id",)),
+    "employees": ("employee", "ft_employee_search", ("employee_name", "employee_position"), ("employee_id",)),
+    "projects": ("project", "ft_project_search", ("project_name",), ("project_id", "project_client")),
+    "tasks": ("task", "ft_task_search", ("task_description", "task_status"), ("task_id", "task_project")),
+}
+
+# Псевдонимы таблиц в SELECT главного окна (задачи выбираются с JOIN сотрудников)
+TABLE_ALIASES = {"tasks": "t"}
+
+# Размер n-граммы по умолчанию (ngram_token_size), если сервер не сообщил свой
+DEFAULT_NGRAM_TOKEN_SIZE = 2
+
+
+class SearchBackend:
+    # Выбор способа поиска для каждой таблицы по наличию индекса FULLTEXT в БД
+    def __init__(self, db):
+        self.db = db
+        self.ngram_token_size = DEFAULT_NGRAM_TOKEN_SIZE
+        self._fulltext = None
+        self._disabled = set()
+
+    def detect(self):
+        # Поиск индексов FULLTEXT текущей БД в information_schema.STATISTICS
+        fulltext = set()
+        try:
+            rows = self.db.fetch_all(
+                "SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND INDEX_TYPE = 'FULLTEXT'"
+            )
+            indexes = {}
+            for table, index, column in rows:
+                indexes.setdefault((table.lower(), index), set()).add(column.lower())
+            for key, (table, _, columns, _) in SEARCH_SPECS.items():
+                if set(columns) in [cols for (name, _), cols in indexes.items() if name == table]:
+                    fulltext.add(key)
+            if fulltext:
+                self.ngram_token_size = self.db.fetch_value("SELECT @@ngram_token_size")
+        except mysql.connector.Error as err:
+            # Например, сервер без парсера ngram: остается поиск через LIKE
+            logger.warning(f"Не удалось определить индексы FULLTEXT: {err}")
+            fulltext = set()
+        self._fulltext = fulltext
+        logger.info(f"Поиск через FULLTEXT: {', '.join(sorted(fulltext)) or 'нет индексов'}")
+        return fulltext
+
+    def has_fulltext(self, key):
+        if self._fulltext is None:
+            self.detect()
+        return key in self._fulltext and key not in self._disabled
+
+    def disable(self, key):
+        # Отказ от FULLTEXT для таблицы (например, после ошибки запроса по индексу)
+        self._disabled.add(key)
+        logger.warning(f"Поиск по таблице '{key}' переключен на LIKE")
+
+    def backend_for(self, key, search_text):
+        # Слова короче n-граммы не попадают в индекс, такие запросы выполняются через LIKE
+        words = search_text.split()
+        if words and self.has_fulltext(key) and min(len(word) for word in words) >= self.ngram_token_size:
+            return BACKEND_FULLTEXT
+        return BACKEND_LIKE
+
+    def query(self, key, select, pk, search_text):
+        # SQL поиска (SELECT таблицы + условия), параметры и выбранный способ поиска.
+        # Числа дополнительно ищутся по ID
+        _, _, text_columns, id_columns = SEARCH_SPECS[key]
+        alias = TABLE_ALIASES.get(key)
+        text_columns = [f"{alias}.{column}" if alias else column for column in text_columns]
+        id_columns = [f"{alias}.{column}" if alias else column for column in id_columns]
+        number = search_text if search_text.isdigit() else None
+
+        backend = self.backend_for(key, search_text)
+        if backend == BACKEND_LIKE:
+            conditions = [f"{column} = %s" for column in id_columns] + [f"{column} LIKE %s" for column in text_columns]
+            params = [number] * len(id_columns) + [f"%{search_text}%"] * len(text_columns)
+            return f"{select} WHERE {' OR '.join(conditions)} ORDER BY {pk}", params, backend
+
+        # Фраза в кавычках в BOOLEAN MODE: n-граммы должны идти подряд, как подстрока в LIKE
+        phrase = '"' + search_text.replace('"', " ") + '"'
+        sql = f"({select} WHERE MATCH({', '.join(text_columns)}) AGAINST (%s IN BOOLEAN MODE))"
+        params = [phrase]
+        if number is not None:
+            # Поиск по ID объединяется через UNION: OR с MATCH не позволил бы использовать индекс
+            conditions = " OR ".join(f"{column} = %s" for column in id_columns)
+            sql += f" UNION ({select} WHERE {conditions})"
+            params += [number] * len(id_columns)
+        return f"{sql} ORDER BY 1", params, backend
+
+
+def ensure_indexes(db):
+    # Создание недостающих индексов FULLTEXT WITH PARSER ngram, возвращает список созданных
+    backend = SearchBackend(db)
+    existing = backend.detect()
+    created = []
+    for key, (table, index, columns, _) in SEARCH_SPECS.items():
+        if key in existing:
+            continue
+        logger.info(f"Создание индекса {index} на {table}({', '.join(columns)})")
+        with db.connection() as conn:
+            cur = conn.cursor()
+            try:
+                # Без стоп-слов: иначе n-граммы, содержащие стоп-слово, не попадают в индекс
+                cur.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+                cur.execute(f"CREATE FULLTEXT INDEX {index} ON {table} ({', '.join(columns)}) WITH PARSER ngram")
+            finally:
+                cur.close()
+        created.append(index)
+    return created
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    from database import db
+
+    if "--create-indexes" in sys.argv:
+        print(f"Созданы индексы: {', '.join(ensure_indexes(db)) or 'нет (уже существуют)'}")
+    found = SearchBackend(db).detect()
+    for key in SEARCH_SPECS:
+        print(f"{key}: {BACKEND_FULLTEXT if key in found else BACKEND_LIKE}")
+    db.close()
@@ -0,0 +1,235 @@
+# Локальный поисковый индекс: поиск по строкам таблицы в памяти процесса, без запроса к серверу БД.
+# Строки хранятся в ColumnStore (упорядочены по ID), для текстовых колонок строится
+# инвертированный индекс триграмм: триграмма -> массив ID строк, в тексте которых она встречается
+
+import logging
+import sys
+import time
+from array import array
+from bisect import bisect_right
+
+from table_models import ColumnStore, TextColumn, CLIENT_COLUMNS, EMPLOYEE_COLUMNS, PROJECT_COLUMNS, TASK_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Индексируемые колонки таблиц: (колонки таблицы, текстовые колонки, колонки для поиска по числу).
+# Номера колонок соответствуют SELECT главного окна и совпадают с условиями поиска в БД
+INDEX_SPECS = {
+    "clients": (CLIENT_COLUMNS, (1, 2), (0,)),
+    "employees": (EMPLOYEE_COLUMNS, (1, 2), (0,)),
+    "projects": (PROJECT_COLUMNS, (1,), (0, 2)),
+    "tasks": (TASK_COLUMNS, (1, 4), (0, 2)),
+}
+
+# Доля устаревших записей в массивах триграмм, после которой индекс перестраивается
+COMPACT_THRESHOLD = 0.25
+
+
+def normalize(text):
+    # Регистронезависимое сравнение, как у collation utf8mb4_unicode_ci (ё = е)
+    return text.casefold().replace("ё", "е")
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    # Индекс одной таблицы. Заполняется через extend (в том числе в фоновом потоке, как sink
+    # QueryWorker), после загрузки обновляется из GUI-потока через upsert/remove.
+    # При изменении строки ее ID дописывается в массивы новых триграмм, а из старых не удаляется:
+    # кандидаты всегда проверяются по текущему тексту, а устаревшие записи убирает compact()
+    def __init__(self, key):
+        columns, self.text_columns, self.id_columns = INDEX_SPECS[key]
+        self.key = key
+        self.store = ColumnStore(columns)
+        # Нормализованный текст строк для проверки кандидатов, параллельно строкам store
+        self.texts = TextColumn()
+        # Текст в буфере лежит в порядке строк (нет правок на месте): можно искать по всему буферу сразу
+        self._ordered = True
+        self.postings = {}
+        self._stale = 0
+        self._entries = 0
+
+    def __len__(self):
+        return len(self.store)
+
+    def _search_text(self, row):
+        # Текст строки для поиска: значения текстовых колонок через разделитель, который не встречается в запросе
+        return "\x00".join(normalize(str(row[col] or "")) for col in self.text_columns)
+
+    def _contains(self, row_idx, needle):
+        # Проверка подстроки прямо в буфере UTF-8, без декодирования строки
+        start = self.texts.starts[row_idx]
+        return needle in self.texts.buffer[start:start + self.texts.lengths[row_idx]]
+
+    def _scan(self, needle):
+        # Поиск подстроки по всему буферу текста: каждое вхождение относится к строке по смещению
+        buffer, starts, lengths = self.texts.buffer, self.texts.starts, self.texts.lengths
+        found = []
+        pos = buffer.find(needle)
+        while pos >= 0:
+            row_idx = bisect_right(starts, pos) - 1
+            end = starts[row_idx] + lengths[row_idx] if row_idx >= 0 else 0
+            if pos + len(needle) <= end:
+                found.append(row_idx)
+                pos = buffer.find(needle, end)
+            else:
+                # Вхождение в данных удаленной строки
+                pos = buffer.find(needle, pos + 1)
+        return found
+
+    def _add_postings(self, row_id, grams):
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array('i')
+            posting.append(row_id)
+        self._entries += len(grams)
+
+    def append(self, row):
+        # Строки при загрузке приходят по возрастанию ID, поэтому добавляются в конец хранилища
+        text = self._search_text(row)
+        self.store.append(row)
+        self.texts.append(text)
+        self._add_postings(row[0], trigrams(text))
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def upsert(self, rows):
+        # Синхронизация с изменениями, сделанными программой (добавление и редактирование)
+        for row in rows:
+            text = self._search_text(row)
+            row_idx, found = self.store.find(row[0])
+            if found:
+                old = trigrams(self.texts.get(row_idx))
+                new = trigrams(text)
+                self.store.set_row(row_idx, row)
+                self.texts.set(row_idx, text)
+                self._ordered = False
+                self._stale += len(old - new)
+                self._add_postings(row[0], new - old)
+            else:
+                self._ordered = self._ordered and row_idx == len(self.store)
+                self.store.insert(row_idx, row)
+                self.texts.insert(row_idx, text)
+                self._add_postings(row[0], trigrams(text))
+        self._compact_if_needed()
+
+    def remove(self, ids):
+        for row_id in set(ids):
+            row_idx, found = self.store.find(row_id)
+            if found:
+                self._stale += len(trigrams(self.texts.get(row_idx)))
+                self.store.delete(row_idx)
+                self.texts.delete(row_idx)
+        self._compact_if_needed()
+
+    def _compact_if_needed(self):
+        if self._entries and self._stale / self._entries > COMPACT_THRESHOLD:
+            self.compact()
+
+    def compact(self):
+        # Перестроение массивов триграмм и буфера текста по текущим строкам
+        texts = TextColumn()
+        self.postings = {}
+        self._stale = 0
+        self._entries = 0
+        keys = self.store.columns[0].values
+        for row_idx in range(len(self.store)):
+            text = self.texts.get(row_idx)
+            texts.append(text)
+            self._add_postings(keys[row_idx], trigrams(text))
+        self.texts = texts
+        self._ordered = True
+        logger.debug(f"Индекс поиска '{self.key}' перестроен: {len(self.store)} строк")
+
+    def search(self, search_text):
+        # Номера строк хранилища, подходящих под запрос (по возрастанию ID).
+        # Условия те же, что в SQL: подстрока в текстовых колонках или равенство числа ID
+        text = normalize(search_text.strip())
+        needle = text.encode("utf-8")
+        if not text:
+            return list(range(len(self.store)))
+        found = set()
+        if text.isdigit():
+            number = int(text)
+            for col in self.id_columns:
+                values = self.store.columns[col].values
+                if col == 0:
+                    row_idx, hit = self.store.find(number)
+                    if hit:
+                        found.add(row_idx)
+                else:
+                    found.update(i for i, value in enumerate(values) if value == number)
+
+        grams = trigrams(text)
+        shortest = min((len(self.postings.get(gram, ())) for gram in grams), default=len(self.store))
+        if self._ordered and shortest > len(self.store) // 8:
+            # Частые триграммы или запрос короче триграммы: просмотр буфера быстрее пересечения массивов
+            found.update(self._scan(needle))
+        elif len(grams) == 1 and len(text) == 3:
+            # Запрос из одной триграммы: совпадение по индексу уже означает вхождение подстроки
+            for row_id in self.postings.get(text, ()):
+                row_idx, hit = self.store.find(row_id)
+                if hit:
+                    found.add(row_idx)
+        elif grams:
+            # Кандидаты - пересечение массивов триграмм, начиная с самого короткого
+            postings = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(posting)
+            for row_id in candidates:
+                row_idx, hit = self.store.find(row_id)
+                if hit and self._contains(row_idx, needle):
+                    found.add(row_idx)
+        else:
+            # Запрос короче триграммы: просмотр всех строк
+            found.update(i for i in range(len(self.store)) if self._contains(i, needle))
+        return sorted(found)
+
+    def rows(self, row_indexes):
+        columns = self.store.columns
+        return [tuple(column.get(row_idx) for column in columns) for row_idx in row_indexes]
+
+    def nbytes(self):
+        # Оценка занимаемой памяти: строки, массивы триграмм, словарь триграмм и сами ключи-строки
+        postings = sum(sys.getsizeof(posting) for posting in self.postings.values())
+        keys = sum(sys.getsizeof(gram) for gram in self.postings)
+        return self.store.nbytes() + self.texts.nbytes() + postings + keys + sys.getsizeof(self.postings)
+
+
+def benchmark(count=100_000):
+    # Замер построения, памяти и скорости поиска на синтетических задачах
+    import random
+    from datetime import date
+
+    words = ["разработка", "тестирование", "интерфейс", "отчет", "база", "данных", "модуль", "клиент",
+             "исправить", "ошибку", "обновить", "документацию", "сервер", "экспорт", "импорт", "анализ"]
+    statuses = ["pending", "in_progress", "completed"]
+    random.seed(1)
+    rows = [(i, " ".join(random.choices(words, k=6)), random.randint(1, 2000),
+             date(2024, 1, 1 + i % 28), random.choice(statuses), f"Сотрудник {i % 300}")
+            for i in range(1, count + 1)]
+
+    index = TrigramIndex("tasks")
+    started = time.perf_counter()
+    index.extend(rows)
+    built = time.perf_counter() - started
+    print(f"Строк: {count}, построение: {built:.2f} с, триграмм: {len(index.postings)}")
+    print(f"Память: {index.nbytes() / 1024 / 1024:.1f} МБ "
+          f"({index.nbytes() * 100_000 / count / 1024 / 1024:.1f} МБ на 100 тыс. строк)")
+    for query in ("документацию сервер", "экспорт", "ошиб", "42", "zzz"):
+        started = time.perf_counter()
+        found = index.search(query)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"Поиск '{query}': {len(found)} строк за {elapsed:.2f} мс")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,220 @@
+# Сводные таблицы задач, которые поддерживают триггеры MySQL (необязательно).
+# С ними отчет о просроченных проектах и сводка открытых задач сотрудников читают несколько строк
+# сводки по ключу вместо просмотра всей таблицы task:
+#   project_task_summary  - число задач проекта по статусам
+#   project_open_due      - число незавершенных задач проекта по срокам (просрочка - срок раньше сегодня)
+#   employee_task_summary - число задач сотрудника по статусам
+# Триггеры task вносят изменения каждой вставки, правки и удаления задачи. Каскадные действия
+# внешних ключей триггеров не вызывают, поэтому удаление проекта, клиента и сотрудника учитывается
+# триггерами BEFORE DELETE этих таблиц (пока задачи еще не удалены каскадом).
+# Статус NULL хранится как пустая строка. Строки с нулевым счетчиком не удаляются, их убирает rebuild.
+# Команды: python summary_tables.py --install | --rebuild | --check | --drop
+
+import logging
+import sys
+
+import mysql.connector
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_TABLES = {
+    "project_task_summary": """
+        CREATE TABLE IF NOT EXISTS project_task_summary (
+            project_id INT NOT NULL,
+            task_status VARCHAR(50) NOT NULL,
+            task_count INT NOT NULL,
+            PRIMARY KEY (project_id, task_status)
+        )""",
+    "project_open_due": """
+        CREATE TABLE IF NOT EXISTS project_open_due (
+            project_id INT NOT NULL,
+            task_due_date DATE NOT NULL,
+            open_tasks INT NOT NULL,
+            PRIMARY KEY (project_id, task_due_date),
+            KEY idx_open_due_date (task_due_date, project_id)
+        )""",
+    "employee_task_summary": """
+        CREATE TABLE IF NOT EXISTS employee_task_summary (
+            employee_id INT NOT NULL,
+            task_status VARCHAR(50) NOT NULL,
+            task_count INT NOT NULL,
+            PRIMARY KEY (employee_id, task_status)
+        )""",
+}
+
+# Содержимое сводок, посчитанное по task: (таблица, колонки ключа, колонка счетчика, SELECT).
+# Используется при перестроении и при проверке согласованности
+SUMMARY_QUERIES = [
+    ("project_task_summary", ("project_id", "task_status"), "task_count", """
+        SELECT task_project, COALESCE(task_status, ''), COUNT(*)
+        FROM task
+        GROUP BY task_project, COALESCE(task_status, '')"""),
+    ("project_open_due", ("project_id", "task_due_date"), "open_tasks", """
+        SELECT task_project, task_due_date, COUNT(*)
+        FROM task
+        WHERE task_status != 'completed'
+        GROUP BY task_project, task_due_date"""),
+    ("employee_task_summary", ("employee_id", "task_status"), "task_count", """
+        SELECT task_assigned_employee, COALESCE(task_status, ''), COUNT(*)
+        FROM task
+        WHERE task_assigned_employee IS NOT NULL
+        GROUP BY task_assigned_employee, COALESCE(task_status, '')"""),
+]
+
+# Изменение сводок одной задачей: {sign} - "+" для добавления, "-" для удаления, {row} - NEW или OLD
+_TASK_DELTA = """
+        INSERT INTO project_task_summary (project_id, task_status, task_count)
+        VALUES ({row}.task_project, COALESCE({row}.task_status, ''), {sign}1)
+        ON DUPLICATE KEY UPDATE task_count = task_count {sign} 1;
+        IF {row}.task_status != 'completed' THEN
+            INSERT INTO project_open_due (project_id, task_due_date, open_tasks)
+            VALUES ({row}.task_project, {row}.task_due_date, {sign}1)
+            ON DUPLICATE KEY UPDATE open_tasks = open_tasks {sign} 1;
+        END IF;
+        IF {row}.task_assigned_employee IS NOT NULL THEN
+            INSERT INTO employee_task_summary (employee_id, task_status, task_count)
+            VALUES ({row}.task_assigned_employee, COALESCE({row}.task_status, ''), {sign}1)
+            ON DUPLICATE KEY UPDATE task_count = task_count {sign} 1;
+        END IF;"""
+
+# Задачи проектов, удаляемых каскадом без триггеров task: вычитаются из сводки сотрудников
+_CASCADE_EMPLOYEE_DELTA = """
+        UPDATE employee_task_summary s
+            JOIN (SELECT t.task_assigned_employee AS employee_id, COALESCE(t.task_status, '') AS task_status,
+                         COUNT(*) AS task_count
+                  FROM task t
+                  WHERE {condition} AND t.task_assigned_employee IS NOT NULL
+                  GROUP BY t.task_assigned_employee, COALESCE(t.task_status, '')) d
+            ON s.employee_id = d.employee_id AND s.task_status = d.task_status
+        SET s.task_count = s.task_count - d.task_count;"""
+
+SUMMARY_TRIGGERS = {
+    "trg_task_summary_insert": f"""
+        CREATE TRIGGER trg_task_summary_insert AFTER INSERT ON task FOR EACH ROW
+        BEGIN{_TASK_DELTA.format(row="NEW", sign="+")}
+        END""",
+    "trg_task_summary_update": f"""
+        CREATE TRIGGER trg_task_summary_update AFTER UPDATE ON task FOR EACH ROW
+        BEGIN
+        IF NOT (OLD.task_project <=> NEW.task_project AND OLD.task_status <=> NEW.task_status
+                AND OLD.task_due_date <=> NEW.task_due_date
+                AND OLD.task_assigned_employee <=> NEW.task_assigned_employee) THEN{_TASK_DELTA.format(row="OLD", sign="-")}{_TASK_DELTA.format(row="NEW", sign="+")}
+        END IF;
+        END""",
+    "trg_task_summary_delete": f"""
+        CREATE TRIGGER trg_task_summary_delete AFTER DELETE ON task FOR EACH ROW
+        BEGIN{_TASK_DELTA.format(row="OLD", sign="-")}
+        END""",
+    "trg_project_summary_delete": f"""
+        CREATE TRIGGER trg_project_summary_delete BEFORE DELETE ON project FOR EACH ROW
+        BEGIN{_CASCADE_EMPLOYEE_DELTA.format(condition="t.task_project = OLD.project_id")}
+        DELETE FROM project_task_summary WHERE project_id = OLD.project_id;
+        DELETE FROM project_open_due WHERE project_id = OLD.project_id;
+        END""",
+    "trg_client_summary_delete": f"""
+        CREATE TRIGGER trg_client_summary_delete BEFORE DELETE ON clients FOR EACH ROW
+        BEGIN{_CASCADE_EMPLOYEE_DELTA.format(
+            condition="t.task_project IN (SELECT project_id FROM project WHERE project_client = OLD.client_id)")}
+        DELETE s FROM project_task_summary s JOIN project p ON p.project_id = s.project_id
+        WHERE p.project_client = OLD.client_id;
+        DELETE s FROM project_open_due s JOIN project p ON p.project_id = s.project_id
+        WHERE p.project_client = OLD.client_id;
+        END""",
+    "trg_employee_summary_delete": """
+        CREATE TRIGGER trg_employee_summary_delete BEFORE DELETE ON employee FOR EACH ROW
+        BEGIN
+        DELETE FROM employee_task_summary WHERE employee_id = OLD.employee_id;
+        END""",
+}
+
+
+class SummaryTables:
+    def __init__(self, db):
+        self.db = db
+        self._installed = None
+
+    def installed(self):
+        # Сводками можно пользоваться, только если есть все таблицы и все триггеры
+        if self._installed is None:
+            try:
+                tables = {row[0].lower() for row in self.db.fetch_all(
+                    "SELECT TABLE_NAME FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()")}
+                triggers = {row[0].lower() for row in self.db.fetch_all(
+                    "SELECT TRIGGER_NAME FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE()")}
+                self._installed = set(SUMMARY_TABLES) <= tables and set(SUMMARY_TRIGGERS) <= triggers
+            except mysql.connector.Error as err:
+                logger.warning(f"Не удалось проверить сводные таблицы: {err}")
+                self._installed = False
+            logger.info(f"Сводные таблицы задач: {'используются' if self._installed else 'не установлены'}")
+        return self._installed
+
+    def install(self):
+        # Создание таблиц и триггеров (существующие триггеры пересоздаются) и заполнение сводок
+        with self.db.transaction() as cur:
+            for sql in SUMMARY_TABLES.values():
+                cur.execute(sql)
+            for name, sql in SUMMARY_TRIGGERS.items():
+                cur.execute(f"DROP TRIGGER IF EXISTS {name}")
+                try:
+                    cur.execute(sql)
+                except mysql.connector.Error as err:
+                    if err.errno == 1419:
+                        raise RuntimeError("Нет прав на создание триггеров при включенном двоичном журнале. "
+                                           "Выполните SET GLOBAL log_bin_trust_function_creators = 1") from err
+                    raise
+        self.rebuild()
+        self._installed = True
+        logger.info("Сводные таблицы задач установлены")
+
+    def drop(self):
+        with self.db.transaction() as cur:
+            for name in SUMMARY_TRIGGERS:
+                cur.execute(f"DROP TRIGGER IF EXISTS {name}")
+            for table in SUMMARY_TABLES:
+                cur.execute(f"DROP TABLE IF EXISTS {table}")
+        self._installed = False
+        logger.info("Сводные таблицы задач удалены")
+
+    def rebuild(self):
+        # Пересчет сводок по task одной транзакцией. INSERT ... SELECT блокирует прочитанные строки task,
+        # поэтому задачи, изменяемые в это время, ждут окончания пересчета
+        with self.db.transaction() as cur:
+            for table, key_columns, count_column, sql in SUMMARY_QUERIES:
+                cur.execute(f"DELETE FROM {table}")
+                cur.execute(f"INSERT INTO {table} ({', '.join(key_columns)}, {count_column}) {sql}")
+                logger.info(f"Сводка {table} перестроена: {cur.rowcount} строк")
+
+    def check(self):
+        # Сравнение сводок с пересчетом по task: список (таблица, ключ, ожидается, в сводке)
+        differences = []
+        for table, key_columns, count_column, sql in SUMMARY_QUERIES:
+            expected = {tuple(row[:-1]): row[-1] for row in self.db.fetch_all(sql)}
+            actual = {tuple(row[:-1]): row[-1] for row in self.db.fetch_all(
+                f"SELECT {', '.join(key_columns)}, {count_column} FROM {table} WHERE {count_column} != 0")}
+            for key in sorted(expected.keys() | actual.keys(), key=str):
+                if expected.get(key, 0) != actual.get(key, 0):
+                    differences.append((table, key, expected.get(key, 0), actual.get(key, 0)))
+        if differences:
+            logger.warning(f"Сводные таблицы расходятся с task: {len(differences)} строк")
+        return differences
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    from database import db
+
+    summaries = SummaryTables(db)
+    if "--drop" in sys.argv:
+        summaries.drop()
+    elif "--install" in sys.argv:
+        summaries.install()
+    elif "--rebuild" in sys.argv:
+        summaries.rebuild()
+    elif "--check" in sys.argv:
+        differences = summaries.check()
+        for table, key, expected, actual in differences[:50]:
+            print(f"{table} {key}: ожидается {expected}, в сводке {actual}")
+        print(f"Расхождений: {len(differences)}")
+    else:
+        print("Использование: python summary_tables.py --install | --rebuild | --check | --drop")
+    db.close()
@@ -0,0 +1,350 @@
+# Модели таблиц для QTableView: данные хранятся по колонкам в компактных массивах,
+# а текст ячейки формируется только когда представление запрашивает видимые строки
+
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import date
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, Signal
+
+# Значение-заглушка для NULL в целочисленных колонках
+_NULL_INT = -(2 ** 63)
+
+
+class IntColumn:
+    # Целые числа (ID, внешние ключи) в array('q'): 8 байт на строку
+    def __init__(self):
+        self.values = array('q')
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, value):
+        self.values.append(_NULL_INT if value is None else int(value))
+
+    def get(self, row):
+        value = self.values[row]
+        return None if value == _NULL_INT else value
+
+    def text(self, row):
+        value = self.values[row]
+        return "" if value == _NULL_INT else str(value)
+
+    def set(self, row, value):
+        self.values[row] = _NULL_INT if value is None else int(value)
+
+    def insert(self, row, value):
+        self.values.insert(row, _NULL_INT if value is None else int(value))
+
+    def delete(self, row):
+        del self.values[row]
+
+    def nbytes(self):
+        return self.values.buffer_info()[1] * self.values.itemsize
+
+
+class DateColumn:
+    # Даты в виде порядкового номера дня (date.toordinal) в array('i'): 4 байта на строку
+    def __init__(self):
+        self.values = array('i')
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, value):
+        self.values.append(value.toordinal() if value is not None else 0)
+
+    def get(self, row):
+        value = self.values[row]
+        return date.fromordinal(value) if value else None
+
+    def text(self, row):
+        value = self.values[row]
+        return date.fromordinal(value).isoformat() if value else ""
+
+    def set(self, row, value):
+        self.values[row] = value.toordinal() if value is not None else 0
+
+    def insert(self, row, value):
+        self.values.insert(row, value.toordinal() if value is not None else 0)
+
+    def delete(self, row):
+        del self.values[row]
+
+    def nbytes(self):
+        return self.values.buffer_info()[1] * self.values.itemsize
+
+
+class CategoryColumn:
+    # Повторяющиеся значения (статус, исполнитель, должность): словарь значений + коды в array('i')
+    def __init__(self):
+        self.codes = array('i')
+        self.categories = []
+        self._index = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _code(self, value):
+        code = self._index.get(value)
+        if code is None:
+            code = len(self.categories)
+            self._index[value] = code
+            self.categories.append(value)
+        return code
+
+    def append(self, value):
+        self.codes.append(self._code(value))
+
+    def get(self, row):
+        return self.categories[self.codes[row]]
+
+    def text(self, row):
+        return str(self.categories[self.codes[row]])
+
+    def set(self, row, value):
+        self.codes[row] = self._code(value)
+
+    def insert(self, row, value):
+        self.codes.insert(row, self._code(value))
+
+    def delete(self, row):
+        del self.codes[row]
+
+    def nbytes(self):
+        return (self.codes.buffer_info()[1] * self.codes.itemsize
+                + sum(sys.getsizeof(value) for value in self.categories))
+
+
+class TextColumn:
+    # Произвольный текст: все строки в одном буфере UTF-8, для каждой строки хранятся смещение и длина
+    def __init__(self):
+        self.buffer = bytearray()
+        self.starts = array('q')
+        self.lengths = array('i')
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _store(self, value):
+        data = ("" if value is None else str(value)).encode("utf-8")
+        start = len(self.buffer)
+        self.buffer += data
+        return start, len(data)
+
+    def append(self, value):
+        start, length = self._store(value)
+        self.starts.append(start)
+        self.lengths.append(length)
+
+    def get(self, row):
+        start = self.starts[row]
+        return self.buffer[start:start + self.lengths[row]].decode("utf-8")
+
+    text = get
+
+    def set(self, row, value):
+        # Старое значение остается в буфере до следующей полной загрузки таблицы
+        self.starts[row], self.lengths[row] = self._store(value)
+
+    def insert(self, row, value):
+        start, length = self._store(value)
+        self.starts.insert(row, start)
+        self.lengths.insert(row, length)
+
+    def delete(self, row):
+        del self.starts[row]
+        del self.lengths[row]
+
+    def nbytes(self):
+        return (len(self.buffer) + self.starts.buffer_info()[1] * self.starts.itemsize
+                + self.lengths.buffer_info()[1] * self.lengths.itemsize)
+
+
+INT, TEXT, DATE, CATEGORY = IntColumn, TextColumn, DateColumn, CategoryColumn
+
+# Колонки таблиц главного окна: (заголовок, тип хранения)
+CLIENT_COLUMNS = [("ID", INT), ("Имя", TEXT), ("Контакт", TEXT)]
+EMPLOYEE_COLUMNS = [("ID", INT), ("Имя", TEXT), ("Должность", CATEGORY)]
+PROJECT_COLUMNS = [("ID", INT), ("Название", TEXT), ("Клиент", INT), ("Начало", DATE), ("Окончание", DATE)]
+TASK_COLUMNS = [("ID", INT), ("Описание", TEXT), ("Проект", INT), ("Срок", DATE), ("Статус", CATEGORY),
+                ("Исполнитель", CATEGORY)]
+
+
+class ColumnStore:
+    # Набор колонок одной таблицы; заполняется построчно, в том числе в фоновом потоке
+    def __init__(self, columns):
+        self.headers = [header for header, _ in columns]
+        self.columns = [kind() for _, kind in columns]
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def append(self, row):
+        for column, value in zip(self.columns, row):
+            column.append(value)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def set_row(self, row_idx, row):
+        for column, value in zip(self.columns, row):
+            column.set(row_idx, value)
+
+    def insert(self, row_idx, row):
+        for column, value in zip(self.columns, row):
+            column.insert(row_idx, value)
+
+    def find(self, key):
+        # Поиск строки по ключу (первая колонка); строки упорядочены по первичному ключу
+        keys = self.columns[0].values
+        row_idx = bisect_left(keys, key)
+        if row_idx < len(keys) and keys[row_idx] == key:
+            return row_idx, True
+        return row_idx, False
+
+    def delete(self, row_idx):
+        for column in self.columns:
+            column.delete(row_idx)
+
+    def nbytes(self):
+        return sum(column.nbytes() for column in self.columns)
+
+
+class ColumnTableModel(QAbstractTableModel):
+    # Модель только для чтения поверх ColumnStore.
+    # В постраничном режиме строки подгружаются при прокрутке: представление вызывает fetchMore,
+    # модель сообщает ключ последней строки, а следующую страницу добавляет append_rows
+    fetch_more_requested = Signal(object)
+
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self.column_spec = columns
+        self.store = ColumnStore(columns)
+        self.has_more = False
+        self._fetching = False
+
+    def new_store(self):
+        return ColumnStore(self.column_spec)
+
+    def set_store(self, store, has_more=False):
+        self.beginResetModel()
+        self.store = store
+        self.has_more = has_more
+        self._fetching = False
+        self.endResetModel()
+
+    def set_rows(self, rows, has_more=False):
+        store = self.new_store()
+        store.extend(rows)
+        self.set_store(store, has_more)
+
+    def append_rows(self, rows, has_more=False):
+        # Добавление очередной страницы в конец таблицы
+        if rows:
+            first = len(self.store)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self.store.extend(rows)
+            self.endInsertRows()
+        self.has_more = has_more
+        self._fetching = False
+
+    def upsert_rows(self, rows):
+        # Точечное обновление: существующие строки заменяются, новые вставляются на место по ключу.
+        # Строки за пределами уже загруженных страниц пропускаются - они придут с fetchMore
+        for row in rows:
+            row_idx, found = self.store.find(row[0])
+            if found:
+                self.store.set_row(row_idx, row)
+                self.dataChanged.emit(self.index(row_idx, 0), self.index(row_idx, self.columnCount() - 1))
+            elif row_idx < len(self.store) or not self.has_more:
+                self.beginInsertRows(QModelIndex(), row_idx, row_idx)
+                self.store.insert(row_idx, row)
+                self.endInsertRows()
+
+    def merge_rows(self, rows):
+        # Слияние строк, упорядоченных по ключу (например, после импорта): существующие строки заменяются,
+        # а подряд идущие новые строки, попадающие на одно место таблицы, вставляются одним beginInsertRows.
+        # Строки за пределами уже загруженных страниц пропускаются, как в upsert_rows
+        run, run_idx = [], 0
+
+        def insert_run():
+            if run:
+                self.beginInsertRows(QModelIndex(), run_idx, run_idx + len(run) - 1)
+                for offset, row in enumerate(run):
+                    self.store.insert(run_idx + offset, row)
+                self.endInsertRows()
+                run.clear()
+
+        for row in rows:
+            row_idx, found = self.store.find(row[0])
+            if found:
+                insert_run()
+                row_idx, _ = self.store.find(row[0])
+                self.store.set_row(row_idx, row)
+                self.dataChanged.emit(self.index(row_idx, 0), self.index(row_idx, self.columnCount() - 1))
+            elif row_idx < len(self.store) or not self.has_more:
+                if run and row_idx != run_idx:
+                    insert_run()
+                    row_idx, _ = self.store.find(row[0])
+                if not run:
+                    run_idx = row_idx
+                run.append(row)
+        insert_run()
+
+    def remove_keys(self, keys):
+        # Удаление строк по ключам (первая колонка)
+        for key in sorted(set(keys), reverse=True):
+            row_idx, found = self.store.find(key)
+            if found:
+                self.beginRemoveRows(QModelIndex(), row_idx, row_idx)
+                self.store.delete(row_idx)
+                self.endRemoveRows()
+
+    def fetch_failed(self):
+        # Подгрузка страницы не удалась: разрешаем представлению повторить запрос
+        self._fetching = False
+
+    def last_key(self):
+        # Ключ (первая колонка) последней загруженной строки, для keyset-пагинации
+        return self.value(len(self.store) - 1, 0) if len(self.store) else 0
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.has_more and not self._fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._fetching = True
+            self.fetch_more_requested.emit(self.last_key())
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.store.columns[index.column()].text(index.row())
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.store.headers[section]
+        return str(section + 1)
+
+    def text(self, row, column):
+        # Текст ячейки, как он отображается в таблице (используется обработчиками кликов)
+        return self.store.columns[column].text(row)
+
+    def value(self, row, column):
+        return self.store.columns[column].get(row)
+
+    def memory_usage(self):
+        return self.store.nbytes()
@@ -18,7 +18,7 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
 from PySide6.QtWidgets import (QApplication, QDateEdit, QFormLayout, QHBoxLayout,
     QHeaderView, QLabel, QLineEdit, QMainWindow,
     QPushButton, QSizePolicy, QSpacerItem, QTabWidget,
-    QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget)
+    QTableView, QVBoxLayout, QWidget)
 
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
@@ -82,9 +82,8 @@ class Ui_MainWindow(object):
 
         self.verticalLayout_clients.addLayout(self.hboxLayout)
 
-        self.table_clients = QTableWidget(self.tab_clients)
+        self.table_clients = QTableView(self.tab_clients)
         self.table_clients.setObjectName(u"table_clients")
-        self.table_clients.setColumnCount(3)
 
         self.verticalLayout_clients.addWidget(self.table_clients)
 
@@ -138,9 +137,8 @@ class Ui_MainWindow(object):
 
         self.verticalLayout_employees.addLayout(self.hboxLayout1)
 
-        self.table_employees = QTableWidget(self.tab_employees)
+        self.table_employees = QTableView(self.tab_employees)
         self.table_employees.setObjectName(u"table_employees")
-        self.table_employees.setColumnCount(3)
 
         self.verticalLayout_employees.addWidget(self.table_employees)
 
@@ -206,9 +204,8 @@ class Ui_MainWindow(object):
 
         self.verticalLayout_projects.addLayout(self.hboxLayout2)
 
-        self.table_projects = QTableWidget(self.tab_projects)
+        self.table_projects = QTableView(self.tab_projects)
         self.table_projects.setObjectName(u"table_projects")
-        self.table_projects.setColumnCount(5)
 
         self.verticalLayout_projects.addWidget(self.table_projects)
 
@@ -263,9 +260,8 @@ class Ui_MainWindow(object):
 
         self.verticalLayout_tasks.addLayout(self.hboxLayout3)
 
-        self.table_tasks = QTableWidget(self.tab_tasks)
+        self.table_tasks = QTableView(self.tab_tasks)
         self.table_tasks.setObjectName(u"table_tasks")
-        self.table_tasks.setColumnCount(6)
 
         self.verticalLayout_tasks.addWidget(self.table_tasks)
 
@@ -311,20 +307,12 @@ class Ui_MainWindow(object):
         self.btn_add_client.setText(QCoreApplication.translate("MainWindow", u"\u0414\u043e\u0431\u0430\u0432\u0438\u0442\u044c \u043a\u043b\u0438\u0435\u043d\u0442\u0430", None))
         self.line_search_client.setPlaceholderText(QCoreApplication.translate("MainWindow", u"\u041f\u043e\u0438\u0441\u043a \u043a\u043b\u0438\u0435\u043d\u0442\u0430...", None))
         self.btn_delete_client.setText(QCoreApplication.translate("MainWindow", u"\u0423\u0434\u0430\u043b\u0438\u0442\u044c", None))
-        self.table_clients.setHorizontalHeaderLabels([
-            QCoreApplication.translate("MainWindow", u"ID", None),
-            QCoreApplication.translate("MainWindow", u"\u0418\u043c\u044f", None),
-            QCoreApplication.translate("MainWindow", u"\u041a\u043e\u043d\u0442\u0430\u043a\u0442", None)])
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_clients), QCoreApplication.translate("MainWindow", u"\u041a\u043b\u0438\u0435\u043d\u0442\u044b", None))
         self.label_employee_name.setText(QCoreApplication.translate("MainWindow", u"\u0418\u043c\u044f \u0441\u043e\u0442\u0440\u0443\u0434\u043d\u0438\u043a\u0430:", None))
         self.label_employee_position.setText(QCoreApplication.translate("MainWindow", u"\u0414\u043e\u043b\u0436\u043d\u043e\u0441\u0442\u044c:", None))
         self.btn_add_employee.setText(QCoreApplication.translate("MainWindow", u"\u0414\u043e\u0431\u0430\u0432\u0438\u0442\u044c \u0441\u043e\u0442\u0440\u0443\u0434\u043d\u0438\u043a\u0430", None))
         self.line_search_employee.setPlaceholderText(QCoreApplication.translate("MainWindow", u"\u041f\u043e\u0438\u0441\u043a \u0441\u043e\u0442\u0440\u0443\u0434\u043d\u0438\u043a\u0430...", None))
         self.btn_delete_employee.setText(QCoreApplication.translate("MainWindow", u"\u0423\u0434\u0430\u043b\u0438\u0442\u044c", None))
-        self.table_employees.setHorizontalHeaderLabels([
-            QCoreApplication.translate("MainWindow", u"ID", None),
-            QCoreApplication.translate("MainWindow", u"\u0418\u043c\u044f", None),
-            QCoreApplication.translate("MainWindow", u"\u0414\u043e\u043b\u0436\u043d\u043e\u0441\u0442\u044c", None)])
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_employees), QCoreApplication.translate("MainWindow", u"\u0421\u043e\u0442\u0440\u0443\u0434\u043d\u0438\u043a\u0438", None))
         self.label_project_name.setText(QCoreApplication.translate("MainWindow", u"\u041d\u0430\u0437\u0432\u0430\u043d\u0438\u0435 \u043f\u0440\u043e\u0435\u043a\u0442\u0430:", None))
         self.label_project_start.setText(QCoreApplication.translate("MainWindow", u"\u0414\u0430\u0442\u0430 \u043d\u0430\u0447\u0430\u043b\u0430:", None))
@@ -332,25 +320,12 @@ class Ui_MainWindow(object):
         self.btn_add_project.setText(QCoreApplication.translate("MainWindow", u"\u0414\u043e\u0431\u0430\u0432\u0438\u0442\u044c \u043f\u0440\u043e\u0435\u043a\u0442", None))
         self.line_search_project.setPlaceholderText(QCoreApplication.translate("MainWindow", u"\u041f\u043e\u0438\u0441\u043a \u043f\u0440\u043e\u0435\u043a\u0442\u0430...", None))
         self.btn_delete_project.setText(QCoreApplication.translate("MainWindow", u"\u0423\u0434\u0430\u043b\u0438\u0442\u044c", None))
-        self.table_projects.setHorizontalHeaderLabels([
-            QCoreApplication.translate("MainWindow", u"ID", None),
-            QCoreApplication.translate("MainWindow", u"\u041d\u0430\u0437\u0432\u0430\u043d\u0438\u0435", None),
-            QCoreApplication.translate("MainWindow", u"\u041a\u043b\u0438\u0435\u043d\u0442", None),
-            QCoreApplication.translate("MainWindow", u"\u041d\u0430\u0447\u0430\u043b\u043e", None),
-            QCoreApplication.translate("MainWindow", u"\u041e\u043a\u043e\u043d\u0447\u0430\u043d\u0438\u0435", None)])
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_projects), QCoreApplication.translate("MainWindow", u"\u041f\u0440\u043e\u0435\u043a\u0442\u044b", None))
         self.label_task_description.setText(QCoreApplication.translate("MainWindow", u"\u041e\u043f\u0438\u0441\u0430\u043d\u0438\u0435 \u0437\u0430\u0434\u0430\u0447\u0438:", None))
         self.label_task_due.setText(QCoreApplication.translate("MainWindow", u"\u0421\u0440\u043e\u043a \u0432\u044b\u043f\u043e\u043b\u043d\u0435\u043d\u0438\u044f:", None))
         self.btn_add_task.setText(QCoreApplication.translate("MainWindow", u"\u0414\u043e\u0431\u0430\u0432\u0438\u0442\u044c \u0437\u0430\u0434\u0430\u0447\u0443", None))
         self.line_search_task.setPlaceholderText(QCoreApplication.translate("MainWindow", u"\u041f\u043e\u0438\u0441\u043a \u0437\u0430\u0434\u0430\u0447\u0438...", None))
         self.btn_delete_task.setText(QCoreApplication.translate("MainWindow", u"\u0423\u0434\u0430\u043b\u0438\u0442\u044c", None))
-        self.table_tasks.setHorizontalHeaderLabels([
-            QCoreApplication.translate("MainWindow", u"ID", None),
-            QCoreApplication.translate("MainWindow", u"\u041e\u043f\u0438\u0441\u0430\u043d\u0438\u0435", None),
-            QCoreApplication.translate("MainWindow", u"\u041f\u0440\u043e\u0435\u043a\u0442", None),
-            QCoreApplication.translate("MainWindow", u"\u0421\u0440\u043e\u043a", None),
-            QCoreApplication.translate("MainWindow", u"\u0421\u0442\u0430\u0442\u0443\u0441", None),
-            QCoreApplication.translate("MainWindow", u"\u0418\u0441\u043f\u043e\u043b\u043d\u0438\u0442\u0435\u043b\u044c", None)])
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_tasks), QCoreApplication.translate("MainWindow", u"\u0417\u0430\u0434\u0430\u0447\u0438", None))
         self.btn_import_excel.setText(QCoreApplication.translate("MainWindow", u"\u0417\u0430\u0433\u0440\u0443\u0437\u0438\u0442\u044c \u0438\u0437 Excel", None))
         self.btn_export_excel.setText(QCoreApplication.translate("MainWindow", u"\u0412\u044b\u0433\u0440\u0443\u0437\u0438\u0442\u044c \u0432 Excel", None))
@@ -262,12 +262,11 @@ class Validator:
         # Проверяем, что срок задачи не позже окончания проекта
         if project_id is not None:
             try:
-                from course import cursor  # Импортируем cursor из course.py
-                cursor.execute(
+                from database import db  # Соединение берется из общего пула
+                result = db.fetch_one(
                     "SELECT project_end_date FROM project WHERE project_id = %s",
                     (project_id,)
                 )
-                result = cursor.fetchone()
 
                 if result:
                     project_end_date_str = str(result[0])
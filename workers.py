@@ -0,0 +1,205 @@
+# Фоновое выполнение запросов к БД вне GUI-потока Qt
+
+import logging
+import threading
+
+import mysql.connector
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+logger = logging.getLogger(__name__)
+
+# Сколько строк читать с сервера за один fetchmany
+FETCH_CHUNK_SIZE = 2000
+
+
+class WorkerSignals(QObject):
+    # Сигналы рабочего потока (QRunnable сам не может иметь сигналов)
+    progress = Signal(int)
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class QueryWorker(QRunnable):
+    # Выполняет SELECT на собственном соединении из пула и читает строки порциями.
+    # Если задан sink (например, ColumnStore), строки сразу складываются в него, а не в список
+    def __init__(self, db, sql, params=None, sink=None, chunk_size=FETCH_CHUNK_SIZE):
+        super().__init__()
+        self.db = db
+        self.sql = sql
+        self.params = params
+        self.sink = sink
+        self.chunk_size = chunk_size
+        self.signals = WorkerSignals()
+        self._cancelled = False
+        # ID соединения MySQL, на котором выполняется запрос (для KILL QUERY при отмене).
+        # Пока запрос выполняется, соединение не может вернуться в пул (защищено _lock)
+        self.connection_id = None
+        self._running = False
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        self._cancelled = True
+
+    def kill(self):
+        # Прерывание запроса на сервере, если он еще выполняется
+        with self._lock:
+            if self._running and self.connection_id is not None:
+                self.db.kill_query(self.connection_id)
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        rows = self.sink if self.sink is not None else []
+        try:
+            with self.db.connection() as conn:
+                with self._lock:
+                    self.connection_id = conn.connection_id
+                    self._running = True
+                try:
+                    if not self._cancelled:
+                        self._read(conn, rows)
+                finally:
+                    with self._lock:
+                        self._running = False
+        except mysql.connector.Error as err:
+            if not self._cancelled:
+                logger.error(f"Ошибка фонового запроса: {err}")
+                self.signals.failed.emit(str(err))
+            return
+
+        if self._cancelled:
+            logger.debug(f"Фоновый запрос отменен после {len(rows)} строк")
+            return
+        self.signals.finished.emit(rows)
+
+    def _read(self, conn, rows):
+        count = 0
+        cur = conn.cursor(buffered=False)
+        try:
+            cur.execute(self.sql, self.params)
+            while not self._cancelled:
+                chunk = cur.fetchmany(self.chunk_size)
+                if not chunk:
+                    break
+                rows.extend(chunk)
+                count += len(chunk)
+                self.signals.progress.emit(count)
+        finally:
+            cur.close()
+
+
+class BackgroundLoader(QObject):
+    # Управляет фоновыми загрузками: новая загрузка по тому же ключу отменяет предыдущую
+    loaded = Signal(str, object)
+    progress = Signal(str, int)
+    failed = Signal(str, str)
+    busy_changed = Signal(bool)
+
+    def __init__(self, db, parent=None, kill_on_cancel=True):
+        super().__init__(parent)
+        self.db = db
+        self.pool = QThreadPool.globalInstance()
+        self.kill_on_cancel = kill_on_cancel
+        self._active = {}
+
+    def start(self, key, sql, params=None, sink=None):
+        previous = self._active.get(key)
+        if previous is not None:
+            self._cancel_worker(previous)
+            logger.debug(f"Загрузка '{key}' заменена более новой")
+
+        worker = QueryWorker(self.db, sql, params, sink)
+        worker.signals.progress.connect(lambda count, w=worker: self._on_progress(key, w, count))
+        worker.signals.finished.connect(lambda rows, w=worker: self._on_finished(key, w, rows))
+        worker.signals.failed.connect(lambda message, w=worker: self._on_failed(key, w, message))
+
+        was_busy = self.is_busy()
+        self._active[key] = worker
+        if not was_busy:
+            self.busy_changed.emit(True)
+        self.pool.start(worker)
+        return worker
+
+    def cancel(self, key):
+        worker = self._active.pop(key, None)
+        if worker is not None:
+            self._cancel_worker(worker)
+            if not self.is_busy():
+                self.busy_changed.emit(False)
+
+    def cancel_all(self):
+        for key in list(self._active):
+            self.cancel(key)
+
+    def _cancel_worker(self, worker):
+        worker.cancel()
+        if self.kill_on_cancel:
+            # KILL QUERY выполняется в пуле потоков, чтобы не задерживать GUI
+            self.pool.start(lambda: self._kill(worker))
+
+    def _kill(self, worker):
+        try:
+            worker.kill()
+        except mysql.connector.Error as err:
+            logger.warning(f"Не удалось прервать запрос на сервере: {err}")
+
+    def is_loading(self, key):
+        return key in self._active
+
+    def is_busy(self):
+        return bool(self._active)
+
+    def _is_current(self, key, worker):
+        return self._active.get(key) is worker and not worker.cancelled
+
+    def _finish(self, key, signal, payload):
+        self._active.pop(key, None)
+        signal.emit(key, payload)
+        if not self.is_busy():
+            self.busy_changed.emit(False)
+
+    def _on_progress(self, key, worker, count):
+        if self._is_current(key, worker):
+            self.progress.emit(key, count)
+
+    def _on_finished(self, key, worker, rows):
+        # Результаты устаревших загрузок отбрасываются
+        if not self._is_current(key, worker):
+            return
+        self._finish(key, self.loaded, rows)
+
+    def _on_failed(self, key, worker, message):
+        if not self._is_current(key, worker):
+            return
+        self._finish(key, self.failed, message)
+
+
+class FileJobSignals(QObject):
+    progress = Signal(str, int, int)
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class FileJobWorker(QRunnable):
+    # Импорт или экспорт файла в рабочем потоке: action(file_path, progress=...) выполняет работу,
+    # job.cancel() прерывает ее. Прогресс по листам передается сигналом progress(лист, строк, всего или 0)
+    def __init__(self, job, action, file_path):
+        super().__init__()
+        self.job = job
+        self.action = action
+        self.file_path = file_path
+        self.signals = FileJobSignals()
+
+    def cancel(self):
+        self.job.cancel()
+
+    def run(self):
+        try:
+            result = self.action(self.file_path, progress=self.signals.progress.emit)
+        except Exception as e:
+            logger.error(f"Ошибка обработки файла {self.file_path}: {e}")
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
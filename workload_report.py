@@ -0,0 +1,170 @@
+# Отчет о загрузке всех сотрудников в файл: текст, PDF или Excel.
+# Задачи всех сотрудников читаются одним упорядоченным запросом (employee_workloads), и отчет
+# пишется в файл по мере чтения, по одному сотруднику: ни весь текст, ни все строки в памяти не собираются
+
+import logging
+import os
+import time
+from datetime import datetime
+
+from openpyxl import Workbook
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+from report_generator import ReportResources, RowSource, StreamedTable, ReportCancelled, format_cell, draw_page_number
+from report_queries import employee_workloads, format_employee_workload
+
+logger = logging.getLogger(__name__)
+
+# Форматы отчета: (фильтр диалога сохранения, расширение файла)
+WORKLOAD_FORMATS = {
+    "txt": ("Текст (*.txt)", ".txt"),
+    "pdf": ("PDF (*.pdf)", ".pdf"),
+    "xlsx": ("Excel Files (*.xlsx)", ".xlsx"),
+}
+
+# Название раздела в сообщениях прогресса (прогресс - по числу сотрудников)
+WORKLOAD_SECTION = "Сотрудники"
+
+# Как часто (сотрудников) сообщать о прогрессе
+WORKLOAD_PROGRESS_EVERY = 50
+
+# Таблица задач в PDF: заголовки, ширины колонок в дюймах, максимальная длина текста,
+# высота строки заголовка и строк данных в пунктах. Строка сотрудника занимает всю ширину таблицы
+WORKLOAD_PDF_HEADERS = ['ID', 'Задача', 'Проект', 'Клиент', 'Срок', 'Статус']
+WORKLOAD_PDF_WIDTHS = [0.5, 2.0, 1.4, 1.1, 0.7, 0.7]
+WORKLOAD_PDF_LIMITS = [None, 38, 24, 18, None, None]
+WORKLOAD_PDF_SUMMARY_LIMIT = 120
+WORKLOAD_PDF_HEIGHTS = (24, 15)
+
+# Листы Excel: сводка по сотрудникам и задачи
+WORKLOAD_SUMMARY_HEADERS = ['ID', 'Имя', 'Должность', 'Всего задач', 'Завершено', 'В работе', 'Ожидает', 'Проектов']
+WORKLOAD_TASK_HEADERS = ['ID сотрудника', 'Сотрудник', 'Проект', 'Клиент', 'ID задачи', 'Описание', 'Срок', 'Статус']
+
+
+class SummaryRow(list):
+    # Строка сотрудника в таблице PDF (отличается стилем от строк задач)
+    pass
+
+
+def workload_file_path(file_path, selected_filter=None):
+    # Формат отчета по фильтру диалога сохранения или по расширению файла
+    for name, (file_filter, ext) in WORKLOAD_FORMATS.items():
+        if selected_filter == file_filter:
+            return name, file_path if file_path.lower().endswith(ext) else file_path + ext
+    ext = os.path.splitext(file_path)[1].lower()
+    for name, (_, format_ext) in WORKLOAD_FORMATS.items():
+        if ext == format_ext:
+            return name, file_path
+    return "txt", file_path + ".txt"
+
+
+def summary_text(workload):
+    return (f"{workload.employee_name} - {workload.employee_position} (ID: {workload.employee_id}): "
+            f"задач {workload.total_tasks}, завершено {workload.count('completed')}, "
+            f"в работе {workload.count('in progress')}, ожидает {workload.count('pending')}")
+
+
+class WorkloadReport:
+    # progress(раздел, обработано сотрудников) и cancelled() - как у ReportGenerator.
+    # Незавершенный файл при отмене или ошибке удаляется
+    def __init__(self, db, progress=None, cancelled=None):
+        self.db = db
+        self.progress = progress
+        self.cancelled = cancelled
+        self.employees = 0
+
+    def workloads(self):
+        workloads = employee_workloads(self.db)
+        try:
+            for workload in workloads:
+                if self.cancelled is not None and self.cancelled():
+                    raise ReportCancelled()
+                yield workload
+                self.employees += 1
+                if self.progress is not None and self.employees % WORKLOAD_PROGRESS_EVERY == 0:
+                    self.progress(WORKLOAD_SECTION, self.employees)
+        finally:
+            workloads.close()
+
+    def write(self, file_path):
+        # Возвращает замеры времени: {"employees": сотрудников, "total": секунд}
+        started = time.perf_counter()
+        writer = {"txt": self.write_text, "pdf": self.write_pdf, "xlsx": self.write_excel}
+        try:
+            writer[workload_file_path(file_path)[0]](file_path)
+        except BaseException:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+        if self.progress is not None:
+            self.progress(WORKLOAD_SECTION, self.employees)
+        return {"employees": self.employees, "total": time.perf_counter() - started}
+
+    def write_text(self, file_path):
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(f"Отчет о загрузке сотрудников. Данные на: {datetime.now().strftime('%d.%m.%Y %H:%M')}\n\n")
+            for workload in self.workloads():
+                f.write(format_employee_workload(workload))
+                f.write(f"\n{'#' * 70}\n\n")
+
+    def pdf_rows(self):
+        # Строки таблицы PDF: строка сотрудника, затем его задачи по проектам
+        for workload in self.workloads():
+            yield SummaryRow([format_cell(summary_text(workload), WORKLOAD_PDF_SUMMARY_LIMIT)] +
+                             [""] * (len(WORKLOAD_PDF_HEADERS) - 1))
+            for project_name, (client_name, tasks) in workload.projects.items():
+                for task_id, description, due_date, status in tasks:
+                    yield [format_cell(value, limit) for value, limit in
+                           zip((task_id, description, project_name, client_name, due_date, status),
+                               WORKLOAD_PDF_LIMITS)]
+
+    def write_pdf(self, file_path):
+        resources, _ = ReportResources.get()
+        style = resources.section_style('#9b59b6', colors.lavender, 9, 7)
+
+        def row_style(row, index):
+            if not isinstance(row, SummaryRow):
+                return []
+            return [('SPAN', (0, index), (-1, index)), ('ALIGN', (0, index), (-1, index), 'LEFT'),
+                    ('BACKGROUND', (0, index), (-1, index), colors.thistle)]
+
+        source = RowSource(self.pdf_rows(), WORKLOAD_SECTION)
+        story = [
+            Paragraph("Загрузка сотрудников", resources.title_style),
+            Paragraph(f"Данные на: {datetime.now().strftime('%d.%m.%Y %H:%M')}", resources.normal_style),
+            Spacer(1, 0.3*inch),
+            StreamedTable(source, WORKLOAD_PDF_HEADERS, [width*inch for width in WORKLOAD_PDF_WIDTHS],
+                          WORKLOAD_PDF_HEIGHTS, style, Paragraph("Нет данных о сотрудниках", resources.normal_style),
+                          row_style),
+        ]
+        try:
+            SimpleDocTemplate(file_path, pagesize=A4).build(story, onFirstPage=draw_page_number,
+                                                            onLaterPages=draw_page_number)
+        finally:
+            source.close()
+
+    def write_excel(self, file_path):
+        # Режим write_only: строки обоих листов сразу сбрасываются во временные файлы листов
+        wb = Workbook(write_only=True)
+        try:
+            summary = wb.create_sheet("Сводка")
+            summary.append(WORKLOAD_SUMMARY_HEADERS)
+            tasks_sheet = wb.create_sheet("Задачи")
+            tasks_sheet.append(WORKLOAD_TASK_HEADERS)
+            for workload in self.workloads():
+                summary.append([workload.employee_id, workload.employee_name, workload.employee_position,
+                                workload.total_tasks, workload.count('completed'), workload.count('in progress'),
+                                workload.count('pending'), len(workload.projects)])
+                for project_name, (client_name, tasks) in workload.projects.items():
+                    for task_id, description, due_date, status in tasks:
+                        tasks_sheet.append([workload.employee_id, workload.employee_name, project_name,
+                                            client_name, task_id, description, due_date, status])
+        except BaseException:
+            # Закрываем временные файлы листов несохраненной книги
+            for ws in wb.worksheets:
+                ws.close()
+            raise
+        wb.save(file_path)